@@ -7,11 +7,14 @@ from loguru import logger as _logger
 import shutil
 import uuid
 import os
+import threading
 import time
+from collections import deque
 
 from metagpt.const import METAGPT_ROOT
 from metagpt.ext.spo.components.optimizer import PromptOptimizer
 from metagpt.ext.spo.utils.llm_client import SPO_LLM, RequestType
+from metagpt.ext.spo.utils.log_channel import LogChannel
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -23,6 +26,10 @@ API_KEY_ENV = os.getenv("API_KEY", "")
 BASE_URL_ENV = os.getenv("BASE_URL", "https://dashscope.aliyuncs.com/compatible-mode/v1")
 MODEL_ENV = os.getenv("MODEL", "qwen-max-latest")
 
+# 日志界面只保留最近的行数，以及刷新间隔（秒）
+LOG_TAIL = 500
+LOG_POLL_INTERVAL = 0.5
+
 def get_user_workspace():
     if "user_id" not in st.session_state:
         st.session_state.user_id = str(uuid.uuid4())
@@ -441,25 +448,11 @@ def main():
         st.header("优化日志")
         log_container = st.empty()
 
-        class StreamlitSink:
-            def write(self, message):
-                current_logs = st.session_state.get("logs", [])
-                current_logs.append(message.strip())
-                st.session_state.logs = current_logs
-                log_container.code(
-                    "\n".join(current_logs), language="plaintext")
-
-        streamlit_sink = StreamlitSink()
         _logger.remove()
 
         def prompt_optimizer_filter(record):
             return "optimizer" in record["name"].lower()
 
-        _logger.add(
-            streamlit_sink.write,
-            format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}",
-            filter=prompt_optimizer_filter,
-        )
         _logger.add(METAGPT_ROOT /
                     "logs/{time:YYYYMMDD}.txt", level="DEBUG")
 
@@ -470,7 +463,7 @@ def main():
                 # Initialize LLM
                 SPO_LLM.initialize(
                     optimize_kwargs={"model": opt_model, "temperature": opt_temp, "base_url": base_url,
-                                     "api_key": api_key},
+                                     "api_key": api_key, "stream": True},
                     evaluate_kwargs={"model": eval_model, "temperature": eval_temp, "base_url": base_url,
                                      "api_key": api_key},
                     execute_kwargs={"model": exec_model, "temperature": exec_temp, "base_url": base_url,
@@ -486,9 +479,32 @@ def main():
                     name=template_name,
                 )
 
-                # Run optimization with progress bar
+                # Run the optimization in a worker thread and poll its log channel, so the page only renders
+                # the last LOG_TAIL lines plus the optimizer output being streamed
+                channel = LogChannel(maxlen=LOG_TAIL)
+                errors = []
+
+                def run_optimizer():
+                    with channel.attach(filter=prompt_optimizer_filter):
+                        try:
+                            optimizer.optimize()
+                        except Exception as e:
+                            errors.append(e)
+
+                worker = threading.Thread(target=run_optimizer, daemon=True)
                 with st.spinner("正在优化提示词..."):
-                    optimizer.optimize()
+                    worker.start()
+                    logs, since = deque(maxlen=LOG_TAIL), 0
+                    while worker.is_alive():
+                        worker.join(LOG_POLL_INTERVAL)
+                        new_lines, since = channel.read(since)
+                        logs.extend(new_lines)
+                        partial = channel.partial
+                        log_container.code(
+                            "\n".join(logs) + (f"\n\n{partial}" if partial else ""), language="plaintext")
+                    st.session_state.logs = list(logs)
+                if errors:
+                    raise errors[0]
 
                 st.success("优化完成！")
                 prompt_path = optimizer.root_path / "prompts"
@@ -501,6 +517,8 @@ def main():
                 st.error(f"发生错误：{str(e)}")
                 _logger.error(f"优化过程中出错：{str(e)}")
                 st.session_state.is_optimizing = False
+        elif st.session_state.get("logs"):
+            log_container.code("\n".join(st.session_state.logs), language="plaintext")
 
     # 优化结果选项卡
     with tab_results:
@@ -0,0 +1,96 @@
+"""
+Throughput of Programmer.exec_code with one new process per execution (`legacy`) and with the shared worker pool.
+
+Programs are executed the way `evaluate_all_problems` runs them, `--concurrency` problems at a time:
+
+    python -m examples.aflow.benchmark_code_executor --dataset GSM8K --problems 200 --concurrency 50
+
+For GSM8K the programs are built from the calculator annotations (`<<48/2=24>>`) of the validation set when
+`metagpt/ext/aflow/data/gsm8k_validate.jsonl` has been downloaded; MATH solutions are LaTeX, so MATH (and GSM8K
+without the data file) uses programs in the style the Programmer operator generates for these datasets.
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import re
+import time
+from pathlib import Path
+
+from metagpt.ext.aflow.scripts.operator import Programmer, run_code
+
+GSM8K_DATA = Path("metagpt/ext/aflow/data/gsm8k_validate.jsonl")
+
+SAMPLE_PROGRAMS = {
+    "GSM8K": [
+        "def solve():\n    eggs = 16 - 3 - 4\n    return eggs * 2\n",
+        "def solve():\n    bolts = 2 + 2 / 2\n    return int(bolts)\n",
+        "def solve():\n    cost = 80000 + 50000\n    value = 80000 * 2.5\n    return value - cost\n",
+    ],
+    "MATH": [
+        "import math\n\ndef solve():\n    return math.comb(10, 3) * math.factorial(4) % 1000\n",
+        "from fractions import Fraction\n\ndef solve():\n"
+        "    total = sum(Fraction(1, n * (n + 1)) for n in range(1, 100))\n    return total\n",
+        "def solve():\n    primes = [n for n in range(2, 2000) if all(n % d for d in range(2, int(n ** 0.5) + 1))]\n"
+        "    return sum(primes[:50])\n",
+    ],
+}
+
+
+def load_programs(dataset: str, problems: int) -> list:
+    programs = []
+    if dataset == "GSM8K" and GSM8K_DATA.exists():
+        with GSM8K_DATA.open(encoding="utf-8") as f:
+            for line in f:
+                steps = re.findall(r"<<([^=<>]+)=", json.loads(line)["answer"])
+                if steps:
+                    body = "".join(f"    step_{i} = {expr}\n" for i, expr in enumerate(steps))
+                    programs.append(f"def solve():\n{body}    return step_{len(steps) - 1}\n")
+    programs = programs or SAMPLE_PROGRAMS[dataset]
+    return [programs[i % len(programs)] for i in range(problems)]
+
+
+async def legacy_exec_code(code, timeout=30):
+    """The former Programmer.exec_code: a new single-worker process pool per execution."""
+    loop = asyncio.get_running_loop()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(executor, run_code, code), timeout=timeout)
+        except asyncio.TimeoutError:
+            executor.shutdown(wait=False, cancel_futures=True)
+            return "Error", "Code execution timed out"
+
+
+async def run_benchmark(mode: str, programs: list, concurrency: int) -> dict:
+    exec_code = legacy_exec_code if mode == "legacy" else Programmer(llm=None).exec_code
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def execute(code):
+        async with semaphore:
+            return await exec_code(code)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(execute(code) for code in programs))
+    elapsed = time.perf_counter() - start
+    succeeded = sum(status == "Success" for status, _ in results)
+    return {"mode": mode, "seconds": elapsed, "throughput": len(programs) / elapsed, "succeeded": succeeded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Code execution throughput of the AFlow Programmer operator")
+    parser.add_argument("--dataset", type=str, default="GSM8K", choices=list(SAMPLE_PROGRAMS))
+    parser.add_argument("--problems", type=int, default=200, help="Number of programs to execute")
+    parser.add_argument("--concurrency", type=int, default=50, help="Problems evaluated at once")
+    args = parser.parse_args()
+
+    programs = load_programs(args.dataset, args.problems)
+    for mode in ("legacy", "pool"):
+        result = asyncio.run(run_benchmark(mode, programs, args.concurrency))
+        print(
+            f"{args.dataset} {result['mode']:>6}: {result['throughput']:7.1f} executions/s "
+            f"({result['succeeded']}/{len(programs)} succeeded in {result['seconds']:.2f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Per-fill overhead of hot ActionNodes with and without the compile cache.
+
+A canned LLM answers with the node's own format example, so the timings only cover compiling the prompt, building
+(or looking up) the output model class and parsing the answer. `uncached` clears the compile cache before every fill,
+which is the work every fill did before the cache existed:
+
+    python -m examples.benchmark_action_node --fills 200
+"""
+import argparse
+import asyncio
+import time
+
+from metagpt.actions.action_node import TAG, ActionNode, clear_compile_cache
+from metagpt.actions.design_api_an import DESIGN_API_NODE
+from metagpt.actions.write_code_plan_and_change_an import (
+    WRITE_CODE_PLAN_AND_CHANGE_NODE,
+)
+from metagpt.actions.write_prd_an import WRITE_PRD_NODE
+
+
+class CannedLLM:
+    def __init__(self, answer: str):
+        self.answer = answer
+
+    async def aask(self, prompt, system_msgs=None, images=None, timeout=None):
+        return self.answer
+
+
+async def time_fills(node: ActionNode, fills: int, cached: bool) -> float:
+    llm = CannedLLM(node.compile_example(schema="json", mode="auto", tag=TAG))
+    await node.fill(context="requirement", llm=llm)  # warm up the model class registry
+    start = time.perf_counter()
+    for _ in range(fills):
+        if not cached:
+            clear_compile_cache()
+        await node.fill(context="requirement", llm=llm)
+    return (time.perf_counter() - start) / fills * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="ActionNode compile cache benchmark")
+    parser.add_argument("--fills", type=int, default=200, help="Fills per node and mode")
+    args = parser.parse_args()
+
+    for name, node in (
+        ("WritePRD", WRITE_PRD_NODE),
+        ("WriteCodePlanAndChange", WRITE_CODE_PLAN_AND_CHANGE_NODE),
+        ("WriteDesign", DESIGN_API_NODE),
+    ):
+        uncached = await time_fills(node, args.fills, cached=False)
+        cached = await time_fills(node, args.fills, cached=True)
+        print(f"{name:>24}: uncached {uncached:.3f} ms/fill, cached {cached:.3f} ms/fill ({uncached / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+Compare the connections opened and the request latency with and without the shared LLM client pool.
+
+Every simulated action calls `Context.llm()` before its request, as roles and action nodes do. A local
+OpenAI-compatible mock server answers the requests, so no API key is needed:
+
+    python -m examples.benchmark_llm_client_pool --actions 200 --concurrency 8
+
+The mock server is plain HTTP on localhost; against a real HTTPS endpoint every extra connection also costs a TLS
+handshake, so the latency gap is larger.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from examples.spo.benchmark_connections import MockOpenAIServer
+from metagpt.config2 import Config
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.context import Context
+from metagpt.provider.client_pool import LLM_CLIENT_POOL
+
+
+async def run_actions(context: Context, actions: int, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    clients = {}
+
+    async def action(i: int):
+        async with semaphore:
+            llm = context.llm()
+            client = llm.aclient
+            clients[id(client)] = client
+            start = time.perf_counter()
+            await client.chat.completions.create(
+                model=llm.model, messages=[{"role": "user", "content": f"question {i}"}]
+            )
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(action(i) for i in range(actions)))
+    # close the connections on this loop before asyncio.run() closes it
+    await asyncio.gather(*(client.close() for client in clients.values()))
+    return latencies
+
+
+def run_benchmark(pooled: bool, base_url: str, server: MockOpenAIServer, actions: int, concurrency: int) -> dict:
+    config = Config.default()
+    config.llm = LLMConfig(model="gpt-4o-mini", base_url=base_url, api_key="sk-mock")
+    context = Context(config=config)
+
+    LLM_CLIENT_POOL.clear()
+    LLM_CLIENT_POOL.enabled = pooled
+    server.reset()
+    try:
+        latencies = asyncio.run(run_actions(context, actions, concurrency))
+    finally:
+        LLM_CLIENT_POOL.enabled = True
+
+    return {
+        "mode": "pooled" if pooled else "unpooled",
+        "requests": server.requests,
+        "connections": len(server.peers),
+        "p50_ms": statistics.median(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Connections opened and p50 latency with and without the client pool")
+    parser.add_argument("--actions", type=int, default=200, help="Number of simulated actions, one request each")
+    parser.add_argument("--concurrency", type=int, default=8, help="Actions in flight at once")
+    args = parser.parse_args()
+
+    server = MockOpenAIServer()
+    base_url = server.start()
+    try:
+        for pooled in (False, True):
+            result = run_benchmark(pooled, base_url, server, args.actions, args.concurrency)
+            print(
+                f"{result['mode']:>9}: {result['connections']:>4} TCP connections for {result['requests']} requests, "
+                f"p50 latency {result['p50_ms']:.2f}ms"
+            )
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Memory operations on long role histories with the list-scanning Memory (`legacy`) and the id-indexed Memory.
+
+A role with `--history` remembered messages observes `--steps` batches of news the way `Role._observe` does
+(news detection, then add_batch), and looks messages up by role. Loading 10k messages into the legacy memory
+alone takes minutes, since every add scans the storage:
+
+    python -m examples.benchmark_memory --history 10000 --steps 50
+"""
+import argparse
+import time
+from collections import defaultdict
+
+from metagpt.memory.memory import Memory
+from metagpt.schema import Message
+
+
+class LegacyMemory:
+    """Memory.add / find_news / get_by_role before the id index: every check scans the storage."""
+
+    def __init__(self):
+        self.storage = []
+        self.index = defaultdict(list)
+
+    def add(self, message):
+        if message in self.storage:
+            return
+        self.storage.append(message)
+        if message.cause_by:
+            self.index[message.cause_by].append(message)
+
+    def add_batch(self, messages):
+        for message in messages:
+            self.add(message)
+
+    def contains(self, message):
+        return message in self.storage
+
+    def get(self, k=0):
+        return self.storage[-k:]
+
+    def get_by_role(self, role):
+        return [message for message in self.storage if message.role == role]
+
+    def find_news(self, observed, k=0):
+        already_observed = self.get(k)
+        return [i for i in observed if i not in already_observed]
+
+
+def make_messages(count: int, offset: int = 0) -> list:
+    return [Message(content=f"message {offset + i}", role=f"role{i % 5}") for i in range(count)]
+
+
+def observe(memory, news) -> int:
+    # Role._observe before this change compared each news message with a copy of the whole history
+    old_messages = memory.get()
+    memory.add_batch(news)
+    return sum(n not in old_messages for n in news)
+
+
+def observe_indexed(memory, news) -> int:
+    unseen = [not memory.contains(n) for n in news]
+    memory.add_batch(news)
+    return sum(unseen)
+
+
+def run(memory, history: list, batches: list, observe_fn) -> dict:
+    start = time.perf_counter()
+    memory.add_batch(history)
+    loaded = time.perf_counter()
+    observed = 0
+    for batch in batches:
+        observed += observe_fn(memory, batch)
+        memory.find_news(batch, k=10)
+        memory.get_by_role("role0")
+    done = time.perf_counter()
+    return {"load": loaded - start, "observe": (done - loaded) / len(batches) * 1000, "news": observed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory benchmark")
+    parser.add_argument("--history", type=int, default=10000, help="Messages in the role history")
+    parser.add_argument("--steps", type=int, default=200, help="Observed batches")
+    parser.add_argument("--batch", type=int, default=5, help="Messages per batch; the first is already remembered")
+    args = parser.parse_args()
+
+    history = make_messages(args.history)
+    batches = [
+        [history[step]] + make_messages(args.batch - 1, offset=args.history + step * args.batch)
+        for step in range(args.steps)
+    ]
+    for name, memory, observe_fn in (
+        ("legacy", LegacyMemory(), observe),
+        ("indexed", Memory(), observe_indexed),
+    ):
+        result = run(memory, history, batches, observe_fn)
+        print(
+            f"{name:>8}: load {args.history} messages in {result['load']:.2f}s, "
+            f"{result['observe']:.3f} ms per observe step ({result['news']} news)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Count the TCP connections SPO opens during a 10-round optimization.
+
+A local OpenAI-compatible mock server answers every request, so no API key is needed:
+
+    python -m examples.spo.benchmark_connections --rounds 10
+
+`legacy` reproduces the old behaviour (a new event loop per round), `aoptimize` runs every round on one loop.
+"""
+import argparse
+import asyncio
+import shutil
+import tempfile
+import threading
+import time
+
+from aiohttp import web
+
+from metagpt.ext.spo.components.optimizer import PromptOptimizer
+from metagpt.ext.spo.utils.llm_client import SPO_LLM
+
+MOCK_CONTENT = (
+    "<analyse>mock analysis</analyse>"
+    "<modification>mock modification</modification>"
+    "<prompt>Please answer the question step by step.</prompt>"
+    "<choose>B</choose>"
+)
+
+
+class MockOpenAIServer:
+    """OpenAI-compatible chat completion server that records the peer address of each request."""
+
+    def __init__(self, port: int = 0):
+        self.port = port
+        self.peers = set()
+        self.requests = 0
+        self._loop = asyncio.new_event_loop()
+        self._runner = None
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    async def _chat_completions(self, request: web.Request) -> web.Response:
+        self.peers.add(request.transport.get_extra_info("peername"))
+        self.requests += 1
+        body = await request.json()
+        return web.json_response(
+            {
+                "id": f"chatcmpl-{self.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": MOCK_CONTENT},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+            }
+        )
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._chat_completions)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def start(self) -> str:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def reset(self):
+        self.peers.clear()
+        self.requests = 0
+
+
+def run_legacy(optimizer: PromptOptimizer):
+    for _ in range(optimizer.max_rounds):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(optimizer._optimize_prompt())
+        optimizer.round += 1
+
+
+def run_benchmark(mode: str, base_url: str, server: MockOpenAIServer, rounds: int, template: str) -> dict:
+    llm_kwargs = {"model": "gpt-4o-mini", "base_url": base_url, "api_key": "sk-mock"}
+    SPO_LLM.initialize(optimize_kwargs=llm_kwargs, evaluate_kwargs=llm_kwargs, execute_kwargs=llm_kwargs)
+
+    workspace = tempfile.mkdtemp(prefix="spo_bench_")
+    optimizer = PromptOptimizer(
+        optimized_path=workspace, initial_round=1, max_rounds=rounds, template=template, name="bench"
+    )
+
+    server.reset()
+    start = time.perf_counter()
+    if mode == "legacy":
+        run_legacy(optimizer)
+    else:
+        optimizer.optimize()
+    elapsed = time.perf_counter() - start
+    shutil.rmtree(workspace, ignore_errors=True)
+
+    return {"mode": mode, "requests": server.requests, "connections": len(server.peers), "seconds": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count TCP connections opened by SPO per optimization run")
+    parser.add_argument("--rounds", type=int, default=10, help="Number of optimization rounds")
+    parser.add_argument("--template", type=str, default="Poem.yaml", help="Template file name")
+    args = parser.parse_args()
+
+    server = MockOpenAIServer()
+    base_url = server.start()
+    try:
+        for mode in ("legacy", "aoptimize"):
+            result = run_benchmark(mode, base_url, server, args.rounds, args.template)
+            print(
+                f"{result['mode']:>10}: {result['connections']:>4} TCP connections for "
+                f"{result['requests']} requests in {result['seconds']:.2f}s"
+            )
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import argparse
 
 from metagpt.ext.spo.components.optimizer import PromptOptimizer
-from metagpt.ext.spo.utils.llm_client import SPO_LLM
+from metagpt.ext.spo.utils.llm_client import SPO_LLM, ResponseCache
 
 
 def parse_args():
@@ -21,6 +21,34 @@ def parse_args():
     parser.add_argument("--max-rounds", type=int, default=10, help="Maximum number of rounds")
     parser.add_argument("--template", type=str, default="Poem.yaml", help="Template file name")
     parser.add_argument("--name", type=str, default="Poem", help="Project name")
+    parser.add_argument("--beam-width", type=int, default=1, help="Number of candidate prompts per round")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Maximum candidates evaluated concurrently")
+    parser.add_argument("--min-evals", type=int, default=3, help="Judge calls issued before early stopping")
+    parser.add_argument("--max-evals", type=int, default=4, help="Maximum judge calls per evaluation")
+    parser.add_argument("--eval-confidence", type=float, default=0.95, help="Confidence needed to stop judging early")
+    parser.add_argument("--qa-seed", type=int, default=None, help="Seed for the per-round QA sample")
+    parser.add_argument(
+        "--qa-strategy", type=str, default="random", choices=["random", "round_robin"], help="QA sampling strategy"
+    )
+    parser.add_argument("--max-cost", type=float, default=None, help="Stop once the LLM cost (USD) reaches this")
+    parser.add_argument("--max-tokens", type=int, default=None, help="Stop once this many tokens have been used")
+
+    # Response cache parameter
+    parser.add_argument("--cache-path", type=str, default=None, help="SQLite file for cached LLM responses")
+    parser.add_argument("--cache-ttl", type=float, default=None, help="Seconds before a cached response expires")
+    parser.add_argument("--cache-only", action="store_true", help="Replay from the cache without calling the LLM")
+    parser.add_argument(
+        "--cache-nonzero-temp", action="store_true", help="Also cache requests with a temperature above 0"
+    )
+
+    # Execution pacing parameter
+    parser.add_argument("--exec-rpm", type=int, default=None, help="Requests per minute allowed for the execute model")
+    parser.add_argument("--exec-tpm", type=int, default=None, help="Tokens per minute allowed for the execute model")
+    parser.add_argument(
+        "--exec-max-concurrency", type=int, default=None, help="Maximum in-flight requests to the execute model"
+    )
+    parser.add_argument("--exec-batch", action="store_true", help="Run executions through the provider batch API")
+    parser.add_argument("--batch-poll-interval", type=float, default=30, help="Seconds between batch status polls")
 
     return parser.parse_args()
 
@@ -28,10 +56,28 @@ def parse_args():
 def main():
     args = parse_args()
 
+    cache = None
+    if args.cache_path:
+        cache = ResponseCache(
+            args.cache_path,
+            ttl=args.cache_ttl,
+            cache_only=args.cache_only,
+            cache_nonzero_temperature=args.cache_nonzero_temp,
+        )
+
     SPO_LLM.initialize(
         optimize_kwargs={"model": args.opt_model, "temperature": args.opt_temp},
         evaluate_kwargs={"model": args.eval_model, "temperature": args.eval_temp},
-        execute_kwargs={"model": args.exec_model, "temperature": args.exec_temp},
+        execute_kwargs={
+            "model": args.exec_model,
+            "temperature": args.exec_temp,
+            "rpm": args.exec_rpm,
+            "tpm": args.exec_tpm,
+            "max_concurrency": args.exec_max_concurrency,
+            "batch": args.exec_batch,
+            "batch_poll_interval": args.batch_poll_interval,
+        },
+        cache=cache,
     )
 
     optimizer = PromptOptimizer(
@@ -40,6 +86,15 @@ def main():
         max_rounds=args.max_rounds,
         template=args.template,
         name=args.name,
+        beam_width=args.beam_width,
+        max_concurrency=args.max_concurrency,
+        min_evaluations=args.min_evals,
+        max_evaluations=args.max_evals,
+        evaluation_confidence=args.eval_confidence,
+        qa_seed=args.qa_seed,
+        qa_strategy=args.qa_strategy,
+        max_cost=args.max_cost,
+        max_tokens=args.max_tokens,
     )
 
     optimizer.optimize()
@@ -0,0 +1,64 @@
+"""
+Path finding on the Ville maze with the flood fill that `path_finder` used before (`path_finder_v2`) and with the
+A* path finder, for agents walking between address tiles the way `STRole.execute` plans them:
+
+    python -m examples.stanford_town.benchmark_path_finder --agents 25 --steps 4
+
+Each step every agent plans one trip to a random address tile. `cached` repeats the same trips, as agents commuting
+between their usual places do.
+"""
+import argparse
+import random
+import time
+
+from metagpt.environment.stanford_town.stanford_town_ext_env import StanfordTownExtEnv
+from metagpt.ext.stanford_town.utils.const import MAZE_ASSET_PATH, collision_block_id
+from metagpt.ext.stanford_town.utils.path_finding import get_path_finder
+from metagpt.ext.stanford_town.utils.utils import path_finder, path_finder_v2
+
+
+def legacy_path_finder(collision_maze, start, end, collision_block_char):
+    path = path_finder_v2(collision_maze, (start[1], start[0]), (end[1], end[0]), collision_block_char)
+    return [(i[1], i[0]) for i in path]
+
+
+def plan_trips(env: StanfordTownExtEnv, agents: int, steps: int, seed: int) -> list:
+    rng = random.Random(seed)
+    tiles = [tile for tiles in env.get_address_tiles().values() for tile in tiles]
+    tiles = [(x, y) for x, y in tiles if env.collision_maze[y][x] != collision_block_id]
+    return [tuple(rng.sample(tiles, 2)) for _ in range(agents * steps)]
+
+
+def run(find, collision_maze, trips) -> dict:
+    start = time.perf_counter()
+    paths = [find(collision_maze, a, b, collision_block_id) for a, b in trips]
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "per_path_ms": elapsed / len(trips) * 1000, "paths": paths}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stanford Town path finding benchmark")
+    parser.add_argument("--agents", type=int, default=25)
+    parser.add_argument("--steps", type=int, default=4, help="Trips planned per agent")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    env = StanfordTownExtEnv(maze_asset_path=MAZE_ASSET_PATH)
+    collision_maze = env.get_collision_maze()
+    trips = plan_trips(env, args.agents, args.steps, args.seed)
+
+    legacy = run(legacy_path_finder, collision_maze, trips)
+    get_path_finder(collision_maze, collision_block_id).invalidate()
+    astar = run(path_finder, collision_maze, trips)
+    cached = run(path_finder, collision_maze, trips)
+
+    gave_up = sum(len(p) == 1 for p in legacy["paths"])
+    longer = sum(len(a) > len(b) for a, b in zip(legacy["paths"], astar["paths"]) if len(a) > 1)
+    print(f"{len(trips)} trips on a {env.maze_width}x{env.maze_height} maze")
+    for name, result in (("legacy", legacy), ("a*", astar), ("cached", cached)):
+        print(f"{name:>7}: {result['per_path_ms']:8.3f} ms/path ({result['seconds']:.2f}s)")
+    print(f"legacy gave up on {gave_up} trips, found a longer path than A* on {longer}")
+
+
+if __name__ == "__main__":
+    main()
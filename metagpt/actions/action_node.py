@@ -11,6 +11,7 @@ NOTE: You should use typing.List instead of list to do type annotation. Because
 import json
 import re
 import typing
+from collections import OrderedDict
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
@@ -130,6 +131,31 @@ def dict_to_markdown(d, prefix="- ", kv_sep="\n", postfix="\n"):
     return markdown_str
 
 
+COMPILE_CACHE_SIZE = 1024
+_compile_cache: OrderedDict[tuple, Any] = OrderedDict()
+
+
+def _compile_cached(key: Optional[tuple], build: typing.Callable[[], Any]) -> Any:
+    """LRU cache of what ActionNode compiles from its structure: model classes, prompt fragments and json schemas.
+    `key` is None when the node cannot be keyed, e.g. an unhashable expected_type."""
+    if key is None:
+        return build()
+    try:
+        value = _compile_cache[key]
+        _compile_cache.move_to_end(key)
+        return value
+    except KeyError:
+        pass
+    value = _compile_cache[key] = build()
+    if len(_compile_cache) > COMPILE_CACHE_SIZE:
+        _compile_cache.popitem(last=False)
+    return value
+
+
+def clear_compile_cache():
+    _compile_cache.clear()
+
+
 class ActionNode:
     """ActionNode is a tree of nodes."""
 
@@ -235,6 +261,25 @@ class ActionNode:
         """get self key: type mapping"""
         return {self.key: (self.expected_type, ...)}
 
+    def _signature(self) -> tuple:
+        """Everything the compiled classes and prompts depend on, so that edited nodes miss the compile cache."""
+        example = self.example if isinstance(self.example, (str, int, float, bool, type(None))) else repr(self.example)
+        return (
+            self.key,
+            self.expected_type,
+            self.instruction,
+            example,
+            tuple(child._signature() for child in self.children.values()),
+        )
+
+    def _compile_key(self, kind: str, *args) -> Optional[tuple]:
+        key = (kind, self._signature(), *args)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
     def get_mapping(self, mode="children", exclude=None) -> Dict[str, Tuple[Type, Any]]:
         """get key: type mapping under mode"""
         if mode == "children" or (mode == "auto" and self.children):
@@ -281,14 +326,14 @@ class ActionNode:
 
     def create_class(self, mode: str = "auto", class_name: str = None, exclude=None):
         class_name = class_name if class_name else f"{self.key}_AN"
-        mapping = self.get_mapping(mode=mode, exclude=exclude)
-        return self.create_model_class(class_name, mapping)
+        return _compile_cached(
+            self._compile_key("class", mode, class_name, tuple(exclude or ())),
+            lambda: self.create_model_class(class_name, self.get_mapping(mode=mode, exclude=exclude)),
+        )
 
     def _create_children_class(self, exclude=None):
         """使用object内有的字段直接生成model_class"""
-        class_name = f"{self.key}_AN"
-        mapping = self._get_children_mapping(exclude=exclude)
-        return self.create_model_class(class_name, mapping)
+        return self.create_class(mode="children", exclude=exclude)
 
     def to_dict(self, format_func=None, mode="auto", exclude=None) -> Dict:
         """将当前节点与子节点都按照node: format的格式组织成字典"""
@@ -367,7 +412,10 @@ class ActionNode:
     def compile_instruction(self, schema="markdown", mode="children", tag="", exclude=None) -> str:
         """compile to raw/json/markdown template with all/root/children nodes"""
         format_func = lambda i: f"{i.expected_type}  # {i.instruction}"
-        return self._compile_f(schema, mode, tag, format_func, kv_sep=": ", exclude=exclude)
+        return _compile_cached(
+            self._compile_key("instruction", schema, mode, tag, tuple(exclude or ())),
+            lambda: self._compile_f(schema, mode, tag, format_func, kv_sep=": ", exclude=exclude),
+        )
 
     def compile_example(self, schema="json", mode="children", tag="", exclude=None) -> str:
         """compile to raw/json/markdown examples with all/root/children nodes"""
@@ -375,7 +423,10 @@ class ActionNode:
         # 这里不能使用f-string，因为转译为str后再json.dumps会额外加上引号，无法作为有效的example
         # 错误示例："File list": "['main.py', 'const.py', 'game.py']", 注意这里值不是list，而是str
         format_func = lambda i: i.example
-        return self._compile_f(schema, mode, tag, format_func, kv_sep="\n", exclude=exclude)
+        return _compile_cached(
+            self._compile_key("example", schema, mode, tag, tuple(exclude or ())),
+            lambda: self._compile_f(schema, mode, tag, format_func, kv_sep="\n", exclude=exclude),
+        )
 
     def compile(self, context, schema="json", mode="children", template=SIMPLE_TEMPLATE, exclude=[]) -> str:
         """
@@ -432,15 +483,18 @@ class ActionNode:
         system_msgs: Optional[list[str]] = None,
         schema="markdown",  # compatible to original format
         timeout=USE_CONFIG_TIMEOUT,
+        output_class: Type[BaseModel] = None,
     ) -> (str, BaseModel):
         """Use ActionOutput to wrap the output of aask"""
         content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
         logger.debug(f"llm raw output:\n{content}")
-        output_class = self.create_model_class(output_class_name, output_data_mapping)
+        output_class = output_class or self.create_model_class(output_class_name, output_data_mapping)
 
         if schema == "json":
             parsed_data = llm_output_postprocess(
-                output=content, schema=output_class.model_json_schema(), req_key=f"[/{TAG}]"
+                output=content,
+                schema=_compile_cached(("json_schema", output_class), output_class.model_json_schema),
+                req_key=f"[/{TAG}]",
             )
         else:  # using markdown parser
             parsed_data = OutputParser.parse_data_with_mapping(content, output_data_mapping)
@@ -468,10 +522,19 @@ class ActionNode:
     ):
         prompt = self.compile(context=self.context, schema=schema, mode=mode, exclude=exclude)
         if schema != "raw":
-            mapping = self.get_mapping(mode, exclude=exclude)
+            mapping = _compile_cached(
+                self._compile_key("mapping", mode, tuple(exclude or ())),
+                lambda: self.get_mapping(mode, exclude=exclude),
+            )
             class_name = f"{self.key}_AN"
             content, scontent = await self._aask_v1(
-                prompt, class_name, mapping, images=images, schema=schema, timeout=timeout
+                prompt,
+                class_name,
+                mapping,
+                images=images,
+                schema=schema,
+                timeout=timeout,
+                output_class=self.create_class(mode=mode, class_name=class_name, exclude=exclude),
             )
             self.content = content
             self.instruct_content = scontent
@@ -513,14 +576,11 @@ class ActionNode:
         """
         Compile the prompt to make it easier for the model to understand the xml format.
         """
-        field_names = self.get_field_names()
         # Construct the example using the field names
-        examples = []
-        for field_name in field_names:
-            examples.append(f"<{field_name}>content</{field_name}>")
-
-        # Join all examples into a single string
-        example_str = "\n".join(examples)
+        example_str = _compile_cached(
+            self._compile_key("xml_example"),
+            lambda: "\n".join(f"<{field_name}>content</{field_name}>" for field_name in self.get_field_names()),
+        )
         # Add the example to the context
         context += f"""
 ### Response format (must be strictly followed): All content must be enclosed in the given XML tags, ensuring each opening <tag> has a corresponding closing </tag>, with no incomplete or self-closing tags allowed.\n
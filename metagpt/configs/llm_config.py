@@ -97,6 +97,13 @@ class LLMConfig(YamlModel):
     # Cost Control
     calc_usage: bool = True
 
+    # Rate Limiting, shared by every LLM of the same endpoint and model
+    rpm: Optional[int] = None  # requests per minute
+    tpm: Optional[int] = None  # tokens per minute
+    max_concurrency: Optional[int] = None  # requests in flight, lowered on 429 responses
+    adaptive_concurrency: bool = False  # adapt the requests in flight to 429 responses even without other limits
+    rate_limit_retries: int = 3  # retries of a request rejected with 429
+
     # For Messages Control
     use_system_prompt: bool = True
 
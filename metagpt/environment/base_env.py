@@ -4,13 +4,23 @@
 
 import asyncio
 from abc import abstractmethod
+from collections import deque
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Set, Union
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterable, Optional, Set, Union
 
 from gymnasium import spaces
 from gymnasium.core import ActType, ObsType
-from pydantic import BaseModel, ConfigDict, Field, SerializeAsAny, model_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    SerializeAsAny,
+    field_serializer,
+    model_validator,
+)
 
+from metagpt.const import MESSAGE_ROUTE_TO_ALL
 from metagpt.context import Context
 from metagpt.environment.api.env_api import (
     EnvAPIAbstract,
@@ -20,7 +30,8 @@ from metagpt.environment.api.env_api import (
 from metagpt.environment.base_env_space import BaseEnvAction, BaseEnvObsParams
 from metagpt.logs import logger
 from metagpt.schema import Message
-from metagpt.utils.common import get_function_schema, is_coroutine_func, is_send_to
+from metagpt.utils.common import get_function_schema, is_coroutine_func
+from metagpt.utils.dependency_file import DependencyFile
 
 if TYPE_CHECKING:
     from metagpt.roles.role import Role  # noqa: F401
@@ -34,6 +45,11 @@ class EnvType(Enum):
     STANFORDTOWN = "StanfordTown"
 
 
+class EnvScheduler(str, Enum):
+    ALL = "all"  # every round runs every role
+    READY = "ready"  # every round runs only the roles that received messages since their last run
+
+
 env_write_api_registry = WriteAPIRegistry()
 env_read_api_registry = ReadAPIRegistry()
 
@@ -131,9 +147,15 @@ class Environment(ExtEnv):
     desc: str = Field(default="")  # 环境描述
     roles: dict[str, SerializeAsAny["Role"]] = Field(default_factory=dict, validate_default=True)
     member_addrs: Dict["Role", Set] = Field(default_factory=dict, exclude=True)
-    history: str = ""  # For debug
+    history_log: Deque[Message] = Field(default_factory=deque)  # For debug, the latest `max_history` messages
+    max_history: int = 1000
+    scheduler: EnvScheduler = EnvScheduler.ALL
     context: Context = Field(default_factory=Context, exclude=True)
 
+    _subscribers: dict[str, dict["Role", None]] = PrivateAttr(default_factory=dict)  # address -> roles
+    _subscriptions: dict["Role", frozenset] = PrivateAttr(default_factory=dict)  # role -> indexed addresses
+    _ready: dict["Role", None] = PrivateAttr(default_factory=dict)
+
     def reset(
         self,
         *,
@@ -150,9 +172,14 @@ class Environment(ExtEnv):
 
     @model_validator(mode="after")
     def init_roles(self):
+        self.history_log = deque(self.history_log, maxlen=self.max_history)
         self.add_roles(self.roles.values())
         return self
 
+    @field_serializer("history_log", mode="wrap")
+    def ser_history_log(self, history_log: Deque[Message], handler) -> list:
+        return list(handler(history_log))
+
     def add_role(self, role: "Role"):
         """增加一个在当前环境的角色
         Add a role in the current environment
@@ -182,29 +209,48 @@ class Environment(ExtEnv):
         in RFC 113.
         """
         logger.debug(f"publish_message: {message.dump()}")
-        found = False
         # According to the routing feature plan in Chapter 2.2.3.2 of RFC 113
-        for role, addrs in self.member_addrs.items():
-            if is_send_to(message, addrs):
-                role.put_message(message)
-                found = True
-        if not found:
+        recipients = self._get_recipients(message)
+        for role in recipients:
+            role.put_message(message)
+        if not recipients:
             logger.warning(f"Message no recipients: {message.dump()}")
-        self.history += f"\n{message}"  # For debug
+        self.history_log.append(message)  # For debug
 
         return True
 
+    def _get_recipients(self, message: Message) -> list["Role"]:
+        """Same result as checking `is_send_to` against every member, via the address -> roles index."""
+        if MESSAGE_ROUTE_TO_ALL in message.send_to:
+            return list(self.member_addrs)
+        recipients = {}
+        for address in message.send_to:
+            recipients.update(self._subscribers.get(address, {}))
+        return list(recipients)
+
+    def set_ready(self, role: "Role"):
+        """Mark the role as having unread messages, used by the `EnvScheduler.READY` scheduler."""
+        self._ready[role] = None
+
+    def _pop_ready(self) -> list["Role"]:
+        # A role may have read its messages in the round it was marked ready in; such roles have nothing to do.
+        ready = [role for role in self._ready if role.recovered or not role.rc.msg_buffer.empty()]
+        self._ready = {}
+        return ready
+
     async def run(self, k=1):
         """处理一次所有信息的运行
         Process all Role runs at once
         """
         for _ in range(k):
-            futures = []
-            for role in self.roles.values():
-                future = role.run()
-                futures.append(future)
+            if self.scheduler == EnvScheduler.READY:
+                roles = self._pop_ready()
+            else:
+                self._ready = {}
+                roles = self.roles.values()
 
-            await asyncio.gather(*futures)
+            await asyncio.gather(*(role.run() for role in roles))
+            await DependencyFile.flush_all()
             logger.debug(f"is idle: {self.is_idle}")
 
     def get_roles(self) -> dict[str, "Role"]:
@@ -222,9 +268,16 @@ class Environment(ExtEnv):
     def role_names(self) -> list[str]:
         return [i.name for i in self.roles.values()]
 
+    @property
+    def history(self) -> str:
+        """For debug, the logged messages in the format of the former string history."""
+        return "".join(f"\n{message}" for message in self.history_log)
+
     @property
     def is_idle(self):
         """If true, all actions have been executed."""
+        if self.scheduler == EnvScheduler.READY:
+            return not any(role.recovered or not role.rc.msg_buffer.empty() for role in self._ready)
         for r in self.roles.values():
             if not r.is_idle:
                 return False
@@ -236,7 +289,15 @@ class Environment(ExtEnv):
 
     def set_addresses(self, obj, addresses):
         """Set the addresses of the object"""
+        for address in self._subscriptions.get(obj, ()):
+            subscribers = self._subscribers[address]
+            subscribers.pop(obj, None)
+            if not subscribers:
+                del self._subscribers[address]
         self.member_addrs[obj] = addresses
+        self._subscriptions[obj] = frozenset(addresses)
+        for address in addresses:
+            self._subscribers.setdefault(address, {})[obj] = None
 
     def archive(self, auto_archive=True):
         if auto_archive and self.context.git_repo:
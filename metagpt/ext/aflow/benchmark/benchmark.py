@@ -4,14 +4,17 @@ import os
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Callable, List, Tuple
+from typing import Any, Callable, List, Optional, Tuple
 
 import aiofiles
 import pandas as pd
+from pydantic_core import to_jsonable_python
 from tqdm.asyncio import tqdm_asyncio
 
 from metagpt.logs import logger
-from metagpt.utils.common import write_json_file
+
+MISMATCH_LOG = "log.jsonl"
+MISMATCH_BATCH_SIZE = 100
 
 
 class BaseBenchmark(ABC):
@@ -19,6 +22,8 @@ class BaseBenchmark(ABC):
         self.name = name
         self.file_path = file_path
         self.log_path = log_path
+        self._mismatch_queue: Optional[asyncio.Queue] = None
+        self._mismatch_writer: Optional[asyncio.Task] = None
 
     PASS = "PASS"
     FAIL = "FAIL"
@@ -38,7 +43,7 @@ class BaseBenchmark(ABC):
         avg_score = df["score"].mean()
         t_cost = df["cost"].max()
         a_cost = t_cost / len(df) if len(df) > 0 else 0
-        current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
+        current_time = datetime.now().strftime("%Y%m%d_%H%M%S_%f")  # concurrent passes may finish within a second
         filename = f"{avg_score:.5f}_{current_time}.csv"
         output_file = os.path.join(self.log_path, filename)
         df.to_csv(output_file, index=False)
@@ -60,17 +65,58 @@ class BaseBenchmark(ABC):
             "extracted_output": extracted_output,
             "extract_answer_code": extract_answer_code,
         }
-        log_file = Path(self.log_path) / "log.json"
-        if log_file.exists():
-            with log_file.open("r", encoding="utf-8") as f:
-                try:
-                    data = json.load(f)
-                except json.JSONDecodeError:
-                    data = []
-        else:
-            data = []
-        data.append(log_data)
-        write_json_file(log_file, data, encoding="utf-8", indent=4)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_mismatches([log_data])
+            return
+
+        # Records are appended to log.jsonl by a single writer task, so concurrent evaluations never race on the file
+        if (
+            self._mismatch_writer is None
+            or self._mismatch_writer.done()
+            or self._mismatch_writer.get_loop() is not loop
+        ):
+            self._mismatch_queue = asyncio.Queue()
+            self._mismatch_writer = loop.create_task(self._mismatch_writer_loop(self._mismatch_queue))
+        self._mismatch_queue.put_nowait(log_data)
+
+    def _mismatch_lines(self, records: List[dict]) -> str:
+        return "".join(json.dumps(r, ensure_ascii=False, default=to_jsonable_python) + "\n" for r in records)
+
+    def _write_mismatches(self, records: List[dict]):
+        log_file = Path(self.log_path) / MISMATCH_LOG
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        with log_file.open("a", encoding="utf-8") as f:
+            f.write(self._mismatch_lines(records))
+
+    async def _mismatch_writer_loop(self, queue: asyncio.Queue):
+        log_file = Path(self.log_path) / MISMATCH_LOG
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            records = [await queue.get()]
+            while not queue.empty() and len(records) < MISMATCH_BATCH_SIZE:
+                records.append(queue.get_nowait())
+            try:
+                async with aiofiles.open(log_file, mode="a", encoding="utf-8") as f:
+                    await f.write(self._mismatch_lines(records))
+            except Exception as e:
+                logger.error(f"Failed to write {len(records)} mismatch records to {log_file}: {e}")
+            finally:
+                for _ in records:
+                    queue.task_done()
+
+    async def flush_mismatches(self):
+        """Wait until every logged mismatch is written, then stop the writer task"""
+        writer, queue = self._mismatch_writer, self._mismatch_queue
+        if writer is None or writer.done():
+            self._mismatch_writer = None
+            return
+        await queue.join()
+        # Evaluations sharing this benchmark may still be logging; the last one to finish stops the writer
+        if self._mismatch_writer is writer and queue.empty():
+            self._mismatch_writer = None
+            writer.cancel()
 
     @abstractmethod
     async def evaluate_problem(self, problem: dict, graph: Callable) -> Tuple[Any, ...]:
@@ -84,8 +130,16 @@ class BaseBenchmark(ABC):
     def get_result_columns(self) -> List[str]:
         pass
 
-    async def evaluate_all_problems(self, data: List[dict], graph: Callable, max_concurrent_tasks: int = 50):
-        semaphore = asyncio.Semaphore(max_concurrent_tasks)
+    async def evaluate_all_problems(
+        self,
+        data: List[dict],
+        graph: Callable,
+        max_concurrent_tasks: int = 50,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ):
+        """Evaluate `data` at most `max_concurrent_tasks` problems at a time, or under a `semaphore` shared with
+        other evaluations running concurrently"""
+        semaphore = semaphore or asyncio.Semaphore(max_concurrent_tasks)
 
         async def sem_evaluate(problem):
             async with semaphore:
@@ -94,9 +148,18 @@ class BaseBenchmark(ABC):
         tasks = [sem_evaluate(problem) for problem in data]
         return await tqdm_asyncio.gather(*tasks, desc=f"Evaluating {self.name} problems", total=len(data))
 
-    async def run_evaluation(self, graph: Callable, va_list: List[int], max_concurrent_tasks: int = 50):
+    async def run_evaluation(
+        self,
+        graph: Callable,
+        va_list: List[int],
+        max_concurrent_tasks: int = 50,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ):
         data = await self.load_data(va_list)
-        results = await self.evaluate_all_problems(data, graph, max_concurrent_tasks)
+        try:
+            results = await self.evaluate_all_problems(data, graph, max_concurrent_tasks, semaphore)
+        finally:
+            await self.flush_mismatches()
         columns = self.get_result_columns()
         average_score, average_cost, total_cost = self.save_results_to_csv(results, columns)
         logger.info(f"Average score on {self.name} dataset: {average_score:.5f}")
@@ -10,8 +10,7 @@ import json
 import os
 
 import numpy as np
-
-from metagpt.utils.common import read_json_file, write_json_file
+from pydantic_core import to_jsonable_python
 
 
 def generate_random_indices(n, n_samples, test=False):
@@ -50,18 +49,7 @@ def log_mismatch(problem, expected_output, prediction, predicted_number, path):
         "extracted_output": predicted_number,
     }
 
-    log_file = os.path.join(path, "log.json")
-
-    # Check if the log file already exists
-    if os.path.exists(log_file):
-        # If it exists, load the existing log data
-        data = read_json_file(log_file)
-    else:
-        # If it does not exist, create a new log list
-        data = []
-
-    # Add the new log entry
-    data.append(log_data)
-
-    # Write the data back to log.json file
-    write_json_file(log_file, data, encoding="utf-8", indent=4)
+    # Append one line instead of rewriting the whole log
+    log_file = os.path.join(path, "log.jsonl")
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(log_data, ensure_ascii=False, default=to_jsonable_python) + "\n")
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+# @Desc    : Long-lived pool of worker processes that execute generated code for AFlow operators
+import asyncio
+import atexit
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: no resource limits
+    resource = None
+
+from metagpt.logs import logger
+
+DEFAULT_POOL_SIZE = min(os.cpu_count() or 1, 8)
+DEFAULT_MEMORY_LIMIT = 2 << 30  # bytes of address space a task may use on top of the idle worker
+DEFAULT_CPU_TIME_LIMIT = 60  # CPU seconds per task
+
+
+class WorkerCrashedError(RuntimeError):
+    """The worker running a task died, e.g. killed for exceeding its CPU time limit."""
+
+
+def _address_space_size() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _set_limits(memory_limit: Optional[int], cpu_time_limit: Optional[int]):
+    if not resource:
+        return
+    if memory_limit:
+        baseline = _address_space_size() or 0
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (baseline + memory_limit, resource.RLIM_INFINITY))
+        except (ValueError, OSError) as e:
+            logger.warning(f"Cannot limit the memory of code workers: {e}")
+    if cpu_time_limit:
+        # exceeding the soft limit kills the process with SIGXCPU
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = cpu_time_limit if hard == resource.RLIM_INFINITY else min(cpu_time_limit, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _call(func: Callable, args: tuple) -> Any:
+    try:
+        return func(*args)
+    except BaseException as e:  # e.g. SystemExit raised by the executed code
+        return e if isinstance(e, Exception) else RuntimeError(f"{type(e).__name__}: {e}")
+
+
+def _send(conn: Connection, result: Any):
+    try:
+        conn.send(result)
+    except Exception as e:
+        conn.send(RuntimeError(f"Unpicklable result: {e}"))
+
+
+def _run_forked(func: Callable, args: tuple, memory_limit: Optional[int], cpu_time_limit: Optional[int]) -> Any:
+    """Run one task in a child forked from the idle worker, so globals, imports and monkeypatches die with it."""
+    reader, writer = multiprocessing.Pipe(duplex=False)
+    pid = os.fork()
+    if pid == 0:
+        try:
+            reader.close()
+            _set_limits(memory_limit, cpu_time_limit)
+            _send(writer, _call(func, args))
+        finally:
+            os._exit(0)
+    writer.close()
+    try:
+        result, crashed = reader.recv(), False
+    except EOFError:
+        result, crashed = None, True
+    finally:
+        reader.close()
+    _, status = os.waitpid(pid, 0)
+    if crashed:
+        exitcode = os.waitstatus_to_exitcode(status)
+        return WorkerCrashedError(f"Code worker exited with code {exitcode}, probably over its resource limit")
+    return result
+
+
+def _run_in_process(func: Callable, args: tuple) -> Any:
+    """Without fork, run the task in the worker itself and drop the modules it imported afterwards."""
+    modules = dict(sys.modules)
+    try:
+        return _call(func, args)
+    finally:
+        for name in set(sys.modules) - set(modules):
+            del sys.modules[name]
+        sys.modules.update(modules)
+
+
+def _worker_main(conn: Connection, func: Callable, memory_limit: Optional[int], cpu_time_limit: Optional[int]):
+    if hasattr(os, "setpgid"):
+        os.setpgid(0, 0)  # lead a process group, so killing the worker also kills the task it forked
+    while True:
+        try:
+            args = conn.recv()
+        except (EOFError, OSError):
+            break
+        if hasattr(os, "fork"):
+            result = _run_forked(func, args, memory_limit, cpu_time_limit)
+        else:
+            result = _run_in_process(func, args)
+        _send(conn, result)
+
+
+def _mp_context(func: Callable) -> multiprocessing.context.BaseContext:
+    """Start workers from a single-threaded fork server (or spawn them), never by forking this threaded process."""
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([func.__module__])  # import once in the server instead of once per worker
+    return context
+
+
+class _Worker:
+    def __init__(
+        self,
+        context: multiprocessing.context.BaseContext,
+        func: Callable,
+        memory_limit: Optional[int],
+        cpu_time_limit: Optional[int],
+    ):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, func, memory_limit, cpu_time_limit), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except OSError:
+                pass  # the worker has not become a group leader yet
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class CodeExecutorPool:
+    """Fixed-size pool of pre-started worker processes running `func(*args)`.
+
+    Workers are reused across tasks, but each task runs in a process forked from its idle worker, so nothing the
+    executed code changes (globals, imported modules, monkeypatches) reaches the next task. A task that exceeds its
+    timeout gets only its own worker killed and replaced; each task is limited to `memory_limit` bytes of extra
+    address space and `cpu_time_limit` CPU seconds (where the platform supports resource limits). Tasks can be
+    submitted from any thread and event loop; workers are started by a fork server, so starting a replacement from
+    an executor thread does not fork the threaded parent process.
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        size: int = DEFAULT_POOL_SIZE,
+        memory_limit: Optional[int] = DEFAULT_MEMORY_LIMIT,
+        cpu_time_limit: Optional[int] = DEFAULT_CPU_TIME_LIMIT,
+    ):
+        self.func = func
+        self.size = size
+        self.memory_limit = memory_limit
+        self.cpu_time_limit = cpu_time_limit
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers = []
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.restarts = 0
+        self._context = _mp_context(func)
+
+    def _new_worker(self) -> _Worker:
+        return _Worker(self._context, self.func, self.memory_limit, self.cpu_time_limit)
+
+    def start(self):
+        """Start the workers; called by the first `run` if not done before."""
+        with self._lock:
+            if self._threads:
+                return
+            self._workers = [self._new_worker() for _ in range(self.size)]
+            for worker in self._workers:
+                self._idle.put(worker)
+            self._threads = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="code_executor")
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        worker.kill()
+        new_worker = self._new_worker()
+        with self._lock:
+            if worker in self._workers:
+                self._workers[self._workers.index(worker)] = new_worker
+            self.restarts += 1
+        return new_worker
+
+    def _run(self, args: tuple, timeout: Optional[float]) -> Any:
+        worker = self._idle.get()
+        try:
+            worker.conn.send(args)
+            if not worker.conn.poll(timeout):
+                worker = self._replace(worker)
+                raise TimeoutError(f"Code execution timed out after {timeout}s")
+            try:
+                result = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.process.join(timeout=1)
+                exitcode = worker.process.exitcode
+                worker = self._replace(worker)
+                raise WorkerCrashedError(f"Code worker exited with code {exitcode}, probably over its resource limit")
+        finally:
+            self._idle.put(worker)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def run(self, *args, timeout: Optional[float] = None) -> Any:
+        """Run `func(*args)` in a worker; raise TimeoutError after `timeout` seconds"""
+        self.start()
+        return await asyncio.get_running_loop().run_in_executor(self._threads, self._run, args, timeout)
+
+    def shutdown(self):
+        with self._lock:
+            threads, self._threads = self._threads, None
+            workers, self._workers = self._workers, []
+        if threads:
+            threads.shutdown(wait=False, cancel_futures=True)
+        for worker in workers:
+            worker.kill()
+        self._idle = queue.Queue()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_code_executor(func: Callable, **kwargs) -> CodeExecutorPool:
+    """The process-wide pool running `func`, created with `kwargs` on first use."""
+    with _pools_lock:
+        pool = _pools.get(func)
+        if pool is None:
+            pool = _pools[func] = CodeExecutorPool(func, **kwargs)
+        return pool
+
+
+@atexit.register
+def _shutdown_pools():
+    for pool in list(_pools.values()):
+        pool.shutdown()
@@ -3,7 +3,8 @@
 # @Author  : all
 # @Desc    : Evaluation for different datasets
 
-from typing import Dict, Literal, Tuple
+import asyncio
+from typing import Dict, Literal, Optional, Tuple
 
 from metagpt.ext.aflow.benchmark.benchmark import BaseBenchmark
 from metagpt.ext.aflow.benchmark.drop import DROPBenchmark
@@ -12,6 +13,10 @@ from metagpt.ext.aflow.benchmark.hotpotqa import HotpotQABenchmark
 from metagpt.ext.aflow.benchmark.humaneval import HumanEvalBenchmark
 from metagpt.ext.aflow.benchmark.math import MATHBenchmark
 from metagpt.ext.aflow.benchmark.mbpp import MBPPBenchmark
+from metagpt.ext.aflow.scripts.optimizer_utils.cache_utils import (
+    EvaluationCache,
+    workflow_hash,
+)
 
 # If you want to customize tasks, add task types here and provide evaluation functions, just like the ones given above
 DatasetType = Literal["HumanEval", "MBPP", "GSM8K", "MATH", "HotpotQA", "DROP"]
@@ -32,24 +37,44 @@ class Evaluator:
             "MBPP": MBPPBenchmark,
             "DROP": DROPBenchmark,
         }
+        self._benchmarks: Dict[tuple, BaseBenchmark] = {}
 
     async def graph_evaluate(
-        self, dataset: DatasetType, graph, params: dict, path: str, is_test: bool = False
+        self,
+        dataset: DatasetType,
+        graph,
+        params: dict,
+        path: str,
+        is_test: bool = False,
+        seed: int = 0,
+        cache: Optional[EvaluationCache] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
     ) -> Tuple[float, float, float]:
+        """Evaluate `graph` once. With a `cache`, problems this workflow source already answered under `seed` are
+        not sent to the LLM again; a `semaphore` shares the concurrency budget with other evaluations."""
         if dataset not in self.dataset_configs:
             raise ValueError(f"Unsupported dataset: {dataset}")
 
-        data_path = self._get_data_path(dataset, is_test)
-        benchmark_class = self.dataset_configs[dataset]
-        benchmark = benchmark_class(name=dataset, file_path=data_path, log_path=path)
+        benchmark = self._get_benchmark(dataset, path, is_test)
 
         # Use params to configure the graph and benchmark
         configured_graph = await self._configure_graph(dataset, graph, params)
+        if cache is not None:
+            configured_graph = cache.wrap(configured_graph, workflow_hash(graph, params), seed)
         if is_test:
             va_list = None  # For test data, generally use None to test all
         else:
             va_list = None  # Use None to test all Validation data, or set va_list (e.g., [1, 2, 3]) to use partial data
-        return await benchmark.run_evaluation(configured_graph, va_list)
+        return await benchmark.run_evaluation(configured_graph, va_list, semaphore=semaphore)
+
+    def _get_benchmark(self, dataset: DatasetType, path: str, is_test: bool) -> BaseBenchmark:
+        # Concurrent evaluations of one directory share a benchmark, and with it the single mismatch log writer
+        data_path = self._get_data_path(dataset, is_test)
+        key = (dataset, data_path, path)
+        if key not in self._benchmarks:
+            benchmark_class = self.dataset_configs[dataset]
+            self._benchmarks[key] = benchmark_class(name=dataset, file_path=data_path, log_path=path)
+        return self._benchmarks[key]
 
     async def _configure_graph(self, dataset, graph, params: dict):
         # Here you can configure the graph based on params
@@ -2,8 +2,6 @@
 # @Date    : 6/27/2024 17:36 PM
 # @Author  : didi
 # @Desc    : operator demo of aflow
-import asyncio
-import concurrent.futures
 import random
 import sys
 import traceback
@@ -13,6 +11,7 @@ from typing import Dict, List, Tuple
 from tenacity import retry, stop_after_attempt, wait_fixed
 
 from metagpt.actions.action_node import ActionNode
+from metagpt.ext.aflow.scripts.code_executor import get_code_executor
 from metagpt.ext.aflow.scripts.operator_an import (
     AnswerGenerateOp,
     CodeGenerateOp,
@@ -164,22 +163,14 @@ class Programmer(Operator):
 
     async def exec_code(self, code, timeout=30):
         """
-        Asynchronously execute code and return an error if timeout occurs.
+        Asynchronously execute code in the shared worker pool and return an error if timeout occurs.
         """
-        loop = asyncio.get_running_loop()
-        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
-            try:
-                # Submit run_code task to the process pool
-                future = loop.run_in_executor(executor, run_code, code)
-                # Wait for the task to complete or timeout
-                result = await asyncio.wait_for(future, timeout=timeout)
-                return result
-            except asyncio.TimeoutError:
-                # Timeout, attempt to shut down the process pool
-                executor.shutdown(wait=False, cancel_futures=True)
-                return "Error", "Code execution timed out"
-            except Exception as e:
-                return "Error", f"Unknown error: {str(e)}"
+        try:
+            return await get_code_executor(run_code).run(code, timeout=timeout)
+        except TimeoutError:
+            return "Error", "Code execution timed out"
+        except Exception as e:
+            return "Error", f"Unknown error: {str(e)}"
 
     async def code_generate(self, problem, analysis, feedback, mode):
         """
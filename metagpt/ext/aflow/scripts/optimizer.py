@@ -4,7 +4,6 @@
 # @Desc    : optimizer for graph
 
 import asyncio
-import time
 from typing import List, Literal
 
 from pydantic import BaseModel, Field
@@ -43,6 +42,7 @@ class Optimizer:
         initial_round: int = 1,
         max_rounds: int = 20,
         validation_rounds: int = 5,
+        max_concurrent_tasks: int = 50,
     ) -> None:
         self.optimize_llm_config = opt_llm_config
         self.optimize_llm = create_llm_instance(self.optimize_llm_config)
@@ -65,28 +65,28 @@ class Optimizer:
         self.graph_utils = GraphUtils(self.root_path)
         self.data_utils = DataUtils(self.root_path)
         self.experience_utils = ExperienceUtils(self.root_path)
-        self.evaluation_utils = EvaluationUtils(self.root_path)
+        self.evaluation_utils = EvaluationUtils(self.root_path, max_concurrent_tasks=max_concurrent_tasks)
         self.convergence_utils = ConvergenceUtils(self.root_path)
 
     def optimize(self, mode: OptimizerType = "Graph"):
+        asyncio.run(self.aoptimize(mode))
+
+    async def aoptimize(self, mode: OptimizerType = "Graph"):
+        """Run every round on one event loop. Requests are paced by the LLM rate limiter configured on the
+        execution and optimization models (rpm, tpm, max_concurrency), not by sleeping between rounds."""
         if mode == "Test":
             test_n = 3  # validation datasets's execution number
             for i in range(test_n):
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                score = loop.run_until_complete(self.test())
+                await self.test(seed=i)
             return None
 
         for opt_round in range(self.max_rounds):
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
             retry_count = 0
             max_retries = 1
 
             while retry_count < max_retries:
                 try:
-                    score = loop.run_until_complete(self._optimize_graph())
+                    score = await self._optimize_graph()
                     break
                 except Exception as e:
                     retry_count += 1
@@ -95,13 +95,6 @@ class Optimizer:
                         logger.info("Max retries reached. Moving to next round.")
                         score = None
 
-                    wait_time = 5 * retry_count
-                    time.sleep(wait_time)
-
-                if retry_count < max_retries:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-
             self.round += 1
             logger.info(f"Score for round {self.round}: {score}")
 
@@ -115,8 +108,6 @@ class Optimizer:
                 self.convergence_utils.print_results()
                 break
 
-            time.sleep(5)
-
     async def _optimize_graph(self):
         validation_n = self.validation_rounds  # validation datasets's execution number
         graph_path = f"{self.root_path}/workflows"
@@ -178,7 +169,7 @@ class Optimizer:
 
         return avg_score
 
-    async def test(self):
+    async def test(self, seed: int = 0):
         rounds = [5]  # You can choose the rounds you want to test here.
         data = []
 
@@ -191,7 +182,9 @@ class Optimizer:
             directory = self.graph_utils.create_round_directory(graph_path, round)
             self.graph = self.graph_utils.load_graph(round, graph_path)
 
-            score, avg_cost, total_cost = await self.evaluation_utils.evaluate_graph_test(self, directory, is_test=True)
+            score, avg_cost, total_cost = await self.evaluation_utils.evaluate_graph_test(
+                self, directory, is_test=True, seed=seed
+            )
 
             new_data = self.data_utils.create_result_data(round, score, avg_cost, total_cost)
             data.append(new_data)
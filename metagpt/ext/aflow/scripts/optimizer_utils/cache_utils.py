@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# @Desc    : Persistent cache of workflow outputs per problem, so unchanged workflows are not evaluated twice
+import hashlib
+import inspect
+import json
+import pickle
+import sqlite3
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from pydantic_core import to_jsonable_python
+
+from metagpt.logs import logger
+
+EVAL_CACHE_FILE = "eval_cache.db"
+
+
+def workflow_hash(graph_class: type, params: dict) -> str:
+    """Hash of the workflow's source files (graph.py, prompt.py, ...) and the parameters it is configured with"""
+    digest = hashlib.sha256()
+    try:
+        round_dir = Path(inspect.getfile(graph_class)).parent
+        sources = sorted(round_dir.glob("*.py"))
+    except (TypeError, OSError):
+        sources = []
+    if sources:
+        for source in sources:
+            digest.update(source.name.encode())
+            digest.update(source.read_bytes())
+    else:
+        digest.update(inspect.getsource(graph_class).encode())
+    digest.update(json.dumps(params, sort_keys=True, default=to_jsonable_python).encode())
+    return digest.hexdigest()
+
+
+class EvaluationCache:
+    """Outputs of workflow calls keyed by (workflow source hash, problem, seed), stored in SQLite.
+
+    The seed tells repeated evaluations of the same workflow apart: validation pass `i` runs with seed `i`, so
+    re-running a round reuses every pass instead of collapsing them into one sample.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outputs ("
+            "workflow TEXT, problem TEXT, seed INTEGER, output BLOB, PRIMARY KEY (workflow, problem, seed))"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def problem_id(*args) -> str:
+        return hashlib.sha256(json.dumps(args, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, workflow: str, problem: str, seed: int) -> Optional[Any]:
+        row = self._conn.execute(
+            "SELECT output FROM outputs WHERE workflow = ? AND problem = ? AND seed = ?", (workflow, problem, seed)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def set(self, workflow: str, problem: str, seed: int, output: Any):
+        try:
+            blob = pickle.dumps(output)
+        except Exception as e:
+            logger.warning(f"Not caching an unpicklable workflow output: {e}")
+            return
+        self._conn.execute("INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?)", (workflow, problem, seed, blob))
+        self._conn.commit()
+
+    def wrap(self, graph: Callable, workflow: str, seed: int) -> "CachedGraph":
+        return CachedGraph(graph, self, workflow, seed)
+
+    def close(self):
+        self._conn.close()
+
+
+class CachedGraph:
+    """A configured workflow that answers problems from an `EvaluationCache` before calling the LLM"""
+
+    def __init__(self, graph: Callable, cache: EvaluationCache, workflow: str, seed: int):
+        self.graph = graph
+        self.cache = cache
+        self.workflow = workflow
+        self.seed = seed
+
+    def __getattr__(self, name):
+        return getattr(self.graph, name)
+
+    def _current_cost(self) -> Optional[float]:
+        cost_manager = getattr(getattr(self.graph, "llm", None), "cost_manager", None)
+        return cost_manager.total_cost if cost_manager is not None else None
+
+    async def __call__(self, *args):
+        problem = self.cache.problem_id(*args)
+        output = self.cache.get(self.workflow, problem, self.seed)
+        if output is None:
+            output = await self.graph(*args)
+            self.cache.set(self.workflow, problem, self.seed, output)
+            return output
+        # Workflows return (answer, cumulative cost); a cached answer adds no cost to this run
+        cost = self._current_cost()
+        if isinstance(output, tuple) and len(output) > 1 and cost is not None:
+            output = (*output[:-1], cost)
+        return output
@@ -6,6 +6,7 @@ import random
 import numpy as np
 import pandas as pd
 
+from metagpt.ext.aflow.benchmark.benchmark import MISMATCH_LOG
 from metagpt.logs import logger
 from metagpt.utils.common import read_json_file, write_json_file
 
@@ -88,28 +89,20 @@ class DataUtils:
 
         return mixed_prob
 
-    def load_log(self, cur_round, path=None, mode: str = "Graph"):
+    def load_log(self, cur_round, path=None, mode: str = "Graph", sample_size: int = 3):
         if mode == "Graph":
-            log_dir = os.path.join(self.root_path, "workflows", f"round_{cur_round}", "log.json")
+            log_dir = os.path.join(self.root_path, "workflows", f"round_{cur_round}", MISMATCH_LOG)
         else:
             log_dir = path
 
-        # 检查文件是否存在
-        if not os.path.exists(log_dir):
+        legacy_log_dir = os.path.splitext(log_dir)[0] + ".json"
+        if log_dir.endswith(".jsonl") and os.path.exists(log_dir):
+            logger.info(log_dir)
+            random_samples = self._sample_jsonl(log_dir, sample_size)
+        elif os.path.exists(legacy_log_dir):
+            random_samples = self._sample_legacy_log(legacy_log_dir, sample_size)
+        else:
             return ""  # 如果文件不存在，返回空字符串
-        logger.info(log_dir)
-        data = read_json_file(log_dir, encoding="utf-8")
-
-        if isinstance(data, dict):
-            data = [data]
-        elif not isinstance(data, list):
-            data = list(data)
-
-        if not data:
-            return ""
-
-        sample_size = min(3, len(data))
-        random_samples = random.sample(data, sample_size)
 
         log = ""
         for sample in random_samples:
@@ -117,6 +110,44 @@ class DataUtils:
 
         return log
 
+    @staticmethod
+    def _sample_jsonl(log_path: str, sample_size: int) -> list:
+        """Reservoir-sample records from a JSONL log in one pass, keeping only the sampled lines in memory"""
+        reservoir = []
+        seen = 0
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                seen += 1
+                if len(reservoir) < sample_size:
+                    reservoir.append(line)
+                else:
+                    index = random.randrange(seen)
+                    if index < sample_size:
+                        reservoir[index] = line
+        samples = []
+        for line in reservoir:
+            try:
+                samples.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping corrupt line in {log_path}")
+        random.shuffle(samples)
+        return samples
+
+    @staticmethod
+    def _sample_legacy_log(log_path: str, sample_size: int) -> list:
+        """Sample records from a log.json written before the JSONL mismatch log"""
+        logger.info(log_path)
+        data = read_json_file(log_path, encoding="utf-8")
+
+        if isinstance(data, dict):
+            data = [data]
+        elif not isinstance(data, list):
+            data = list(data)
+
+        return random.sample(data, min(sample_size, len(data)))
+
     def get_results_file_path(self, graph_path: str) -> str:
         return os.path.join(graph_path, "results.json")
 
@@ -1,63 +1,74 @@
+import asyncio
+import os
+
 from metagpt.ext.aflow.scripts.evaluator import Evaluator
+from metagpt.ext.aflow.scripts.optimizer_utils.cache_utils import (
+    EVAL_CACHE_FILE,
+    EvaluationCache,
+)
 
 
 class EvaluationUtils:
-    def __init__(self, root_path: str):
+    def __init__(self, root_path: str, max_concurrent_tasks: int = 50, use_cache: bool = True):
         self.root_path = root_path
+        self.max_concurrent_tasks = max_concurrent_tasks
+        self.use_cache = use_cache
+        self._cache = None
+
+    @property
+    def cache(self):
+        if self.use_cache and self._cache is None:
+            self._cache = EvaluationCache(os.path.join(self.root_path, EVAL_CACHE_FILE))
+        return self._cache
+
+    async def _evaluate_passes(self, optimizer, directory, validation_n, is_test=False, seed=0):
+        """Run `validation_n` evaluations concurrently; together they evaluate at most `max_concurrent_tasks`
+        problems at a time. Pass `i` runs with seed `seed + i`."""
+        evaluator = Evaluator(eval_path=directory)
+        semaphore = asyncio.Semaphore(self.max_concurrent_tasks)
+        return await asyncio.gather(
+            *(
+                evaluator.graph_evaluate(
+                    optimizer.dataset,
+                    optimizer.graph,
+                    {"dataset": optimizer.dataset, "llm_config": optimizer.execute_llm_config},
+                    directory,
+                    is_test=is_test,
+                    seed=seed + i,
+                    cache=self.cache,
+                    semaphore=semaphore,
+                )
+                for i in range(validation_n)
+            )
+        )
 
     async def evaluate_initial_round(self, optimizer, graph_path, directory, validation_n, data):
         # 使用 optimizer 的 graph_utils 来加载图
         optimizer.graph = optimizer.graph_utils.load_graph(optimizer.round, graph_path)
-        evaluator = Evaluator(eval_path=directory)
-
-        for i in range(validation_n):
-            score, avg_cost, total_cost = await evaluator.graph_evaluate(
-                optimizer.dataset,
-                optimizer.graph,
-                {"dataset": optimizer.dataset, "llm_config": optimizer.execute_llm_config},
-                directory,
-                is_test=False,
-            )
 
+        for score, avg_cost, total_cost in await self._evaluate_passes(optimizer, directory, validation_n):
             new_data = optimizer.data_utils.create_result_data(optimizer.round, score, avg_cost, total_cost)
             data.append(new_data)
 
-            result_path = optimizer.data_utils.get_results_file_path(graph_path)
-            optimizer.data_utils.save_results(result_path, data)
+        result_path = optimizer.data_utils.get_results_file_path(graph_path)
+        optimizer.data_utils.save_results(result_path, data)
 
         return data
 
     async def evaluate_graph(self, optimizer, directory, validation_n, data, initial=False):
-        evaluator = Evaluator(eval_path=directory)
+        cur_round = optimizer.round + 1 if initial is False else optimizer.round
         sum_score = 0
 
-        for i in range(validation_n):
-            score, avg_cost, total_cost = await evaluator.graph_evaluate(
-                optimizer.dataset,
-                optimizer.graph,
-                {"dataset": optimizer.dataset, "llm_config": optimizer.execute_llm_config},
-                directory,
-                is_test=False,
-            )
-
-            cur_round = optimizer.round + 1 if initial is False else optimizer.round
-
+        for score, avg_cost, total_cost in await self._evaluate_passes(optimizer, directory, validation_n):
             new_data = optimizer.data_utils.create_result_data(cur_round, score, avg_cost, total_cost)
             data.append(new_data)
-
-            result_path = optimizer.data_utils.get_results_file_path(f"{optimizer.root_path}/workflows")
-            optimizer.data_utils.save_results(result_path, data)
-
             sum_score += score
 
+        result_path = optimizer.data_utils.get_results_file_path(f"{optimizer.root_path}/workflows")
+        optimizer.data_utils.save_results(result_path, data)
+
         return sum_score / validation_n
 
-    async def evaluate_graph_test(self, optimizer, directory, is_test=True):
-        evaluator = Evaluator(eval_path=directory)
-        return await evaluator.graph_evaluate(
-            optimizer.dataset,
-            optimizer.graph,
-            {"dataset": optimizer.dataset, "llm_config": optimizer.execute_llm_config},
-            directory,
-            is_test=is_test,
-        )
+    async def evaluate_graph_test(self, optimizer, directory, is_test=True, seed=0):
+        results = await self._evaluate_passes(optimizer, directory, 1, is_test=is_test, seed=seed)
+        return results[0]
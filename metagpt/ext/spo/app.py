@@ -1,4 +1,6 @@
 import asyncio
+import threading
+from collections import deque
 from pathlib import Path
 from typing import Dict
 
@@ -9,6 +11,11 @@ from loguru import logger as _logger
 from metagpt.const import METAGPT_ROOT
 from metagpt.ext.spo.components.optimizer import PromptOptimizer
 from metagpt.ext.spo.utils.llm_client import SPO_LLM, RequestType
+from metagpt.ext.spo.utils.log_channel import LogChannel
+
+# Log lines kept on the page, and how often (in seconds) the page polls for new ones
+LOG_TAIL = 500
+LOG_POLL_INTERVAL = 0.5
 
 
 def load_yaml_template(template_path: Path) -> Dict:
@@ -194,25 +201,11 @@ def main():
         st.subheader("Optimization Logs")
         log_container = st.empty()
 
-        class StreamlitSink:
-            def write(self, message):
-                current_logs = st.session_state.get("logs", [])
-                current_logs.append(message.strip())
-                st.session_state.logs = current_logs
-
-                log_container.code("\n".join(current_logs), language="plaintext")
-
-        streamlit_sink = StreamlitSink()
         _logger.remove()
 
         def prompt_optimizer_filter(record):
             return "optimizer" in record["name"].lower()
 
-        _logger.add(
-            streamlit_sink.write,
-            format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}",
-            filter=prompt_optimizer_filter,
-        )
         _logger.add(METAGPT_ROOT / "logs/{time:YYYYMMDD}.txt", level="DEBUG")
 
         # Start optimization button
@@ -220,7 +213,7 @@ def main():
             try:
                 # Initialize LLM
                 SPO_LLM.initialize(
-                    optimize_kwargs={"model": opt_model, "temperature": opt_temp},
+                    optimize_kwargs={"model": opt_model, "temperature": opt_temp, "stream": True},
                     evaluate_kwargs={"model": eval_model, "temperature": eval_temp},
                     execute_kwargs={"model": exec_model, "temperature": exec_temp},
                 )
@@ -234,9 +227,33 @@ def main():
                     name=template_name,
                 )
 
-                # Run optimization with progress bar
+                # Run the optimization in a worker thread and poll its log channel, so the page only renders
+                # the last LOG_TAIL lines plus the optimizer output being streamed
+                channel = LogChannel(maxlen=LOG_TAIL)
+                errors = []
+
+                def run_optimizer():
+                    with channel.attach(filter=prompt_optimizer_filter):
+                        try:
+                            optimizer.optimize()
+                        except Exception as e:
+                            errors.append(e)
+
+                worker = threading.Thread(target=run_optimizer, daemon=True)
                 with st.spinner("Optimizing prompts..."):
-                    optimizer.optimize()
+                    worker.start()
+                    logs, since = deque(maxlen=LOG_TAIL), 0
+                    while worker.is_alive():
+                        worker.join(LOG_POLL_INTERVAL)
+                        new_lines, since = channel.read(since)
+                        logs.extend(new_lines)
+                        partial = channel.partial
+                        log_container.code(
+                            "\n".join(logs) + (f"\n\n{partial}" if partial else ""), language="plaintext"
+                        )
+                    st.session_state.logs = list(logs)
+                if errors:
+                    raise errors[0]
 
                 st.success("Optimization completed!")
 
@@ -250,6 +267,8 @@ def main():
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
                 _logger.error(f"Error during optimization: {str(e)}")
+        elif st.session_state.get("logs"):
+            log_container.code("\n".join(st.session_state.logs), language="plaintext")
 
         if st.session_state.optimization_results:
             st.header("Optimization Results")
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# @Desc    : headless command line runner for SPO
+
+import argparse
+import sys
+from pathlib import Path
+
+from metagpt.ext.spo.components.job_queue import JobQueue, list_templates
+from metagpt.ext.spo.utils.llm_client import SPO_LLM, ResponseCache
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="spo", description="Optimize one or more SPO templates without the web UI, several at a time"
+    )
+
+    # Jobs parameter
+    parser.add_argument(
+        "--template",
+        type=str,
+        nargs="+",
+        default=[],
+        help="Template file names in the settings directory, or absolute paths",
+    )
+    parser.add_argument("--all", action="store_true", help="Optimize every template in the settings directory")
+    parser.add_argument("--name", type=str, default="", help="Project name (single template only, default: its stem)")
+    parser.add_argument("--workers", type=int, default=4, help="Templates optimized concurrently")
+    parser.add_argument(
+        "--llm-max-concurrency", type=int, default=None, help="In-flight LLM requests allowed across all jobs"
+    )
+
+    # LLM parameter
+    parser.add_argument("--opt-model", type=str, default="claude-3-5-sonnet-20240620", help="Model for optimization")
+    parser.add_argument("--opt-temp", type=float, default=0.7, help="Temperature for optimization")
+    parser.add_argument("--eval-model", type=str, default="gpt-4o-mini", help="Model for evaluation")
+    parser.add_argument("--eval-temp", type=float, default=0.3, help="Temperature for evaluation")
+    parser.add_argument("--exec-model", type=str, default="gpt-4o-mini", help="Model for execution")
+    parser.add_argument("--exec-temp", type=float, default=0, help="Temperature for execution")
+
+    # PromptOptimizer parameter
+    parser.add_argument("--workspace", type=str, default="workspace", help="Path for optimized output")
+    parser.add_argument("--initial-round", type=int, default=1, help="Initial round number")
+    parser.add_argument("--max-rounds", type=int, default=10, help="Maximum number of rounds")
+    parser.add_argument("--beam-width", type=int, default=1, help="Number of candidate prompts per round")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Maximum candidates evaluated concurrently")
+    parser.add_argument("--qa-seed", type=int, default=None, help="Seed for the per-round QA sample")
+    parser.add_argument(
+        "--qa-strategy", type=str, default="random", choices=["random", "round_robin"], help="QA sampling strategy"
+    )
+    parser.add_argument("--max-cost", type=float, default=None, help="Stop once the LLM cost (USD) reaches this")
+    parser.add_argument("--max-tokens", type=int, default=None, help="Stop once this many tokens have been used")
+
+    # Response cache parameter
+    parser.add_argument("--cache-path", type=str, default=None, help="SQLite file for cached LLM responses")
+    parser.add_argument("--cache-only", action="store_true", help="Replay from the cache without calling the LLM")
+
+    args = parser.parse_args(argv)
+    if not args.template and not args.all:
+        parser.error("give at least one --template, or --all")
+    if args.name and (args.all or len(args.template) > 1):
+        parser.error("--name can only be used with a single template")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    cache = ResponseCache(args.cache_path, cache_only=args.cache_only) if args.cache_path else None
+    SPO_LLM.initialize(
+        optimize_kwargs={"model": args.opt_model, "temperature": args.opt_temp},
+        evaluate_kwargs={"model": args.eval_model, "temperature": args.eval_temp},
+        execute_kwargs={"model": args.exec_model, "temperature": args.exec_temp},
+        cache=cache,
+        max_concurrency=args.llm_max_concurrency,
+    )
+
+    queue = JobQueue(
+        args.workspace,
+        workers=args.workers,
+        initial_round=args.initial_round,
+        max_rounds=args.max_rounds,
+        beam_width=args.beam_width,
+        max_concurrency=args.max_concurrency,
+        qa_seed=args.qa_seed,
+        qa_strategy=args.qa_strategy,
+        max_cost=args.max_cost,
+        max_tokens=args.max_tokens,
+    )
+    templates = list_templates() if args.all else args.template
+    for template in templates:
+        queue.submit(template, name=args.name)
+
+    statuses = queue.run()
+    for name, status in statuses.items():
+        print(f"{name}: {status} ({Path(args.workspace) / name})")
+    return 0 if all(status == "completed" for status in statuses.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
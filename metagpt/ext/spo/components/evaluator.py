@@ -4,11 +4,12 @@
 # @Desc    : Evaluation for different datasets
 import asyncio
 import random
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 from metagpt.ext.spo.prompts.evaluate_prompt import EVALUATE_PROMPT
-from metagpt.ext.spo.utils import load
+from metagpt.ext.spo.utils.cost_utils import BudgetExceededError
 from metagpt.ext.spo.utils.llm_client import SPO_LLM, RequestType, extract_content
+from metagpt.ext.spo.utils.load import Template
 from metagpt.logs import logger
 
 
@@ -17,19 +18,35 @@ class QuickExecute:
     Execute Prompt
     """
 
-    def __init__(self, prompt: str):
+    def __init__(self, prompt: str, template: Template, qa: Optional[List[dict]] = None):
         self.prompt = prompt
+        self.template = template
+        self.qa = qa
         self.llm = SPO_LLM.get_instance()
 
     async def prompt_execute(self) -> tuple[Any]:
-        _, _, qa, _ = load.load_meta_data()
+        qa = self.qa if self.qa is not None else self.template.sample_qa()
         answers = []
 
+        if self.llm.is_batch_enabled(RequestType.EXECUTE):
+            questions = [item["question"] for item in qa]
+            messages_list = [[{"role": "user", "content": f"{self.prompt}\n\n{q}"}] for q in questions]
+            try:
+                responses = await self.llm.batch_responser(RequestType.EXECUTE, messages_list)
+            except BudgetExceededError:
+                raise
+            except Exception as e:
+                logger.error(f"Batch execution failed: {e}")
+                responses = [str(e)] * len(questions)
+            return [{"question": q, "answer": answer} for q, answer in zip(questions, responses)]
+
         async def fetch_answer(q: str) -> Dict[str, Any]:
             messages = [{"role": "user", "content": f"{self.prompt}\n\n{q}"}]
             try:
                 answer = await self.llm.responser(request_type=RequestType.EXECUTE, messages=messages)
                 return {"question": q, "answer": answer}
+            except BudgetExceededError:
+                raise
             except Exception as e:
                 return {"question": q, "answer": str(e)}
 
@@ -44,11 +61,14 @@ class QuickEvaluate:
     Complete the evaluation for different answers here.
     """
 
-    def __init__(self):
+    def __init__(self, template: Template, qa: Optional[List[dict]] = None):
+        self.template = template
+        self.qa = qa
         self.llm = SPO_LLM.get_instance()
 
     async def prompt_evaluate(self, samples: dict, new_samples: dict) -> bool:
-        _, requirement, qa, _ = load.load_meta_data()
+        requirement = self.template.requirements
+        qa = self.qa if self.qa is not None else self.template.sample_qa()
 
         if random.random() < 0.5:
             samples, new_samples = new_samples, samples
@@ -70,6 +90,8 @@ class QuickEvaluate:
             choose = extract_content(response, "choose")
             return choose == "A" if is_swapped else choose == "B"
 
+        except BudgetExceededError:
+            raise
         except Exception as e:
             logger.error(e)
             return False
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# @Desc    : run many SPO optimizations concurrently and report their progress
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from metagpt.ext.spo.components.optimizer import PromptOptimizer
+from metagpt.ext.spo.utils.load import SETTINGS_PATH
+from metagpt.logs import logger
+
+PROGRESS_FILE = "progress.json"
+
+
+def list_templates(settings_path: Path = SETTINGS_PATH) -> List[str]:
+    """File names of all templates in the settings directory."""
+    return sorted(path.name for path in Path(settings_path).glob("*.yaml"))
+
+
+def load_progress(workspace: str) -> List[dict]:
+    """Read the progress of every job under `workspace`, e.g. for a UI polling a running queue."""
+    progress = []
+    for path in sorted(Path(workspace).glob(f"*/{PROGRESS_FILE}")):
+        try:
+            progress.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read progress file {path}: {e}")
+    return progress
+
+
+class SPOJob:
+    """One template to optimize. Its state is mirrored to `<workspace>/<name>/progress.json`."""
+
+    def __init__(self, template: str, workspace: str, name: str = "", **optimizer_kwargs):
+        self.template = template
+        self.name = name or Path(template).stem
+        self.workspace = workspace
+        self.optimizer_kwargs = optimizer_kwargs
+        self.progress_path = Path(workspace) / self.name / PROGRESS_FILE
+
+        self.status = "queued"
+        self.round = None
+        self.best_round = None
+        self.usage = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "template": self.template,
+            "status": self.status,
+            "round": self.round,
+            "max_rounds": self.optimizer_kwargs.get("max_rounds", 10),
+            "best_round": self.best_round,
+            "usage": self.usage,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "updated_at": time.time(),
+        }
+
+    def write_progress(self):
+        self.progress_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.progress_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.progress_path)
+
+    def _on_round_end(self, optimizer: PromptOptimizer):
+        self.round = optimizer.round
+        self.best_round = optimizer.data_utils.get_best_round()["round"]
+        self.usage = optimizer.usage.total().model_dump()
+        self.write_progress()
+
+    async def run(self):
+        self.status = "running"
+        self.started_at = time.time()
+        self.write_progress()
+        try:
+            optimizer = PromptOptimizer(
+                optimized_path=self.workspace, name=self.name, template=self.template, **self.optimizer_kwargs
+            )
+            await optimizer.aoptimize(on_round_end=self._on_round_end)
+            self.usage = optimizer.usage.total().model_dump()
+            self.status = "budget_exceeded" if optimizer.stop_reason else "completed"
+            self.error = optimizer.stop_reason
+        except Exception as e:
+            logger.exception(f"SPO job '{self.name}' failed: {e}")
+            self.status = "failed"
+            self.error = str(e)
+        self.finished_at = time.time()
+        self.write_progress()
+
+
+class JobQueue:
+    """Run SPO jobs on `workers` concurrent workers sharing the event loop and the global `SPO_LLM`.
+
+    The total number of in-flight LLM requests is bounded by `SPO_LLM.initialize(..., max_concurrency=...)`, not by
+    the number of workers. A failing job is recorded in its progress file and does not stop the others.
+    """
+
+    def __init__(self, workspace: str, workers: int = 4, **optimizer_kwargs):
+        self.workspace = workspace
+        self.workers = max(1, workers)
+        self.optimizer_kwargs = optimizer_kwargs
+        self.jobs: List[SPOJob] = []
+
+    def submit(self, template: str, name: str = "", **optimizer_kwargs) -> SPOJob:
+        names = {job.name for job in self.jobs}
+        job = SPOJob(template, self.workspace, name=name, **{**self.optimizer_kwargs, **optimizer_kwargs})
+        if job.name in names:
+            raise ValueError(f"Duplicate SPO job name '{job.name}'")
+        job.write_progress()
+        self.jobs.append(job)
+        return job
+
+    def run(self) -> Dict[str, str]:
+        return asyncio.run(self.arun())
+
+    async def arun(self) -> Dict[str, str]:
+        """Run every submitted job and return the final status of each, by job name."""
+        queue = asyncio.Queue()
+        for job in self.jobs:
+            if job.status == "queued":
+                queue.put_nowait(job)
+
+        async def worker():
+            while not queue.empty():
+                job = queue.get_nowait()
+                logger.info(f"Starting SPO job '{job.name}' ({job.template})")
+                await job.run()
+                logger.info(f"SPO job '{job.name}' {job.status}")
+
+        await asyncio.gather(*(worker() for _ in range(min(self.workers, queue.qsize()))))
+        return {job.name: job.status for job in self.jobs}
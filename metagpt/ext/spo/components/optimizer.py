@@ -5,13 +5,21 @@
 
 import asyncio
 from pathlib import Path
-from typing import List
+from typing import Callable, List, Optional, Union
 
 from metagpt.ext.spo.prompts.optimize_prompt import PROMPT_OPTIMIZE_PROMPT
-from metagpt.ext.spo.utils import load
+from metagpt.ext.spo.utils.cost_utils import USAGE_FILE, BudgetExceededError, RunUsage
 from metagpt.ext.spo.utils.data_utils import DataUtils
-from metagpt.ext.spo.utils.evaluation_utils import EvaluationUtils
+from metagpt.ext.spo.utils.evaluation_utils import (
+    EVALUATION_CONFIDENCE,
+    EVALUATION_MIN_REPETITION,
+    EVALUATION_REPETITION,
+    EvaluationUtils,
+    count_tokens,
+    win_probability,
+)
 from metagpt.ext.spo.utils.llm_client import SPO_LLM, RequestType, extract_content
+from metagpt.ext.spo.utils.load import QASampler, Template, load_template
 from metagpt.ext.spo.utils.prompt_utils import PromptUtils
 from metagpt.logs import logger
 
@@ -23,7 +31,16 @@ class PromptOptimizer:
         initial_round: int = 1,
         max_rounds: int = 10,
         name: str = "",
-        template: str = "",
+        template: Union[str, Template] = "",
+        beam_width: int = 1,
+        max_concurrency: int = 4,
+        min_evaluations: int = EVALUATION_MIN_REPETITION,
+        max_evaluations: int = EVALUATION_REPETITION,
+        evaluation_confidence: float = EVALUATION_CONFIDENCE,
+        qa_seed: Optional[int] = None,
+        qa_strategy: str = "random",
+        max_cost: Optional[float] = None,
+        max_tokens: Optional[int] = None,
     ) -> None:
         self.name = name
         self.root_path = Path(optimized_path) / self.name
@@ -31,18 +48,51 @@ class PromptOptimizer:
         self.round = initial_round
         self.max_rounds = max_rounds
         self.template = template
+        self.beam_width = max(1, beam_width)
+        self.max_concurrency = max(1, max_concurrency)
+        self.qa_sampler = QASampler(seed=qa_seed, strategy=qa_strategy)
 
         self.prompt_utils = PromptUtils(self.root_path)
         self.data_utils = DataUtils(self.root_path)
-        self.evaluation_utils = EvaluationUtils(self.root_path)
+        self.evaluation_utils = EvaluationUtils(
+            self.root_path,
+            min_repetitions=min_evaluations,
+            max_repetitions=max_evaluations,
+            confidence=evaluation_confidence,
+        )
+        self.usage = RunUsage(self.root_path / "prompts" / USAGE_FILE, max_cost=max_cost, max_tokens=max_tokens)
+        self.stop_reason: Optional[str] = None
         self.llm = SPO_LLM.get_instance()
 
     def optimize(self):
-        for opt_round in range(self.max_rounds):
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(self._optimize_prompt())
-            self.round += 1
+        asyncio.run(self.aoptimize())
+
+    async def aoptimize(self, on_round_end: Optional[Callable[["PromptOptimizer"], None]] = None):
+        """Run all rounds on the current event loop so the LLM clients can reuse their connection pools.
+
+        `on_round_end` is called with the optimizer after each round, before `self.round` advances. When the usage
+        budget runs out the run stops cleanly and `self.stop_reason` tells why.
+        """
+        logger.info(f"QA sampling strategy: {self.qa_sampler.strategy}, seed: {self.qa_sampler.seed}")
+        with self.usage.track():
+            for opt_round in range(self.max_rounds):
+                self.stop_reason = self.usage.budget_exceeded()
+                if self.stop_reason:
+                    logger.warning(f"Stopping before round {self.round}: {self.stop_reason}")
+                    break
+
+                self.usage.round = self.round
+                try:
+                    await self._optimize_prompt()
+                except BudgetExceededError as e:
+                    self.stop_reason = str(e)
+                    logger.warning(f"Stopping during round {self.round}: {e}")
+                    break
+                finally:
+                    self.usage.save()
+                if on_round_end:
+                    on_round_end(self)
+                self.round += 1
 
         self.show_final_result()
 
@@ -51,49 +101,66 @@ class PromptOptimizer:
 
         logger.info("\n" + "=" * 50)
         logger.info("\n🏆 OPTIMIZATION COMPLETED - FINAL RESULTS 🏆\n")
-        logger.info(f"\n📌 Best Performing Round: {best_round['round']}")
-        logger.info(f"\n🎯 Final Optimized Prompt:\n{best_round['prompt']}")
+        if best_round:
+            logger.info(f"\n📌 Best Performing Round: {best_round['round']}")
+            logger.info(f"\n🎯 Final Optimized Prompt:\n{best_round['prompt']}")
+        for request_type, usage in self.usage.by_type().items():
+            logger.info(
+                f"\n💰 {request_type}: {usage.calls} calls ({usage.cached_calls} cached), "
+                f"{usage.prompt_tokens} prompt + {usage.completion_tokens} completion tokens, "
+                f"${usage.cost:.4f}, {usage.latency:.1f}s"
+            )
+        if self.stop_reason:
+            logger.info(f"\n⛔ Stopped early: {self.stop_reason}")
+        if self.llm.cache:
+            stats = self.llm.cache.stats()
+            logger.info(f"\n💾 Response Cache: {stats['hits']} hits, {stats['misses']} misses")
         logger.info("\n" + "=" * 50 + "\n")
 
     async def _optimize_prompt(self):
         prompt_path = self.root_path / "prompts"
-        load.set_file_name(self.template)
-        data = self.data_utils.load_results(prompt_path)
+        template = load_template(self.template)
+        qa = self.qa_sampler.sample(template, self.round)
 
         if self.round == 1:
-            await self._handle_first_round(prompt_path, data)
+            await self._handle_first_round(prompt_path, template, qa)
             return
 
         directory = self.prompt_utils.create_round_directory(
             prompt_path, self.round)
-        new_prompt = await self._generate_optimized_prompt()
+
+        if self.beam_width > 1:
+            success = await self._optimize_prompt_beam(prompt_path, directory, template, qa)
+            self._log_optimization_result(success)
+            return self.prompt
+
+        new_prompt = await self._generate_optimized_prompt(template, qa)
         self.prompt = new_prompt
 
         logger.info(f"\nRound {self.round} Prompt: {self.prompt}\n")
         self.prompt_utils.write_prompt(directory, prompt=self.prompt)
 
-        success, answers = await self._evaluate_new_prompt(prompt_path, data, directory)
+        success, answers = await self._evaluate_new_prompt(prompt_path, directory, template, qa)
         self._log_optimization_result(success)
 
         return self.prompt
 
-    async def _handle_first_round(self, prompt_path: Path, data: List[dict]) -> None:
+    async def _handle_first_round(self, prompt_path: Path, template: Template, qa: List[dict]) -> None:
         logger.info("\n⚡ RUNNING Round 1 PROMPT ⚡\n")
         directory = self.prompt_utils.create_round_directory(
             prompt_path, self.round)
 
-        prompt, _, _, _ = load.load_meta_data()
-        self.prompt = prompt
+        self.prompt = template.prompt
         self.prompt_utils.write_prompt(directory, prompt=self.prompt)
 
-        new_samples = await self.evaluation_utils.execute_prompt(self, directory)
+        new_samples = await self.evaluation_utils.execute_prompt(self, directory, template, qa)
         _, answers = await self.evaluation_utils.evaluate_prompt(
-            self, None, new_samples, path=prompt_path, data=data, initial=True
+            self, None, new_samples, path=prompt_path, template=template, qa=qa, initial=True, **self._sample_record()
         )
         self.prompt_utils.write_answers(directory, answers=answers)
 
-    async def _generate_optimized_prompt(self):
-        _, requirements, qa, count = load.load_meta_data()
+    async def _generate_optimized_prompt(self, template: Template, qa: List[dict]):
+        requirements, count = template.requirements, template.count
         samples = self.data_utils.get_best_round()
 
         logger.info(f"\n🚀Round {self.round} OPTIMIZATION STARTING 🚀\n")
@@ -122,19 +189,91 @@ class PromptOptimizer:
         prompt = extract_content(response, "prompt")
         return prompt if prompt else ""
 
-    async def _evaluate_new_prompt(self, prompt_path, data, directory):
+    async def _evaluate_new_prompt(self, prompt_path, directory, template: Template, qa: List[dict]):
         logger.info("\n⚡ RUNNING OPTIMIZED PROMPT ⚡\n")
-        new_samples = await self.evaluation_utils.execute_prompt(self, directory)
+        new_samples = await self.evaluation_utils.execute_prompt(self, directory, template, qa)
 
         logger.info("\n📊 EVALUATING OPTIMIZED PROMPT 📊\n")
         samples = self.data_utils.get_best_round()
         success, answers = await self.evaluation_utils.evaluate_prompt(
-            self, samples, new_samples, path=prompt_path, data=data, initial=False
+            self,
+            samples,
+            new_samples,
+            path=prompt_path,
+            template=template,
+            qa=qa,
+            initial=False,
+            **self._sample_record(),
         )
 
         self.prompt_utils.write_answers(directory, answers=answers)
         return success, answers
 
+    async def _optimize_prompt_beam(
+        self, prompt_path: Path, directory: Path, template: Template, qa: List[dict]
+    ) -> bool:
+        """Generate, execute and judge `beam_width` candidates concurrently and keep the best one."""
+        samples = self.data_utils.get_best_round()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_candidate(index: int) -> dict:
+            async with semaphore:
+                candidate_dir = directory / f"candidate_{index}"
+                candidate_dir.mkdir(parents=True, exist_ok=True)
+
+                prompt = await self._generate_optimized_prompt(template, qa)
+                logger.info(f"\nRound {self.round} Candidate {index} Prompt: {prompt}\n")
+                self.prompt_utils.write_prompt(candidate_dir, prompt=prompt)
+
+                new_samples = await self.evaluation_utils.execute_prompt(self, candidate_dir, template, qa)
+                evaluation_results = await self.evaluation_utils.judge_prompt(samples, new_samples, template, qa)
+                self.prompt_utils.write_answers(candidate_dir, answers=new_samples["answers"])
+
+                return {
+                    "candidate": index,
+                    "samples": new_samples,
+                    "wins": evaluation_results.count(True),
+                    "losses": evaluation_results.count(False),
+                }
+
+        logger.info(f"\n⚡ RUNNING {self.beam_width} CANDIDATE PROMPTS ⚡\n")
+        candidates = await asyncio.gather(*(run_candidate(i) for i in range(self.beam_width)))
+
+        best = self._select_candidate(candidates)
+        success = best["wins"] > best["losses"]
+
+        for candidate in candidates:
+            new_samples = candidate["samples"]
+            self.data_utils.append_result(
+                prompt_path,
+                self.data_utils.create_result_data(
+                    new_samples["round"],
+                    new_samples["answers"],
+                    new_samples["prompt"],
+                    success and candidate is best,
+                    count_tokens(new_samples),
+                    candidate=candidate["candidate"],
+                    wins=candidate["wins"],
+                    **self._sample_record(),
+                ),
+            )
+
+        logger.info(f"\nRound {self.round} selected candidate {best['candidate']} ({best['wins']} wins)\n")
+        self.prompt = best["samples"]["prompt"]
+        self.prompt_utils.write_prompt(directory, prompt=self.prompt)
+        self.prompt_utils.write_answers(directory, answers=best["samples"]["answers"])
+
+        return success
+
+    @staticmethod
+    def _select_candidate(candidates: List[dict]) -> dict:
+        """The candidate most likely to beat the best round; ties go to more wins, then to the lower index."""
+        # Early stopping leaves candidates with different numbers of judge calls, so wins - losses is not comparable
+        return max(candidates, key=lambda c: (win_probability(c["wins"], c["losses"]), c["wins"], -c["candidate"]))
+
+    def _sample_record(self) -> dict:
+        return {"qa_seed": self.qa_sampler.seed, "qa_strategy": self.qa_sampler.strategy}
+
     def _log_optimization_result(self, success):
         logger.info("\n🎯 OPTIMIZATION RESULT 🎯\n")
         logger.info(
@@ -0,0 +1,152 @@
+import json
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from metagpt.logs import logger
+from metagpt.utils.cost_manager import CostManager
+
+USAGE_FILE = "usage.json"
+
+
+class BudgetExceededError(Exception):
+    """Raised before an LLM call once a run has used up its budget."""
+
+
+class Usage(BaseModel):
+    calls: int = 0
+    cached_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    latency: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, other: "Usage"):
+        for field in Usage.model_fields:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+
+class RunUsage:
+    """Token, cost and latency accounting of one optimization run, split by round and request type.
+
+    Usage is collected from every LLM call made while `track()` is active, including calls in tasks spawned inside
+    it. With `path` the records are persisted (and reloaded, so a resumed run keeps its history). `max_cost` (USD)
+    and `max_tokens` are a hard budget over everything recorded: once reached, further LLM calls raise
+    `BudgetExceededError`.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        max_cost: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ):
+        self.path = Path(path) if path else None
+        self.max_cost = max_cost
+        self.max_tokens = max_tokens
+        self.round = 0
+        self.rounds: Dict[int, Dict[str, Usage]] = {}
+        if self.path and self.path.exists():
+            self._load()
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable usage file {self.path}: {e}")
+            return
+        for round_, by_type in data.get("rounds", {}).items():
+            self.rounds[int(round_)] = {request_type: Usage(**usage) for request_type, usage in by_type.items()}
+
+    def add(self, request_type: str, usage: Usage):
+        self.rounds.setdefault(self.round, {}).setdefault(request_type, Usage()).add(usage)
+
+    def by_type(self) -> Dict[str, Usage]:
+        totals: Dict[str, Usage] = {}
+        for by_type in self.rounds.values():
+            for request_type, usage in by_type.items():
+                totals.setdefault(request_type, Usage()).add(usage)
+        return totals
+
+    def total(self, request_type: Optional[str] = None) -> Usage:
+        total = Usage()
+        for key, usage in self.by_type().items():
+            if request_type is None or key == request_type:
+                total.add(usage)
+        return total
+
+    def budget_exceeded(self) -> Optional[str]:
+        """Describe the exhausted budget, or return None while the run may continue."""
+        total = self.total()
+        if self.max_cost is not None and total.cost >= self.max_cost:
+            return f"cost ${total.cost:.4f} reached the budget of ${self.max_cost:.4f}"
+        if self.max_tokens is not None and total.total_tokens >= self.max_tokens:
+            return f"{total.total_tokens} tokens reached the budget of {self.max_tokens} tokens"
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            "budget": {"max_cost": self.max_cost, "max_tokens": self.max_tokens},
+            "total": self.total().model_dump(),
+            "by_type": {request_type: usage.model_dump() for request_type, usage in self.by_type().items()},
+            "rounds": {
+                str(round_): {request_type: usage.model_dump() for request_type, usage in by_type.items()}
+                for round_, by_type in sorted(self.rounds.items())
+            },
+        }
+
+    def save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def track(self) -> Iterator["RunUsage"]:
+        token = _active_usages.set(_active_usages.get() + (self,))
+        try:
+            yield self
+        finally:
+            _active_usages.reset(token)
+
+
+_active_usages: ContextVar[Tuple[RunUsage, ...]] = ContextVar("spo_active_usages", default=())
+
+
+def record_usage(request_type: str, **usage):
+    """Add the usage of one LLM call to every `RunUsage` tracking the current context."""
+    for run_usage in _active_usages.get():
+        run_usage.add(request_type, Usage(**usage))
+
+
+def check_budget():
+    for run_usage in _active_usages.get():
+        reason = run_usage.budget_exceeded()
+        if reason:
+            raise BudgetExceededError(f"SPO budget exhausted: {reason}")
+
+
+class SPOCostManager(CostManager):
+    """CostManager of one SPO request type, forwarding the usage of each call to the tracked runs."""
+
+    request_type: str = ""
+
+    def update_cost(self, prompt_tokens, completion_tokens, model):
+        total_cost = self.total_cost
+        super().update_cost(prompt_tokens, completion_tokens, model)
+        record_usage(
+            self.request_type,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost=self.total_cost - total_cost,
+        )
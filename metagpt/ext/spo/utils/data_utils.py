@@ -1,80 +1,96 @@
+import argparse
 import datetime
 import json
+import os
 from pathlib import Path
-from typing import Dict, List, Union
-
-import pandas as pd
+from typing import Dict, List, Optional
 
 from metagpt.logs import logger
 
 
 class DataUtils:
+    """Round results are kept in an append-only JSONL log with an in-memory index of the best round."""
+
     def __init__(self, root_path: Path):
         self.root_path = root_path
-        self.top_scores = []
+        self._results: Optional[List[dict]] = None
+        self._best_round: Optional[dict] = None
 
     def load_results(self, path: Path) -> list:
-        result_path = self.get_results_file_path(path)
-        if result_path.exists():
-            try:
-                return json.loads(result_path.read_text())
-            except json.JSONDecodeError:
-                return []
-        return []
+        if self._results is None:
+            self._load_log(path)
+        return self._results
 
     def get_best_round(self):
-        self._load_scores()
-
-        for entry in self.top_scores:
-            if entry["succeed"]:
-                return entry
-
-        return None
+        if self._results is None:
+            self._load_log(self.root_path / "prompts")
+        return self._best_round
 
     def get_results_file_path(self, prompt_path: Path) -> Path:
-        return prompt_path / "results.json"
+        return prompt_path / "results.jsonl"
 
-    def create_result_data(self, round: int, answers: list[dict], prompt: str, succeed: bool, tokens: int) -> dict:
+    def create_result_data(
+        self, round: int, answers: list[dict], prompt: str, succeed: bool, tokens: int, **extra
+    ) -> dict:
         now = datetime.datetime.now()
-        return {"round": round, "answers": answers, "prompt": prompt, "succeed": succeed, "tokens": tokens, "time": now}
-
-    def save_results(self, json_file_path: Path, data: Union[List, Dict]):
-        json_path = json_file_path
-        json_path.write_text(json.dumps(data, default=str, indent=4))
-
-    def _load_scores(self):
-        rounds_dir = self.root_path / "prompts"
-        result_file = rounds_dir / "results.json"
-        self.top_scores = []
-
-        try:
-            if not result_file.exists():
-                logger.warning(f"Results file not found at {result_file}")
-                return self.top_scores
-
-            data = json.loads(result_file.read_text(encoding="utf-8"))
-            df = pd.DataFrame(data)
-
-            for index, row in df.iterrows():
-                self.top_scores.append(
-                    {
-                        "round": row["round"],
-                        "succeed": row["succeed"],
-                        "prompt": row["prompt"],
-                        "answers": row["answers"],
-                    }
-                )
-
-            self.top_scores.sort(key=lambda x: x["round"], reverse=True)
-
-        except FileNotFoundError:
-            logger.error(f"Could not find results file: {result_file}")
-        except json.JSONDecodeError:
-            logger.error(f"Invalid JSON format in file: {result_file}")
-        except Exception as e:
-            logger.error(f"Unexpected error loading scores: {str(e)}")
-
-        return self.top_scores
+        return {
+            "round": round,
+            "answers": answers,
+            "prompt": prompt,
+            "succeed": succeed,
+            "tokens": tokens,
+            "time": now,
+            **extra,
+        }
+
+    def append_result(self, prompt_path: Path, data: Dict):
+        """Append one round record to the log and flush it to disk before updating the index."""
+        if self._results is None:
+            self._load_log(prompt_path)
+
+        result_path = self.get_results_file_path(prompt_path)
+        result_path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(data, default=str, ensure_ascii=False) + "\n"
+        with result_path.open("a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._index(data)
+
+    def _index(self, entry: dict):
+        self._results.append(entry)
+        if entry.get("succeed") and (self._best_round is None or entry["round"] > self._best_round["round"]):
+            self._best_round = entry
+
+    def _load_log(self, prompt_path: Path):
+        self._results = []
+        self._best_round = None
+
+        result_path = self.get_results_file_path(prompt_path)
+        legacy_path = prompt_path / "results.json"
+        if not result_path.exists() and legacy_path.exists():
+            convert_results_json(legacy_path, result_path)
+
+        if not result_path.exists():
+            logger.warning(f"Results file not found at {result_path}")
+            return
+
+        raw = result_path.read_bytes()
+        if raw and not raw.endswith(b"\n"):
+            # A crash in the middle of an append leaves a partial last line; drop it so new records stay valid.
+            raw = raw[: raw.rfind(b"\n") + 1]
+            with result_path.open("r+b") as f:
+                f.truncate(len(raw))
+            logger.warning(f"Dropped a truncated record at the end of {result_path}")
+
+        for line in raw.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._index(json.loads(line))
+            except json.JSONDecodeError:
+                logger.error(f"Invalid JSON record in file: {result_path}")
 
     def list_to_markdown(self, questions_list: list):
         """
@@ -104,3 +120,33 @@ class DataUtils:
         markdown_text += "\n```"
 
         return markdown_text
+
+
+def convert_results_json(json_path: Path, jsonl_path: Optional[Path] = None) -> Path:
+    """Convert a legacy `results.json` list into the JSONL round log, written atomically next to it."""
+    json_path = Path(json_path)
+    jsonl_path = Path(jsonl_path) if jsonl_path else json_path.with_suffix(".jsonl")
+
+    try:
+        data = json.loads(json_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        logger.error(f"Invalid JSON format in file: {json_path}")
+        data = []
+
+    tmp_path = jsonl_path.with_suffix(".jsonl.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        for entry in data:
+            f.write(json.dumps(entry, default=str, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, jsonl_path)
+
+    logger.info(f"Converted {len(data)} records from {json_path} to {jsonl_path}")
+    return jsonl_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert SPO results.json files into results.jsonl round logs")
+    parser.add_argument("paths", nargs="+", type=Path, help="results.json files to convert")
+    for path in parser.parse_args().paths:
+        convert_results_json(path)
@@ -1,80 +1,137 @@
 import asyncio
+import math
 from pathlib import Path
 from typing import Any, List, Optional, Tuple
 
 import tiktoken
 
 from metagpt.ext.spo.components.evaluator import QuickEvaluate, QuickExecute
+from metagpt.ext.spo.utils.cost_utils import RunUsage
+from metagpt.ext.spo.utils.llm_client import RequestType
+from metagpt.ext.spo.utils.load import Template
 from metagpt.logs import logger
 
 EVALUATION_REPETITION = 4
+EVALUATION_MIN_REPETITION = 3
+EVALUATION_CONFIDENCE = 0.95
 
 
 def count_tokens(sample: dict):
     if not sample:
         return 0
+    elif sample.get("tokens") is not None:
+        return sample["tokens"]
     else:
         encoding = tiktoken.get_encoding("cl100k_base")
         return len(encoding.encode(str(sample["answers"])))
 
 
+def win_probability(wins: int, losses: int) -> float:
+    """P(the judge prefers the new sample more than half of the time) under a uniform Beta prior."""
+    # For integer a, b: P(p <= 0.5 | Beta(a, b)) = P(Binomial(a + b - 1, 0.5) >= a)
+    a, b = wins + 1, losses + 1
+    n = a + b - 1
+    lose_probability = sum(math.comb(n, k) for k in range(a, n + 1)) / 2**n
+    return 1 - lose_probability
+
+
+def is_decided(wins: int, losses: int, max_repetitions: int, confidence: float) -> bool:
+    """Whether further judge calls are unnecessary: the majority is fixed or the winner is confidently known."""
+    remaining = max_repetitions - wins - losses
+    if remaining <= 0 or wins > losses + remaining or wins + remaining <= losses:
+        return True
+    probability = win_probability(wins, losses)
+    return probability >= confidence or probability <= 1 - confidence
+
+
 class EvaluationUtils:
-    def __init__(self, root_path: Path) -> None:
+    def __init__(
+        self,
+        root_path: Path,
+        min_repetitions: int = EVALUATION_MIN_REPETITION,
+        max_repetitions: int = EVALUATION_REPETITION,
+        confidence: float = EVALUATION_CONFIDENCE,
+    ) -> None:
         self.root_path = root_path
+        self.max_repetitions = max(1, max_repetitions)
+        self.min_repetitions = min(max(1, min_repetitions), self.max_repetitions)
+        self.confidence = confidence
 
-    async def execute_prompt(self, optimizer: Any, prompt_path: Path) -> dict:
-        optimizer.prompt = optimizer.prompt_utils.load_prompt(optimizer.round, prompt_path)
-        executor = QuickExecute(prompt=optimizer.prompt)
+    async def execute_prompt(
+        self, optimizer: Any, prompt_path: Path, template: Template, qa: Optional[List[dict]] = None
+    ) -> dict:
+        prompt = optimizer.prompt_utils.load_prompt(optimizer.round, prompt_path)
+        executor = QuickExecute(prompt=prompt, template=template, qa=qa)
 
-        answers = await executor.prompt_execute()
+        with RunUsage().track() as usage:
+            answers = await executor.prompt_execute()
 
         cur_round = optimizer.round
 
-        new_data = {"round": cur_round, "answers": answers, "prompt": optimizer.prompt}
+        new_data = {"round": cur_round, "answers": answers, "prompt": prompt}
+        # Completion tokens reported by the provider; count_tokens re-encodes the answers only when some came from
+        # the cache or the provider reported no usage
+        execute_usage = usage.total(RequestType.EXECUTE.value)
+        if execute_usage.calls and not execute_usage.cached_calls and execute_usage.completion_tokens:
+            new_data["tokens"] = execute_usage.completion_tokens
 
         return new_data
 
+    async def judge_prompt(
+        self, samples: dict, new_samples: dict, template: Template, qa: Optional[List[dict]] = None
+    ) -> List[bool]:
+        """Issue judge calls in waves and stop as soon as the comparison is decided."""
+        evaluator = QuickEvaluate(template=template, qa=qa)
+        evaluation_results = []
+        wave = self.min_repetitions
+
+        while wave > 0:
+            evaluation_results.extend(
+                await asyncio.gather(
+                    *(evaluator.prompt_evaluate(samples=samples, new_samples=new_samples) for _ in range(wave))
+                )
+            )
+            wins, losses = evaluation_results.count(True), evaluation_results.count(False)
+            if is_decided(wins, losses, self.max_repetitions, self.confidence):
+                break
+            # Smallest wave that could settle the majority for either side
+            remaining = self.max_repetitions - len(evaluation_results)
+            to_win = self.max_repetitions // 2 + 1 - wins
+            to_lose = math.ceil(self.max_repetitions / 2) - losses
+            wave = min(remaining, max(1, min(to_win, to_lose)))
+
+        saved = self.max_repetitions - len(evaluation_results)
+        logger.info(f"Evaluation Results {evaluation_results} ({saved} judge calls saved)")
+
+        return evaluation_results
+
     async def evaluate_prompt(
         self,
         optimizer: Any,
         samples: Optional[dict],
         new_samples: dict,
         path: Path,
-        data: List[dict],
+        template: Template,
+        qa: Optional[List[dict]] = None,
         initial: bool = False,
+        **extra,
     ) -> Tuple[bool, dict]:
-        evaluator = QuickEvaluate()
         new_token = count_tokens(new_samples)
 
         if initial is True:
             succeed = True
         else:
-            evaluation_results = []
-
-            evaluation_results.extend(
-                await asyncio.gather(
-                    *(
-                        evaluator.prompt_evaluate(samples=samples, new_samples=new_samples)
-                        for _ in range(EVALUATION_REPETITION)
-                    )
-                )
-            )
-
-            logger.info(f"Evaluation Results {evaluation_results}")
+            evaluation_results = await self.judge_prompt(samples, new_samples, template, qa)
 
             true_count = evaluation_results.count(True)
             false_count = evaluation_results.count(False)
             succeed = true_count > false_count
 
         new_data = optimizer.data_utils.create_result_data(
-            new_samples["round"], new_samples["answers"], new_samples["prompt"], succeed, new_token
+            new_samples["round"], new_samples["answers"], new_samples["prompt"], succeed, new_token, **extra
         )
 
-        data.append(new_data)
-
-        result_path = optimizer.data_utils.get_results_file_path(path)
-
-        optimizer.data_utils.save_results(result_path, data)
+        optimizer.data_utils.append_result(path, new_data)
 
         answers = new_samples["answers"]
 
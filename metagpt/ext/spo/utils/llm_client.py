@@ -1,12 +1,39 @@
 import asyncio
+import hashlib
+import json
 import re
+import sqlite3
+import threading
+import time
+from contextlib import nullcontext
 from enum import Enum
-from typing import Any, List, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import httpx
+from openai import APIConnectionError
+from tenacity import (
+    after_log,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 
 from metagpt.configs.models_config import ModelsConfig
 from metagpt.configs.llm_config import LLMConfig
+from metagpt.const import DEFAULT_WORKSPACE_ROOT
+from metagpt.ext.spo.utils.cost_utils import SPOCostManager, check_budget, record_usage
+from metagpt.ext.spo.utils.log_channel import llm_stream
 from metagpt.llm import LLM
 from metagpt.logs import logger
+from metagpt.provider.rate_limiter import LLMRateLimiter
+from metagpt.utils.common import log_and_reraise
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+BATCH_POLL_INTERVAL = 30
+BATCH_DIR = DEFAULT_WORKSPACE_ROOT / "spo_batches"
 
 
 class RequestType(Enum):
@@ -15,7 +42,117 @@ class RequestType(Enum):
     EXECUTE = "execute"
 
 
+class ResponseCache:
+    """Persistent SQLite cache of LLM responses, keyed on a hash of request type, model config and messages.
+
+    Only requests with temperature 0 are cached unless `cache_nonzero_temperature` is set. Entries older than
+    `ttl` seconds are ignored and purged, and the least recently used entries are evicted beyond `max_entries`.
+    With `cache_only`, a miss raises instead of calling the LLM, which allows replaying a run offline.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        ttl: Optional[float] = None,
+        max_entries: int = 100000,
+        cache_only: bool = False,
+        cache_nonzero_temperature: bool = False,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cache_only = cache_only
+        self.cache_nonzero_temperature = cache_nonzero_temperature
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed_at ON responses (accessed_at)")
+
+    def is_cacheable(self, llm_config: LLMConfig) -> bool:
+        return self.cache_nonzero_temperature or not llm_config.temperature
+
+    @staticmethod
+    def make_key(request_type: RequestType, llm_config: LLMConfig, messages: List[dict]) -> str:
+        payload = {
+            "request_type": request_type.value,
+            "api_type": llm_config.api_type.value,
+            "base_url": llm_config.base_url,
+            "model": llm_config.model,
+            "temperature": llm_config.temperature,
+            "top_p": llm_config.top_p,
+            "max_token": llm_config.max_token,
+            "messages": messages,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return row[0]
+
+    def set(self, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
 class SPO_LLM:
+    """LLM access for SPO, one client per request type.
+
+    Besides the LLM settings, each kwargs dict may carry `rpm`, `tpm` and `max_concurrency` to pace requests to that
+    model. They are passed on to the `LLMConfig`, so requests go through the provider's `LLMRateLimiter`, shared by
+    every request type (and every other LLM of the process) using the same model, endpoint and limits.
+
+    `batch=True` routes bulk requests of that type through the provider batch API (see `batch_responser`), polled
+    every `batch_poll_interval` seconds, with the request and result files kept under `batch_dir`. `stream=True` streams
+    the responses of that type, so a `LogChannel` attached by the caller shows them while they are generated.
+
+    Every call is accounted to the `RunUsage` objects tracking the calling context (see `cost_utils`), and refused
+    with `BudgetExceededError` once one of them is over budget.
+
+    `max_concurrency` is a global budget on in-flight requests across all models, shared by every optimizer that runs
+    in the process (e.g. the jobs of a `JobQueue`).
+    """
+
     _instance: Optional["SPO_LLM"] = None
 
     def __init__(
@@ -23,7 +160,13 @@ class SPO_LLM:
         optimize_kwargs: Optional[dict] = None,
         evaluate_kwargs: Optional[dict] = None,
         execute_kwargs: Optional[dict] = None,
+        cache: Optional[ResponseCache] = None,
+        max_concurrency: Optional[int] = None,
     ) -> None:
+        self.cache = cache
+        self.global_limiter = (
+            LLMRateLimiter(max_concurrency=max_concurrency, name="spo") if max_concurrency else None
+        )
         self.evaluate_llm = LLM(
             llm_config=self._load_llm_config(evaluate_kwargs))
         self.optimize_llm = LLM(
@@ -31,6 +174,24 @@ class SPO_LLM:
         self.execute_llm = LLM(
             llm_config=self._load_llm_config(execute_kwargs))
 
+        self.batch_options: Dict[RequestType, Optional[dict]] = {}
+        self.streaming: Dict[RequestType, bool] = {}
+        for request_type, kwargs in (
+            (RequestType.OPTIMIZE, optimize_kwargs),
+            (RequestType.EVALUATE, evaluate_kwargs),
+            (RequestType.EXECUTE, execute_kwargs),
+        ):
+            self.streaming[request_type] = bool(kwargs.get("stream"))
+            self._get_llm(request_type).cost_manager = SPOCostManager(request_type=request_type.value)
+            self.batch_options[request_type] = (
+                {
+                    "poll_interval": kwargs.get("batch_poll_interval", BATCH_POLL_INTERVAL),
+                    "dir": Path(kwargs.get("batch_dir", BATCH_DIR)),
+                }
+                if kwargs.get("batch")
+                else None
+            )
+
     def _load_llm_config(self, kwargs: dict) -> Any:
         model = kwargs.get("model")
         if not model:
@@ -43,7 +204,10 @@ class SPO_LLM:
                 api_type=kwargs.get("api_type", "openai"),
                 base_url=kwargs.get("base_url"),
                 api_key=kwargs.get("api_key"),
-                temperature=kwargs.get("temperature", 0.7)
+                temperature=kwargs.get("temperature", 0.7),
+                rpm=kwargs.get("rpm"),
+                tpm=kwargs.get("tpm"),
+                max_concurrency=kwargs.get("max_concurrency"),
             )
             return model_config
 
@@ -51,7 +215,7 @@ class SPO_LLM:
             raise ValueError(
                 f"Error initializing configuration for model '{model}': {str(e)}")
 
-    async def responser(self, request_type: RequestType, messages: List[dict]) -> str:
+    def _get_llm(self, request_type: RequestType):
         llm_mapping = {
             RequestType.OPTIMIZE: self.optimize_llm,
             RequestType.EVALUATE: self.evaluate_llm,
@@ -62,15 +226,149 @@ class SPO_LLM:
         if not llm:
             raise ValueError(
                 f"Invalid request type. Valid types: {', '.join([t.value for t in RequestType])}")
+        return llm
+
+    def _cache_lookup(self, request_type: RequestType, llm, messages: List[dict]) -> tuple:
+        """Return `(key, cached_response)`; the key is None when the request must not be cached."""
+        key = None
+        if self.cache:
+            if self.cache.is_cacheable(llm.config):
+                key = self.cache.make_key(request_type, llm.config, messages)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return key, cached
+            if self.cache.cache_only:
+                raise RuntimeError(f"No cached response for {request_type.value} request in cache-only mode")
+        return key, None
+
+    def is_batch_enabled(self, request_type: RequestType) -> bool:
+        return self.batch_options.get(request_type) is not None
+
+    async def responser(self, request_type: RequestType, messages: List[dict]) -> str:
+        llm = self._get_llm(request_type)
+
+        key, cached = self._cache_lookup(request_type, llm, messages)
+        if cached is not None:
+            record_usage(request_type.value, calls=1, cached_calls=1)
+            return cached
+
+        check_budget()
+        async with self.global_limiter.limit() if self.global_limiter else nullcontext():
+            start = time.perf_counter()
+            if self.streaming.get(request_type):
+                content = await llm._rate_limited(messages, lambda: self._stream_completion(llm, messages))
+            else:
+                response = await llm._rate_limited(messages, lambda: llm.acompletion(messages))
+                content = response.choices[0].message.content
+            record_usage(request_type.value, calls=1, latency=time.perf_counter() - start)
+
+        if key is not None and content is not None:
+            self.cache.set(key, content)
+        return content
 
-        response = await llm.acompletion(messages)
-        return response.choices[0].message.content
+    @staticmethod
+    @retry(
+        wait=wait_random_exponential(min=1, max=60),
+        stop=stop_after_attempt(6),
+        after=after_log(logger, logger.level("WARNING").name),
+        # a connection dropped while the chunks arrive is not retried by the OpenAI client, so restart the stream
+        retry=retry_if_exception_type((APIConnectionError, httpx.TransportError)),
+        retry_error_callback=log_and_reraise,
+    )
+    async def _stream_completion(llm, messages: List[dict]) -> str:
+        with llm_stream(id(messages)):
+            return await llm._achat_completion_stream(messages)
+
+    async def batch_responser(self, request_type: RequestType, messages_list: List[List[dict]]) -> List[str]:
+        """Answer many requests at once through the provider batch API (OpenAI-compatible `/v1/batches`).
+
+        Cached responses are served directly; the rest are written to a JSONL request file, uploaded as one batch job
+        and polled until it finishes. Requests that failed inside the batch are retried one by one via `responser`.
+        """
+        llm = self._get_llm(request_type)
+        options = self.batch_options.get(request_type) or {"poll_interval": BATCH_POLL_INTERVAL, "dir": BATCH_DIR}
+
+        results: List[Optional[str]] = [None] * len(messages_list)
+        keys: List[Optional[str]] = [None] * len(messages_list)
+        pending = []
+        for i, messages in enumerate(messages_list):
+            keys[i], results[i] = self._cache_lookup(request_type, llm, messages)
+            if results[i] is None:
+                pending.append(i)
+            else:
+                record_usage(request_type.value, calls=1, cached_calls=1)
+        if not pending:
+            return results
+
+        check_budget()
+        start = time.perf_counter()
+
+        batch_dir = Path(options["dir"])
+        batch_dir.mkdir(parents=True, exist_ok=True)
+        request_file = batch_dir / f"{request_type.value}_{int(time.time() * 1000)}_input.jsonl"
+        with request_file.open("w", encoding="utf-8") as f:
+            for i in pending:
+                body = llm._cons_kwargs(messages_list[i])
+                body.pop("timeout", None)
+                line = {"custom_id": f"request-{i}", "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+        client = llm.aclient
+        with request_file.open("rb") as f:
+            input_file = await client.files.create(file=f, purpose="batch")
+        batch = await client.batches.create(
+            input_file_id=input_file.id, endpoint=BATCH_ENDPOINT, completion_window="24h"
+        )
+        logger.info(f"Submitted {request_type.value} batch {batch.id} with {len(pending)} requests")
+
+        while batch.status not in BATCH_TERMINAL_STATUSES:
+            await asyncio.sleep(options["poll_interval"])
+            batch = await client.batches.retrieve(batch.id)
+        logger.info(f"Batch {batch.id} finished with status '{batch.status}'")
+        record_usage(request_type.value, calls=len(pending), latency=time.perf_counter() - start)
+
+        if batch.output_file_id:
+            output = await client.files.content(batch.output_file_id)
+            output_file = request_file.with_name(request_file.name.replace("_input", "_output"))
+            output_file.write_bytes(output.content)
+            for line in output.text.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                response = item.get("response") or {}
+                if response.get("status_code") != 200:
+                    continue
+                i = int(item["custom_id"].split("-", 1)[1])
+                results[i] = response["body"]["choices"][0]["message"]["content"]
+                usage = response["body"].get("usage") or {}
+                llm.cost_manager.update_cost(
+                    usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), response["body"].get("model")
+                )
+                if keys[i] is not None and results[i] is not None:
+                    self.cache.set(keys[i], results[i])
+
+        failed = [i for i in pending if results[i] is None]
+        if failed:
+            logger.warning(f"{len(failed)} requests of batch {batch.id} failed, retrying them individually")
+            retried = await asyncio.gather(
+                *(self.responser(request_type, messages_list[i]) for i in failed), return_exceptions=True
+            )
+            for i, response in zip(failed, retried):
+                results[i] = str(response) if isinstance(response, Exception) else response
+        return results
 
     @classmethod
-    def initialize(cls, optimize_kwargs: dict, evaluate_kwargs: dict, execute_kwargs: dict) -> None:
+    def initialize(
+        cls,
+        optimize_kwargs: dict,
+        evaluate_kwargs: dict,
+        execute_kwargs: dict,
+        cache: Optional[ResponseCache] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> None:
         """Initialize the global instance"""
         cls._instance = cls(optimize_kwargs,
-                            evaluate_kwargs, execute_kwargs)
+                            evaluate_kwargs, execute_kwargs, cache=cache, max_concurrency=max_concurrency)
 
     @classmethod
     def get_instance(cls) -> "SPO_LLM":
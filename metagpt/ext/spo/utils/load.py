@@ -1,48 +1,122 @@
 import random
+import threading
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
 
 import yaml
 
 FILE_NAME = ""
 SAMPLE_K = 3
+SETTINGS_PATH = Path(__file__).parent.parent / "settings"
 
 
-def set_file_name(name: str):
-    global FILE_NAME
-    FILE_NAME = name
+class Template:
+    """Parsed iteration template. Build it through `load_template` so the YAML is only parsed once per change."""
 
+    def __init__(self, path: Path, mtime: float, prompt: str, requirements: str, qa: List[dict], count: str):
+        self.path = path
+        self.mtime = mtime
+        self.prompt = prompt
+        self.requirements = requirements
+        self.qa = qa
+        self.count = count
 
-def load_meta_data(k: int = SAMPLE_K):
-    # load yaml file
-    config_path = Path(__file__).parent.parent / "settings" / FILE_NAME
+    @classmethod
+    def from_file(cls, path: Path) -> "Template":
+        mtime = path.stat().st_mtime
+        try:
+            with path.open("r", encoding="utf-8") as file:
+                data = yaml.safe_load(file)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Error parsing YAML file '{path.name}': {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error reading file '{path.name}': {str(e)}")
 
-    if not config_path.exists():
-        raise FileNotFoundError(f"Configuration file '{FILE_NAME}' not found in settings directory")
+        qa = [{"question": item["question"], "answer": item["answer"]} for item in data["qa"]]
+
+        count = data["count"]
+        if isinstance(count, int):
+            count = f", within {count} words"
+        else:
+            count = ""
+
+        return cls(path, mtime, data["prompt"], data["requirements"], qa, count)
+
+    def sample_qa(self, k: int = SAMPLE_K, seed: Optional[Union[int, str]] = None) -> List[dict]:
+        """Sample up to `k` QA pairs; the same `seed` always gives the same sample."""
+        rng = random.Random(seed) if seed is not None else random
+        return rng.sample(self.qa, min(k, len(self.qa)))
+
+    def meta_data(self, k: int = SAMPLE_K, seed: Optional[Union[int, str]] = None) -> Tuple[str, str, List[dict], str]:
+        return self.prompt, self.requirements, self.sample_qa(k, seed), self.count
+
+
+class QASampler:
+    """Draws one QA sample per round, reused by execution, evaluation and optimization of that round.
+
+    Strategies:
+        random: a seeded random sample per round.
+        round_robin: walk a seeded shuffle of the QA set `k` pairs at a time, covering all pairs every
+            ceil(len(qa) / k) rounds.
+    """
+
+    STRATEGIES = ("random", "round_robin")
 
-    try:
-        with config_path.open("r", encoding="utf-8") as file:
-            data = yaml.safe_load(file)
-    except yaml.YAMLError as e:
-        raise ValueError(f"Error parsing YAML file '{FILE_NAME}': {str(e)}")
-    except Exception as e:
-        raise Exception(f"Error reading file '{FILE_NAME}': {str(e)}")
+    def __init__(self, k: int = SAMPLE_K, seed: Optional[int] = None, strategy: str = "random"):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(
+                f"Unknown QA sampling strategy '{strategy}'. Valid strategies: {', '.join(self.STRATEGIES)}"
+            )
+        self.k = k
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.strategy = strategy
 
-    qa = []
+    def sample(self, template: Template, round: int) -> List[dict]:
+        if self.strategy == "round_robin":
+            order = list(template.qa)
+            random.Random(self.seed).shuffle(order)
+            if not order:
+                return []
+            k = min(self.k, len(order))
+            start = (round - 1) * k
+            return [order[(start + i) % len(order)] for i in range(k)]
+        return template.sample_qa(self.k, seed=f"{self.seed}-{round}")
 
-    for item in data["qa"]:
-        question = item["question"]
-        answer = item["answer"]
-        qa.append({"question": question, "answer": answer})
 
-    prompt = data["prompt"]
-    requirements = data["requirements"]
-    count = data["count"]
+_TEMPLATE_CACHE: Dict[Path, Template] = {}
+_TEMPLATE_LOCK = threading.Lock()
 
-    if isinstance(count, int):
-        count = f", within {count} words"
-    else:
-        count = ""
 
-    random_qa = random.sample(qa, min(k, len(qa)))
+def load_template(template: Union[str, Path, Template]) -> Template:
+    """Return the parsed template, re-parsing only when the file's mtime changed.
 
-    return prompt, requirements, random_qa, count
+    `template` is a file name relative to the settings directory or a path. A `Template` passed explicitly is
+    returned as is.
+    """
+    if isinstance(template, Template):
+        return template
+
+    config_path = Path(template)
+    if not config_path.is_absolute():
+        config_path = SETTINGS_PATH / config_path
+
+    if not config_path.exists():
+        raise FileNotFoundError(f"Configuration file '{config_path.name}' not found in settings directory")
+
+    mtime = config_path.stat().st_mtime
+    with _TEMPLATE_LOCK:
+        cached = _TEMPLATE_CACHE.get(config_path)
+        if cached is None or cached.mtime != mtime:
+            cached = Template.from_file(config_path)
+            _TEMPLATE_CACHE[config_path] = cached
+    return cached
+
+
+def set_file_name(name: str):
+    global FILE_NAME
+    FILE_NAME = name
+
+
+def load_meta_data(k: int = SAMPLE_K):
+    """Deprecated: load the template selected by `set_file_name`. Prefer `load_template(name).meta_data(k)`."""
+    return load_template(FILE_NAME).meta_data(k)
@@ -0,0 +1,106 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from metagpt import logs
+from metagpt.logs import _llm_stream_log, logger, set_llm_stream_logfunc
+
+LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}"
+
+_current_channel: ContextVar[Optional["LogChannel"]] = ContextVar("spo_log_channel", default=None)
+_current_stream: ContextVar[Optional[int]] = ContextVar("spo_stream_id", default=None)
+
+
+class LogChannel:
+    """Bounded log buffer a UI can poll incrementally, plus the partial text of the LLM responses being streamed.
+
+    Every line gets an increasing sequence number, so `read(since)` only returns what the reader has not seen yet.
+    Once `maxlen` lines are buffered the oldest are dropped, which keeps memory and render cost flat on long runs.
+    """
+
+    def __init__(self, maxlen: int = 1000):
+        self.maxlen = maxlen
+        self._lines: deque = deque(maxlen=maxlen)
+        self._next_seq = 0
+        self._partials: Dict[int, List[str]] = {}
+        self._lock = threading.Lock()
+        self._fallback_stream_log: Callable[[str], None] = _llm_stream_log
+
+    def write(self, message: str):
+        """Append a log line; usable directly as a loguru sink."""
+        with self._lock:
+            self._lines.append((self._next_seq, str(message).rstrip("\n")))
+            self._next_seq += 1
+
+    def read(self, since: int = 0) -> Tuple[List[str], int]:
+        """Return the buffered lines with sequence number >= `since`, and the value to pass as `since` next time."""
+        with self._lock:
+            lines = [line for seq, line in self._lines if seq >= since]
+            return lines, self._next_seq
+
+    def tail(self, n: Optional[int] = None) -> List[str]:
+        with self._lock:
+            lines = [line for _, line in self._lines]
+        return lines[-n:] if n else lines
+
+    def stream(self, stream_id: int, chunk: str):
+        with self._lock:
+            self._partials.setdefault(stream_id, []).append(chunk)
+
+    def end_stream(self, stream_id: int):
+        with self._lock:
+            self._partials.pop(stream_id, None)
+
+    @property
+    def partial(self) -> str:
+        """Text received so far for every response still streaming."""
+        with self._lock:
+            return "\n\n".join("".join(chunks) for chunks in self._partials.values())
+
+    @contextmanager
+    def attach(
+        self, filter: Optional[Callable[[dict], bool]] = None, format: str = LOG_FORMAT
+    ) -> Iterator["LogChannel"]:
+        """Collect the logs and streamed LLM output of the current thread into this channel while the block runs."""
+        thread_id = threading.get_ident()
+
+        def thread_filter(record) -> bool:
+            return record["thread"].id == thread_id and (filter is None or filter(record))
+
+        sink_id = logger.add(self.write, format=format, filter=thread_filter)
+        previous_stream_logfunc = logs._llm_stream_log
+        if previous_stream_logfunc is not _stream_log:
+            self._fallback_stream_log = previous_stream_logfunc
+        set_llm_stream_logfunc(_stream_log)
+        token = _current_channel.set(self)
+        try:
+            yield self
+        finally:
+            _current_channel.reset(token)
+            set_llm_stream_logfunc(previous_stream_logfunc)
+            logger.remove(sink_id)
+
+
+@contextmanager
+def llm_stream(stream_id: int) -> Iterator[Optional[LogChannel]]:
+    """Route the chunks streamed inside the block to the current channel, under `stream_id`."""
+    channel = _current_channel.get()
+    token = _current_stream.set(stream_id)
+    try:
+        yield channel
+    finally:
+        _current_stream.reset(token)
+        if channel:
+            channel.end_stream(stream_id)
+
+
+def _stream_log(msg: str):
+    channel, stream_id = _current_channel.get(), _current_stream.get()
+    if channel is None:
+        _llm_stream_log(msg)
+    elif stream_id is None:
+        channel._fallback_stream_log(msg)
+    else:
+        channel.stream(stream_id, msg)
@@ -6,8 +6,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-from pydantic import Field, field_serializer, model_validator
+from pydantic import Field, PrivateAttr, field_serializer, model_validator
 
+from metagpt.ext.stanford_town.memory.memory_index import MemoryIndex
+from metagpt.ext.stanford_town.utils.embedding_service import get_embedding_service
 from metagpt.logs import logger
 from metagpt.memory.memory import Memory
 from metagpt.schema import Message
@@ -115,6 +117,18 @@ class AgentMemory(Memory):
     memory_saved: Optional[Path] = Field(default=None)
     embeddings: dict[str, list[float]] = dict()
 
+    _memory_index: Optional[MemoryIndex] = PrivateAttr(default=None)
+
+    @property
+    def memory_index(self) -> MemoryIndex:
+        """
+        检索用的列式索引，每次访问时追加新加入 storage 的记忆
+        """
+        if self._memory_index is None:
+            self._memory_index = MemoryIndex()
+        self._memory_index.sync(self.storage, self.embeddings)
+        return self._memory_index
+
     def set_mem_path(self, memory_saved: Path):
         self.memory_saved = memory_saved
         self.load(memory_saved)
@@ -143,6 +157,7 @@ class AgentMemory(Memory):
         将GA的JSON解析，填充到AgentMemory类之中
         """
         self.embeddings = read_json_file(memory_saved.joinpath("embeddings.json"))
+        get_embedding_service().prime(self.embeddings)
         memory_load = read_json_file(memory_saved.joinpath("nodes.json"))
         for count in range(len(memory_load.keys())):
             node_id = f"node_{str(count + 1)}"
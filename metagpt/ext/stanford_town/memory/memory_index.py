@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : 列式记忆索引，agent_retrieve 用矩阵运算一次性为全部记忆打分
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy as np
+
+_INITIAL_CAPACITY = 64
+
+
+class MemoryIndex:
+    """
+    AgentMemory 的列式索引：embedding 矩阵以及 poignancy、created、last_accessed 数组，每条记忆占一行
+    记忆按写入 storage 的顺序追加，id_to_node 用于由 memory_id 直接取回 BasicMemory
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.dim = 0
+        self.embeddings = np.empty((0, 0), dtype=np.float32)
+        self.norms = np.empty(0, dtype=np.float32)
+        self.poignancy = np.empty(0, dtype=np.float32)
+        self.created = np.empty(0, dtype="datetime64[us]")
+        self.last_accessed = np.empty(0, dtype="datetime64[us]")
+        self.id_to_row: dict[str, int] = {}
+        self.row_to_id: list[str] = []
+        self.id_to_node: dict = {}
+
+    def _grow(self, size: int):
+        capacity = len(self.poignancy)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, _INITIAL_CAPACITY)
+
+        def resize(array: np.ndarray) -> np.ndarray:
+            grown = np.empty((capacity, *array.shape[1:]), dtype=array.dtype)
+            grown[: self.size] = array[: self.size]
+            return grown
+
+        self.embeddings = resize(self.embeddings)
+        self.norms = resize(self.norms)
+        self.poignancy = resize(self.poignancy)
+        self.created = resize(self.created)
+        self.last_accessed = resize(self.last_accessed)
+
+    def add(self, memory_node, embedding: list[float]):
+        if memory_node.memory_id in self.id_to_row:
+            return
+        vector = np.asarray(embedding, dtype=np.float32)
+        if self.size == 0 and self.dim != len(vector):
+            self.dim = len(vector)
+            self.embeddings = np.empty((0, self.dim), dtype=np.float32)
+        self._grow(self.size + 1)
+
+        row = self.size
+        self.embeddings[row] = vector
+        self.norms[row] = np.linalg.norm(vector)
+        self.poignancy[row] = memory_node.poignancy
+        self.created[row] = _to_datetime64(memory_node.created)
+        self.last_accessed[row] = _to_datetime64(memory_node.last_accessed)
+        self.id_to_row[memory_node.memory_id] = row
+        self.row_to_id.append(memory_node.memory_id)
+        self.id_to_node[memory_node.memory_id] = memory_node
+        self.size += 1
+
+    def sync(self, storage: list, embeddings: dict[str, list[float]]):
+        """追加 storage 中尚未索引的记忆；storage 被清空或替换时重建索引"""
+        if self.size > len(storage) or (self.size and self.id_to_node.get(storage[self.size - 1].memory_id) is None):
+            self.__init__()
+        for memory_node in storage[self.size :]:
+            self.add(memory_node, embeddings[memory_node.embedding_key])
+
+    def rows(self, memory_nodes: Iterable) -> np.ndarray:
+        return np.fromiter((self.id_to_row[node.memory_id] for node in memory_nodes), dtype=np.int64)
+
+    def touch(self, memory_ids: Iterable[str], curr_time: datetime):
+        """更新记忆的 last_accessed（BasicMemory 与索引同步）"""
+        accessed = _to_datetime64(curr_time)
+        for memory_id in memory_ids:
+            self.id_to_node[memory_id].last_accessed = curr_time
+            self.last_accessed[self.id_to_row[memory_id]] = accessed
+
+    def score(
+        self,
+        rows: np.ndarray,
+        query_embedding: list[float],
+        curr_time: datetime,
+        memory_forget: float,
+        weights: tuple = (1, 1, 1),
+    ) -> np.ndarray:
+        """
+        rows 对应记忆的总分：重要性、近因性、相关性各自归一化到 [0, 1] 后按 weights 加权求和
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            relevance = self.embeddings[rows] @ query / (self.norms[rows] * np.linalg.norm(query))
+        relevance = np.nan_to_num(relevance)
+
+        # 与 timedelta.days 一致，按整天向下取整
+        day_count = (_to_datetime64(curr_time) - self.created[rows]) // np.timedelta64(1, "D")
+        recency = np.power(memory_forget, day_count.astype(np.float64))
+
+        importance = self.poignancy[rows].astype(np.float64)
+        return (
+            normalize_array(importance) * weights[0]
+            + normalize_array(recency) * weights[1]
+            + normalize_array(relevance.astype(np.float64)) * weights[2]
+        )
+
+    def top_k(self, rows: np.ndarray, scores: np.ndarray, k: int) -> list[str]:
+        """
+        分数最高的 k 条记忆的 memory_id；同分时按 last_accessed 从新到旧
+        """
+        if not len(rows) or k <= 0:
+            return []
+        order = np.argsort(-self.last_accessed[rows].astype(np.int64), kind="stable")
+        rows, scores = rows[order], scores[order]
+        if k < len(scores):
+            # 第 k 高的分数之上（含同分）的记忆，通常只比 k 条多出几条同分记忆
+            kth_score = scores[np.argpartition(scores, len(scores) - k)[len(scores) - k]]
+            candidates = np.flatnonzero(scores >= kth_score)
+        else:
+            candidates = np.arange(len(scores))
+        candidates = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+        return [self.row_to_id[row] for row in rows[candidates]]
+
+
+def normalize_array(values: np.ndarray, target_min: float = 0, target_max: float = 1) -> np.ndarray:
+    """
+    向量化的 normalize_list_floats：取值全相同时统一为区间中点
+    """
+    if not len(values):
+        return values
+    min_val = values.min()
+    range_val = values.max() - min_val
+    if range_val == 0:
+        return np.full(len(values), (target_max - target_min) / 2)
+    return (values - min_val) * (target_max - target_min) / range_val + target_min
+
+
+def _to_datetime64(time: Optional[datetime]) -> np.datetime64:
+    return np.datetime64(time, "us") if time else np.datetime64("NaT", "us")
@@ -8,6 +8,7 @@ from numpy import dot
 from numpy.linalg import norm
 
 from metagpt.ext.stanford_town.memory.agent_memory import BasicMemory
+from metagpt.ext.stanford_town.utils.embedding_service import get_embedding_service
 from metagpt.ext.stanford_town.utils.utils import get_embedding
 
 
@@ -18,41 +19,23 @@ def agent_retrieve(
     query: str,
     nodes: list[BasicMemory],
     topk: int = 4,
-) -> list[BasicMemory]:
+) -> list[str]:
     """
     Retrieve需要集合Role使用,原因在于Role才具有AgentMemory,scratch
     逻辑:Role调用该函数,self.rc.AgentMemory,self.rc.scratch.curr_time,self.rc.scratch.memory_forget
-    输入希望查询的内容与希望回顾的条数,返回TopK条高分记忆，即List[BasicMemory]
-
-    Score_lists示例
-    {
-        "memory": memories[i],             BasicMemory类
-        "importance": memories[i].poignancy
-        "recency": 衰减因子计算结果
-        "relevance": 搜索结果
-    }
-    """
-    memories = nodes
-    agent_memory_embedding = agent_memory.embeddings
-    memories = sorted(memories, key=lambda memory_node: memory_node.last_accessed, reverse=True)
-
-    score_list = []
-    score_list = extract_importance(memories, score_list)
-    score_list = extract_recency(curr_time, memory_forget, score_list)
-    score_list = extract_relevance(agent_memory_embedding, query, score_list)
-    score_list = normalize_score_floats(score_list, 0, 1)
-
-    total_dict = {}
-    gw = [1, 1, 1]  # 三个因素的权重,重要性,近因性,相关性,
-    for i in range(len(score_list)):
-        total_score = (
-            score_list[i]["importance"] * gw[0] + score_list[i]["recency"] * gw[1] + score_list[i]["relevance"] * gw[2]
-        )
-        total_dict[score_list[i]["memory"].memory_id] = total_score
+    输入希望查询的内容与希望回顾的条数,返回TopK条高分记忆的memory_id
+    打分在 AgentMemory.memory_index 上以矩阵运算完成，与下方逐条计算的 extract_* 函数结果一致
+    """
+    memory_index = agent_memory.memory_index
+    rows = memory_index.rows(nodes)
+    if not len(rows):
+        return []
 
-    result = top_highest_x_values(total_dict, topk)
+    gw = (1, 1, 1)  # 三个因素的权重,重要性,近因性,相关性,
+    scores = memory_index.score(rows, get_embedding(query), curr_time, memory_forget, gw)
+    result = memory_index.top_k(rows, scores, topk)
 
-    return result  # 返回的是一个BasicMemory列表
+    return result  # 返回的是 memory_id 列表
 
 
 def new_agent_retrieve(role, focus_points: list, n_count=30) -> dict:
@@ -61,25 +44,15 @@ def new_agent_retrieve(role, focus_points: list, n_count=30) -> dict:
     输出为字典，键为focus_point，值为对应的记忆列表
     """
     retrieved = dict()
+    nodes = [i for i in role.memory.event_list + role.memory.thought_list if "idle" not in i.embedding_key]
+    memory_index = role.memory.memory_index
+    get_embedding_service().embed_batch(focus_points)  # 所有关注点一次请求，agent_retrieve 中命中缓存
     for focal_pt in focus_points:
-        nodes = [
-            [i.last_accessed, i]
-            for i in role.memory.event_list + role.memory.thought_list
-            if "idle" not in i.embedding_key
-        ]
-        nodes = sorted(nodes, key=lambda x: x[0])
-        nodes = [i for created, i in nodes]
         results = agent_retrieve(
             role.memory, role.scratch.curr_time, role.scratch.recency_decay, focal_pt, nodes, n_count
         )
-        final_result = []
-        for n in results:
-            for i in role.memory.storage:
-                if i.memory_id == n:
-                    i.last_accessed = role.scratch.curr_time
-                    final_result.append(i)
-
-        retrieved[focal_pt] = final_result
+        memory_index.touch(results, role.scratch.curr_time)
+        retrieved[focal_pt] = [memory_index.id_to_node[n] for n in results]
 
     return retrieved
 
@@ -15,7 +15,7 @@ from metagpt.ext.stanford_town.actions.run_reflect_action import (
     AgentPlanThoughtOnConvo,
 )
 from metagpt.ext.stanford_town.memory.retrieve import new_agent_retrieve
-from metagpt.ext.stanford_town.utils.utils import get_embedding
+from metagpt.ext.stanford_town.utils.utils import aget_embedding
 from metagpt.logs import logger
 
 
@@ -122,7 +122,7 @@ async def run_reflect(role: "STRole"):
             s, p, o = await generate_action_event_triple("(" + thought + ")", role)
             keywords = set([s, p, o])
             thought_poignancy = await generate_poig_score(role, "thought", thought)
-            thought_embedding_pair = (thought, get_embedding(thought))
+            thought_embedding_pair = (thought, await aget_embedding(thought))
 
             role.memory.add_thought(
                 created, expiration, s, p, o, thought, keywords, thought_poignancy, thought_embedding_pair, evidence
@@ -206,7 +206,7 @@ async def role_reflect(role: "STRole"):
             s, p, o = await generate_action_event_triple(planning_thought, role)
             keywords = set([s, p, o])
             thought_poignancy = await generate_poig_score(role, "thought", planning_thought)
-            thought_embedding_pair = (planning_thought, get_embedding(planning_thought))
+            thought_embedding_pair = (planning_thought, await aget_embedding(planning_thought))
 
             role.memory.add_thought(
                 created,
@@ -229,7 +229,7 @@ async def role_reflect(role: "STRole"):
             s, p, o = await generate_action_event_triple(memo_thought, role)
             keywords = set([s, p, o])
             thought_poignancy = await generate_poig_score(role, "thought", memo_thought)
-            thought_embedding_pair = (memo_thought, get_embedding(memo_thought))
+            thought_embedding_pair = (memo_thought, await aget_embedding(memo_thought))
 
             role.memory.add_thought(
                 created,
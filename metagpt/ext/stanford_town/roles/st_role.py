@@ -43,7 +43,7 @@ from metagpt.ext.stanford_town.utils.mg_ga_transform import (
     save_environment,
     save_movement,
 )
-from metagpt.ext.stanford_town.utils.utils import get_embedding, path_finder
+from metagpt.ext.stanford_town.utils.utils import aget_embedding, path_finder
 from metagpt.logs import logger
 from metagpt.roles.role import Role, RoleContext
 from metagpt.schema import Message
@@ -217,7 +217,7 @@ class STRole(Role):
         s, p, o = await run_event_triple.run(thought, self)
         keywords = set([s, p, o])
         thought_poignancy = await generate_poig_score(self, "event", whisper)
-        thought_embedding_pair = (thought, get_embedding(thought))
+        thought_embedding_pair = (thought, await aget_embedding(thought))
         self.rc.memory.add_thought(
             created, expiration, s, p, o, thought, keywords, thought_poignancy, thought_embedding_pair, None
         )
@@ -329,7 +329,7 @@ class STRole(Role):
                 if desc_embedding_in in self.rc.memory.embeddings:
                     event_embedding = self.rc.memory.embeddings[desc_embedding_in]
                 else:
-                    event_embedding = get_embedding(desc_embedding_in)
+                    event_embedding = await aget_embedding(desc_embedding_in)
                 event_embedding_pair = (desc_embedding_in, event_embedding)
 
                 # Get event poignancy.
@@ -344,7 +344,7 @@ class STRole(Role):
                     if self.rc.scratch.act_description in self.rc.memory.embeddings:
                         chat_embedding = self.rc.memory.embeddings[self.rc.scratch.act_description]
                     else:
-                        chat_embedding = get_embedding(self.rc.scratch.act_description)
+                        chat_embedding = await aget_embedding(self.rc.scratch.act_description)
                     chat_embedding_pair = (self.rc.scratch.act_description, chat_embedding)
                     chat_poignancy = await generate_poig_score(self, "chat", self.rc.scratch.act_description)
                     chat_node = self.rc.memory.add_chat(
@@ -9,6 +9,7 @@ from metagpt.const import EXAMPLE_PATH
 ST_ROOT_PATH = Path(__file__).parent.parent
 STORAGE_PATH = EXAMPLE_PATH.joinpath("stanford_town/storage")
 TEMP_STORAGE_PATH = EXAMPLE_PATH.joinpath("stanford_town/temp_storage")
+EMBEDDING_CACHE_PATH = TEMP_STORAGE_PATH.joinpath("embedding_cache.jsonl")
 MAZE_ASSET_PATH = ST_ROOT_PATH.joinpath("static_dirs/assets/the_ville")
 PROMPTS_DIR = ST_ROOT_PATH.joinpath("prompts")
 
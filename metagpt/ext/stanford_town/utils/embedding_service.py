@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : 批量、带缓存的 embedding 服务，离线时使用确定性的本地模型
+
+import asyncio
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from openai import AsyncOpenAI, OpenAI
+
+from metagpt.config2 import config
+from metagpt.ext.stanford_town.utils.const import EMBEDDING_CACHE_PATH
+from metagpt.logs import logger
+from metagpt.provider.client_pool import LLM_CLIENT_POOL
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"
+DEFAULT_EMBEDDING_DIM = 1536  # text-embedding-ada-002 的维度，本地模型与之一致
+LOCAL_EMBEDDING_MODEL = "local-hash"
+
+
+def normalize_text(text: str) -> str:
+    text = text.replace("\n", " ")
+    return text or "this is blank"
+
+
+class LocalEmbedding:
+    """
+    确定性的本地 embedding：词与相邻词对哈希到固定维度后归一化
+    用于离线运行与测试，词汇重叠越多的文本余弦相似度越高；与远程模型的向量不在同一空间
+    """
+
+    def __init__(self, dim: int = DEFAULT_EMBEDDING_DIM):
+        self.dim = dim
+
+    def embed(self, text: str) -> list[float]:
+        tokens = re.findall(r"\w+", normalize_text(text).lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        vector = np.zeros(self.dim)
+        for feature in features or [text]:
+            digest = hashlib.sha256(feature.encode()).digest()
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[int.from_bytes(digest[:4], "little") % self.dim] += sign
+        norm = np.linalg.norm(vector)
+        return (vector / norm).tolist() if norm else vector.tolist()
+
+
+class _PendingBatch:
+    """一个事件循环中等待合并的 aembed 请求；Future 与定时器只属于创建它们的循环"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: list[str] = []
+        self.futures: dict[str, asyncio.Future] = {}
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+class EmbeddingService:
+    """
+    Stanford Town 的 embedding 服务
+    1. 并发的 aembed 请求在 max_wait 秒内合并为一次批量的 embeddings 调用，单批最多 batch_size 条；
+       每个事件循环各自排队，多个线程中的循环可以共用一个服务
+    2. 结果按 (model, 文本) 的内容哈希缓存；给定 cache_path 时远程结果追加写入 JSONL 文件，重启后复用
+    3. 远程调用失败时抛出 ValueError，不会混入其他模型的向量；只有 offline=True 时才使用 LocalEmbedding：
+       已缓存的远程结果照常返回，其余文本在本地计算，以单独的键缓存且不写入持久缓存
+    """
+
+    def __init__(
+        self,
+        model: str = DEFAULT_EMBEDDING_MODEL,
+        batch_size: int = 64,
+        max_wait: float = 0.01,
+        cache_path: Optional[Path] = None,
+        offline: bool = False,
+        max_retries: int = 2,
+    ):
+        self.model = model
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.offline = offline
+        self.max_retries = max_retries
+        self.local = LocalEmbedding()
+
+        self.cache: dict[str, list[float]] = {}
+        self.remote_calls = 0
+
+        self._batches: dict[asyncio.AbstractEventLoop, _PendingBatch] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._load_cache()
+
+    def key(self, text: str, local: bool = False) -> str:
+        model = LOCAL_EMBEDDING_MODEL if local else self.model
+        return hashlib.sha256(f"{model}\n{normalize_text(text)}".encode()).hexdigest()
+
+    def _cached(self, text: str) -> Optional[list[float]]:
+        embedding = self.cache.get(self.key(text))
+        if embedding is None and self.offline:
+            embedding = self.cache.get(self.key(text, local=True))
+        return embedding
+
+    def _load_cache(self):
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        with self.cache_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 写入中断留下的半行
+                self.cache[record["key"]] = record["embedding"]
+
+    def _persist(self, records: dict[str, list[float]]):
+        if not self.cache_path or not records:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.cache_path.open("a", encoding="utf-8") as f:
+            f.write("".join(json.dumps({"key": k, "embedding": v}) + "\n" for k, v in records.items()))
+
+    def prime(self, embeddings: dict[str, list[float]]):
+        """
+        导入 AgentMemory.embeddings（embedding_key -> embedding），已有记忆的文本不再重复请求
+        """
+        for text, embedding in embeddings.items():
+            self.cache.setdefault(self.key(text), embedding)
+
+    def _store(self, texts: list[str], embeddings: list[list[float]], local: bool):
+        records = {self.key(text, local=local): embedding for text, embedding in zip(texts, embeddings)}
+        self.cache.update(records)
+        if not local:
+            self._persist(records)
+
+    def _remote_error(self, texts: list[str], exp: Exception) -> ValueError:
+        logger.error(f"embedding {len(texts)} texts with {self.model} failed, exp: {exp}")
+        return ValueError("get_embedding failed")
+
+    def _sync_client(self) -> OpenAI:
+        key = ("stanford_town_embedding", OpenAI, config.llm.api_key)
+        return LLM_CLIENT_POOL.get(key, lambda: OpenAI(api_key=config.llm.api_key, max_retries=self.max_retries))
+
+    def _async_client(self) -> AsyncOpenAI:
+        key = ("stanford_town_embedding", AsyncOpenAI, config.llm.api_key)
+        return LLM_CLIENT_POOL.get(key, lambda: AsyncOpenAI(api_key=config.llm.api_key, max_retries=self.max_retries))
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """同步接口：一次请求补齐所有未缓存的文本"""
+        texts = [normalize_text(text) for text in texts]
+        missing = list(dict.fromkeys(text for text in texts if self._cached(text) is None))
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start : start + self.batch_size]
+            if self.offline:
+                embeddings = [self.local.embed(text) for text in batch]
+            else:
+                try:
+                    self.remote_calls += 1
+                    response = self._sync_client().embeddings.create(input=batch, model=self.model)
+                    embeddings = [item.embedding for item in response.data]
+                except Exception as exp:
+                    raise self._remote_error(batch, exp) from exp
+            self._store(batch, embeddings, local=self.offline)
+        return [self._cached(text) for text in texts]
+
+    def embed(self, text: str) -> list[float]:
+        return self.embed_batch([text])[0]
+
+    async def aembed(self, text: str) -> list[float]:
+        """异步接口：与同一时刻的其他请求合并为批量调用"""
+        text = normalize_text(text)
+        embedding = self._cached(text)
+        if embedding is not None:
+            return embedding
+
+        loop = asyncio.get_running_loop()
+        pending = self._batches.get(loop)
+        if pending is None:
+            pending = self._batches[loop] = _PendingBatch(loop)
+        future = pending.futures.get(text)
+        if future is None:
+            future = pending.futures[text] = loop.create_future()
+            pending.queue.append(text)
+            if len(pending.queue) >= self.batch_size:
+                self._flush(pending)
+            elif pending.flush_handle is None:
+                pending.flush_handle = loop.call_later(self.max_wait, self._flush, pending)
+        return await asyncio.shield(future)
+
+    async def aembed_batch(self, texts: list[str]) -> list[list[float]]:
+        return list(await asyncio.gather(*(self.aembed(text) for text in texts)))
+
+    def _flush(self, pending: _PendingBatch):
+        if pending.flush_handle is not None:
+            pending.flush_handle.cancel()
+            pending.flush_handle = None
+        batch, pending.queue = pending.queue, []
+        if batch:
+            task = pending.loop.create_task(self._resolve(pending, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, pending: _PendingBatch, batch: list[str]):
+        try:
+            if self.offline:
+                embeddings = [self.local.embed(text) for text in batch]
+            else:
+                try:
+                    self.remote_calls += 1
+                    response = await self._async_client().embeddings.create(input=batch, model=self.model)
+                    embeddings = [item.embedding for item in response.data]
+                except Exception as exp:
+                    raise self._remote_error(batch, exp) from exp
+            self._store(batch, embeddings, local=self.offline)
+        except Exception as exp:
+            for text in batch:
+                future = pending.futures.pop(text, None)
+                if future and not future.done():
+                    future.set_exception(exp)
+        else:
+            for text, embedding in zip(batch, embeddings):
+                future = pending.futures.pop(text, None)
+                if future and not future.done():
+                    future.set_result(embedding)
+        if not pending.futures and self._batches.get(pending.loop) is pending:
+            del self._batches[pending.loop]
+
+
+_embedding_services: dict[str, EmbeddingService] = {}
+
+
+def get_embedding_service(model: str = DEFAULT_EMBEDDING_MODEL) -> EmbeddingService:
+    """
+    进程内按模型共享的 embedding 服务；远程结果持久化到 EMBEDDING_CACHE_PATH（缓存键包含模型名），
+    未配置 api_key 时以离线模式使用本地模型
+    """
+    if model not in _embedding_services:
+        _embedding_services[model] = EmbeddingService(
+            model=model, cache_path=EMBEDDING_CACHE_PATH, offline=not config.llm.api_key
+        )
+    return _embedding_services[model]
+
+
+def set_embedding_service(service: EmbeddingService):
+    _embedding_services[service.model] = service
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : 迷宫寻路：预计算的碰撞数组上做 A* 搜索，并缓存常用地址之间的路径
+
+import heapq
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from metagpt.logs import logger
+
+DEFAULT_PATH_CACHE_SIZE = 4096
+
+
+class GridPathFinder:
+    """
+    四连通网格上的最短路径，坐标为 (row, col)
+    碰撞格在构建时转换为布尔数组（blocked），搜索在展平后的数组上进行；
+    路径按 (start, end) 缓存（LRU），迷宫变化时需调用 invalidate 或 update_tile
+    """
+
+    def __init__(self, collision_maze: list, collision_block_char: str, cache_size: int = DEFAULT_PATH_CACHE_SIZE):
+        self.collision_block_char = collision_block_char
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple, tuple] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.load(collision_maze)
+
+    def load(self, collision_maze: list):
+        self.height = len(collision_maze)
+        self.width = len(collision_maze[0]) if collision_maze else 0
+        self.blocked = np.array(collision_maze, dtype=object).reshape(self.height, self.width) == (
+            self.collision_block_char
+        )
+        self._blocked_flat = bytearray(self.blocked.ravel().astype(np.uint8).tobytes())
+        self.invalidate()
+
+    def invalidate(self):
+        """迷宫变化后清空路径缓存"""
+        self._cache.clear()
+
+    def update_tile(self, tile: tuple, blocked: bool):
+        """修改单个格子的碰撞状态，(row, col)"""
+        row, col = tile
+        if self.blocked[row, col] != blocked:
+            self.blocked[row, col] = blocked
+            self._blocked_flat[row * self.width + col] = int(blocked)
+            self.invalidate()
+
+    def find(self, start: tuple, end: tuple) -> Optional[list[tuple]]:
+        """
+        start 到 end 的最短路径（含两端），不可达时返回 None
+        """
+        key = (tuple(start), tuple(end))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            path = self._cache[key]
+            return list(path) if path else None  # 空元组表示不可达
+
+        self.misses += 1
+        path = self._search(*key)
+        self._cache[key] = tuple(path) if path else ()
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return path
+
+    def _search(self, start: tuple, end: tuple) -> Optional[list[tuple]]:
+        width, height = self.width, self.height
+        if not (0 <= end[0] < height and 0 <= end[1] < width) or self._blocked_flat[end[0] * width + end[1]]:
+            return None
+        source = start[0] * width + start[1]
+        target = end[0] * width + end[1]
+        target_row, target_col = end
+        blocked = self._blocked_flat
+        came_from = {source: source}
+        cost = {source: 0}
+        # (f, -g, 格子)：f 相同时优先扩展更深的格子，曼哈顿距离是一致的启发式，首次出堆即最短
+        heap = [(abs(start[0] - target_row) + abs(start[1] - target_col), 0, source)]
+        while heap:
+            _, neg_g, cell = heapq.heappop(heap)
+            if cell == target:
+                break
+            g = -neg_g
+            if g > cost[cell]:
+                continue
+            row, col = divmod(cell, width)
+            for neighbor, valid in (
+                (cell - width, row > 0),
+                (cell - 1, col > 0),
+                (cell + width, row < height - 1),
+                (cell + 1, col < width - 1),
+            ):
+                if not valid or blocked[neighbor] or cost.get(neighbor, g + 2) <= g + 1:
+                    continue
+                cost[neighbor] = g + 1
+                came_from[neighbor] = cell
+                n_row, n_col = divmod(neighbor, width)
+                heapq.heappush(heap, (g + 1 + abs(n_row - target_row) + abs(n_col - target_col), -(g + 1), neighbor))
+        else:
+            return None
+
+        path = [target]
+        while path[-1] != source:
+            path.append(came_from[path[-1]])
+        path.reverse()
+        return [divmod(cell, width) for cell in path]
+
+
+_path_finders: dict[tuple, tuple[list, GridPathFinder]] = {}
+
+
+def get_path_finder(collision_maze: list, collision_block_char: str) -> GridPathFinder:
+    """
+    按迷宫对象复用 GridPathFinder；原地修改迷宫后请调用 invalidate_path_finder
+    """
+    key = (id(collision_maze), collision_block_char)
+    entry = _path_finders.get(key)
+    if entry is None or entry[0] is not collision_maze:
+        entry = _path_finders[key] = (collision_maze, GridPathFinder(collision_maze, collision_block_char))
+    return entry[1]
+
+
+def invalidate_path_finder(collision_maze: list):
+    """迷宫内容变化后重建碰撞数组并清空路径缓存"""
+    for maze, path_finder in list(_path_finders.values()):
+        if maze is collision_maze:
+            path_finder.load(collision_maze)
+
+
+def find_path(collision_maze: list, start: tuple, end: tuple, collision_block_char: str) -> list[tuple]:
+    """
+    (row, col) 坐标的路径；不可达时与旧实现一致只返回 [end]，即原地不动
+    """
+    path = get_path_finder(collision_maze, collision_block_char).find(start, end)
+    if path is None:
+        logger.warning(f"No path from {start} to {end}")
+        return [tuple(end)]
+    return path
@@ -7,13 +7,11 @@ import errno
 import json
 import os
 import shutil
-import time
 from pathlib import Path
 from typing import Union
 
-from openai import OpenAI
-
-from metagpt.config2 import config
+from metagpt.ext.stanford_town.utils.embedding_service import get_embedding_service
+from metagpt.ext.stanford_town.utils.path_finding import find_path
 from metagpt.logs import logger
 
 
@@ -48,21 +46,17 @@ def read_csv_to_list(curr_file: str, header=False, strip_trail=True):
 
 
 def get_embedding(text, model: str = "text-embedding-ada-002"):
-    text = text.replace("\n", " ")
-    embedding = None
-    if not text:
-        text = "this is blank"
-    for idx in range(3):
-        try:
-            embedding = (
-                OpenAI(api_key=config.llm.api_key).embeddings.create(input=[text], model=model).data[0].embedding
-            )
-        except Exception as exp:
-            logger.info(f"get_embedding failed, exp: {exp}, will retry.")
-            time.sleep(5)
-    if not embedding:
-        raise ValueError("get_embedding failed")
-    return embedding
+    """
+    同步获取 embedding，命中缓存时不发请求；异步代码中请使用 aget_embedding
+    """
+    return get_embedding_service(model).embed(text)
+
+
+async def aget_embedding(text, model: str = "text-embedding-ada-002"):
+    """
+    异步获取 embedding，同一时刻的请求合并为一次批量调用
+    """
+    return await get_embedding_service(model).aembed(text)
 
 
 def extract_first_json_dict(data_str: str) -> Union[None, dict]:
@@ -87,6 +81,10 @@ def extract_first_json_dict(data_str: str) -> Union[None, dict]:
 
 
 def path_finder_v2(a, start, end, collision_block_char) -> list[int]:
+    """
+    旧的洪泛寻路，仅作为 path_finding.find_path 的对照（见 examples/stanford_town/benchmark_path_finder.py）
+    """
+
     def make_step(m, k):
         for i in range(len(m)):
             for j in range(len(m[i])):
@@ -160,7 +158,7 @@ def path_finder(collision_maze: list, start: list[int], end: list[int], collisio
     end = (end[1], end[0])
     # END EMERGENCY PATCH
 
-    path = path_finder_v2(collision_maze, start, end, collision_block_char)
+    path = find_path(collision_maze, start, end, collision_block_char)
 
     new_path = []
     for i in path:
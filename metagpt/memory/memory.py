@@ -7,9 +7,9 @@
 @Modified By: mashenquan, 2023-11-1. According to RFC 116: Updated the type of index key.
 """
 from collections import defaultdict
-from typing import DefaultDict, Iterable, Set
+from typing import DefaultDict, Hashable, Iterable, Optional, Set
 
-from pydantic import BaseModel, Field, SerializeAsAny
+from pydantic import BaseModel, Field, PrivateAttr, SerializeAsAny
 
 from metagpt.const import IGNORED_MESSAGE_ID
 from metagpt.schema import Message
@@ -17,19 +17,94 @@ from metagpt.utils.common import any_to_str, any_to_str_set
 
 
 class Memory(BaseModel):
-    """The most basic memory: super-memory"""
+    """The most basic memory: super-memory
+
+    Messages are identified by id: `storage` keeps them in order, and private indexes map each id to its latest
+    position and list the positions of each role and sender, so dedup, news detection and lookups by role do not scan
+    the history. With `ignore_id` all ids are equal, so messages are told apart by role, content, cause_by, sent_from
+    and send_to.
+    """
 
     storage: list[SerializeAsAny[Message]] = []
     index: DefaultDict[str, list[SerializeAsAny[Message]]] = Field(default_factory=lambda: defaultdict(list))
     ignore_id: bool = False
 
+    _positions: dict[Hashable, int] = PrivateAttr(default_factory=dict)
+    _by_role: DefaultDict[str, list[int]] = PrivateAttr(default_factory=lambda: defaultdict(list))
+    _by_sent_from: DefaultDict[str, list[int]] = PrivateAttr(default_factory=lambda: defaultdict(list))
+    _indexed_storage: Optional[list] = PrivateAttr(default=None)
+    _indexed_count: int = PrivateAttr(default=0)
+    _positions_stale: bool = PrivateAttr(default=False)
+    _has_duplicates: bool = PrivateAttr(default=False)
+
+    def __eq__(self, other: object) -> bool:
+        # compare every field, as pydantic does, but not the private state: it is derived from the fields and
+        # rebuilt lazily, so a reloaded memory would otherwise differ from the original
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+        return (
+            type(self) is type(other)
+            and self.__dict__ == other.__dict__
+            and self.__pydantic_extra__ == other.__pydantic_extra__
+        )
+
+    def _key(self, message: Message) -> Hashable:
+        if message.id != IGNORED_MESSAGE_ID:
+            return message.id
+        return message.role, message.content, message.cause_by, message.sent_from, frozenset(message.send_to)
+
+    def _index_message(self, message: Message, position: int):
+        key = self._key(message)
+        if key in self._positions:
+            # storage appended to directly, or deserialized, may hold the same message twice
+            self._has_duplicates = True
+        self._positions[key] = position
+        self._by_role[message.role].append(position)
+        self._by_sent_from[message.sent_from].append(position)
+
+    def _unindex_newest(self, message: Message):
+        """Drop the message just popped from the end of storage from the indexes"""
+        self._indexed_count = len(self.storage)
+        if self._has_duplicates:
+            # an older copy of the message may still be stored; rebuild rather than track every copy
+            self._positions_stale = True
+            return
+        self._positions.pop(self._key(message), None)
+        self._by_role[message.role].pop()
+        self._by_sent_from[message.sent_from].pop()
+
+    def _sync_index(self):
+        """Catch the indexes up with `storage`, which subclasses and callers may also append to or replace"""
+        if (
+            self._indexed_storage is not self.storage
+            or self._indexed_count > len(self.storage)
+            or self._positions_stale
+        ):
+            self._positions.clear()
+            self._by_role.clear()
+            self._by_sent_from.clear()
+            self._indexed_storage = self.storage
+            self._indexed_count = 0
+            self._positions_stale = False
+            self._has_duplicates = False
+        for position in range(self._indexed_count, len(self.storage)):
+            self._index_message(self.storage[position], position)
+        self._indexed_count = len(self.storage)
+
+    def contains(self, message: Message) -> bool:
+        """Whether a message with the same id is already stored"""
+        self._sync_index()
+        return self._key(message) in self._positions
+
     def add(self, message: Message):
         """Add a new message to storage, while updating the index"""
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        if message in self.storage:
+        if self.contains(message):
             return
         self.storage.append(message)
+        self._index_message(message, len(self.storage) - 1)
+        self._indexed_count = len(self.storage)
         if message.cause_by:
             self.index[message.cause_by].append(message)
 
@@ -39,7 +114,13 @@ class Memory(BaseModel):
 
     def get_by_role(self, role: str) -> list[Message]:
         """Return all messages of a specified role"""
-        return [message for message in self.storage if message.role == role]
+        self._sync_index()
+        return [self.storage[position] for position in self._by_role.get(role, [])]
+
+    def get_by_sent_from(self, sent_from: str) -> list[Message]:
+        """Return all messages sent by a specified role"""
+        self._sync_index()
+        return [self.storage[position] for position in self._by_sent_from.get(any_to_str(sent_from), [])]
 
     def get_by_content(self, content: str) -> list[Message]:
         """Return all messages containing a specified content"""
@@ -48,7 +129,9 @@ class Memory(BaseModel):
     def delete_newest(self) -> "Message":
         """delete the newest message from the storage"""
         if len(self.storage) > 0:
+            self._sync_index()
             newest_msg = self.storage.pop()
+            self._unindex_newest(newest_msg)
             if newest_msg.cause_by and newest_msg in self.index[newest_msg.cause_by]:
                 self.index[newest_msg.cause_by].remove(newest_msg)
         else:
@@ -59,7 +142,21 @@ class Memory(BaseModel):
         """Delete the specified message from storage, while updating the index"""
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        self.storage.remove(message)
+        self._sync_index()
+        key = self._key(message)
+        position = self._positions.get(key)
+        if position is None:
+            raise ValueError(f"Message {message.id} is not in memory")
+        if self._has_duplicates:
+            # remove the oldest copy, like list.remove
+            position = next(i for i, stored in enumerate(self.storage) if self._key(stored) == key)
+        stored = self.storage.pop(position)
+        if position == len(self.storage):
+            self._unindex_newest(stored)
+        else:
+            # later messages moved up by one
+            self._indexed_count = len(self.storage)
+            self._positions_stale = True
         if message.cause_by and message in self.index[message.cause_by]:
             self.index[message.cause_by].remove(message)
 
@@ -67,6 +164,7 @@ class Memory(BaseModel):
         """Clear storage and index"""
         self.storage = []
         self.index = defaultdict(list)
+        self._sync_index()
 
     def count(self) -> int:
         """Return the number of messages in storage"""
@@ -82,10 +180,12 @@ class Memory(BaseModel):
 
     def find_news(self, observed: list[Message], k=0) -> list[Message]:
         """find news (previously unseen messages) from the most recent k memories, from all memories when k=0"""
-        already_observed = self.get(k)
+        self._sync_index()
+        start = max(len(self.storage) - k, 0) if k else 0
         news: list[Message] = []
         for i in observed:
-            if i in already_observed:
+            position = self._positions.get(self._key(i))
+            if position is not None and position >= start:
                 continue
             news.append(i)
         return news
@@ -14,7 +14,7 @@ llm:
   pricing_plan: "doubao-lite"
 ```
 """
-from typing import Optional, Union
+from typing import Union
 
 from pydantic import BaseModel
 from volcenginesdkarkruntime import AsyncArk
@@ -37,16 +37,13 @@ class ArkLLM(OpenAILLM):
     见：https://www.volcengine.com/docs/82379/1263482
     """
 
-    aclient: Optional[AsyncArk] = None
-
     def _init_client(self):
         """SDK: https://github.com/openai/openai-python#async-usage"""
         self.model = (
             self.config.endpoint or self.config.model
         )  # endpoint name, See more: https://console.volcengine.com/ark/region:ark+cn-beijing/endpoint
         self.pricing_plan = self.config.pricing_plan or self.model
-        kwargs = self._make_client_kwargs()
-        self.aclient = AsyncArk(**kwargs)
+        self._client_cls = AsyncArk
 
     def _make_client_kwargs(self) -> dict:
         kvs = {
@@ -21,9 +21,8 @@ class AzureOpenAILLM(OpenAILLM):
     """
 
     def _init_client(self):
-        kwargs = self._make_client_kwargs()
         # https://learn.microsoft.com/zh-cn/azure/ai-services/openai/how-to/migration?tabs=python-new%2Cdalle-fix
-        self.aclient = AsyncAzureOpenAI(**kwargs)
+        self._client_cls = AsyncAzureOpenAI
         self.model = self.config.model  # Used in _calc_usage & _cons_kwargs
         self.pricing_plan = self.config.pricing_plan or self.model
 
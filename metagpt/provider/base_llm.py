@@ -10,7 +10,7 @@ from __future__ import annotations
 
 import json
 from abc import ABC, abstractmethod
-from typing import Optional, Union
+from typing import Awaitable, Callable, Optional, TypeVar, Union
 
 from openai import AsyncOpenAI
 from pydantic import BaseModel
@@ -25,10 +25,17 @@ from tenacity import (
 from metagpt.configs.llm_config import LLMConfig
 from metagpt.const import LLM_API_TIMEOUT, USE_CONFIG_TIMEOUT
 from metagpt.logs import logger
+from metagpt.provider.rate_limiter import (
+    LLMRateLimiter,
+    estimate_tokens,
+    get_rate_limiter,
+)
 from metagpt.schema import Message
 from metagpt.utils.common import log_and_reraise
 from metagpt.utils.cost_manager import CostManager, Costs
 
+T = TypeVar("T")
+
 
 class BaseLLM(ABC):
     """LLM API abstract class, requiring all inheritors to provide a series of standard capabilities"""
@@ -102,6 +109,18 @@ class BaseLLM(ABC):
     def _default_system_msg(self):
         return self._system_msg(self.system_prompt)
 
+    @property
+    def rate_limiter(self) -> Optional[LLMRateLimiter]:
+        """The limiter shared by every LLM of the same endpoint and model, None unless LLMConfig sets limits"""
+        return get_rate_limiter(self.config)
+
+    async def _rate_limited(self, messages: list[dict], call: Callable[[], Awaitable[T]]) -> T:
+        """Await `call()` under the rate limiter, if any"""
+        limiter = self.rate_limiter
+        if not limiter:
+            return await call()
+        return await limiter.run(call, tokens=estimate_tokens(messages))
+
     def _update_costs(self, usage: Union[dict, BaseModel], model: str = None, local_calc_usage: bool = True):
         """update each request's token cost
         Args:
@@ -112,6 +131,8 @@ class BaseLLM(ABC):
         model = model or self.pricing_plan
         model = model or self.model
         usage = usage.model_dump() if isinstance(usage, BaseModel) else usage
+        if usage and (limiter := self.rate_limiter):
+            limiter.record_usage(int(usage.get("prompt_tokens", 0)) + int(usage.get("completion_tokens", 0)))
         if calc_usage and self.cost_manager and usage:
             try:
                 prompt_tokens = int(usage.get("prompt_tokens", 0))
@@ -149,7 +170,9 @@ class BaseLLM(ABC):
         if stream is None:
             stream = self.config.stream
         logger.debug(message)
-        rsp = await self.acompletion_text(message, stream=stream, timeout=self.get_timeout(timeout))
+        rsp = await self._rate_limited(
+            message, lambda: self.acompletion_text(message, stream=stream, timeout=self.get_timeout(timeout))
+        )
         return rsp
 
     def _extract_assistant_rsp(self, context):
@@ -161,7 +184,9 @@ class BaseLLM(ABC):
         for msg in msgs:
             umsg = self._user_msg(msg)
             context.append(umsg)
-            rsp_text = await self.acompletion_text(context, timeout=self.get_timeout(timeout))
+            rsp_text = await self._rate_limited(
+                context, lambda: self.acompletion_text(context, timeout=self.get_timeout(timeout))
+            )
             context.append(self._assistant_msg(rsp_text))
         return self._extract_assistant_rsp(context)
 
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : client_pool.py
+@Desc    : Process-wide pool of provider SDK clients. LLM instances built from configs with the same endpoint settings
+           share one client, and with it one HTTP keep-alive connection pool, while each instance keeps its own
+           cost manager, system prompt and model parameters.
+"""
+import asyncio
+import inspect
+import threading
+from asyncio import AbstractEventLoop
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.logs import logger
+
+# LLMConfig fields that determine how a client connects; model, temperature etc. are per request
+CLIENT_CONFIG_FIELDS = {"api_type", "base_url", "api_key", "api_version", "access_key", "secret_key", "proxy"}
+
+
+def client_key(config: LLMConfig) -> str:
+    """Identity of the client a config needs: configs with the same key can share one client."""
+    return config.model_dump_json(include=CLIENT_CONFIG_FIELDS)
+
+
+class LLMClientPool:
+    """Clients keyed by endpoint settings and by the event loop they are used on.
+
+    Async HTTP connections are bound to the event loop that opened them, so each running loop gets its own client;
+    clients of loops that have been closed are closed and dropped. Set `enabled` to False to build a new client per
+    call; `OpenAILLM` then keeps its clients in a pool of its own instead of sharing them with other instances.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self._clients: Dict[Tuple[Hashable, int], Tuple[Optional[AbstractEventLoop], Any]] = {}
+        self._lock = threading.Lock()
+        self._closing: Set[asyncio.Task] = set()
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return factory()
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        pool_key = (key, id(loop))
+        with self._lock:
+            entry = self._clients.get(pool_key)
+            if entry is None or entry[0] is not loop:
+                self._prune()
+                entry = (loop, factory())
+                self._clients[pool_key] = entry
+            return entry[1]
+
+    def _prune(self):
+        for pool_key, (loop, client) in list(self._clients.items()):
+            if loop is not None and loop.is_closed():
+                del self._clients[pool_key]
+                self._close(client)
+
+    def _close(self, client: Any):
+        """Release the HTTP connections of a client; async clients are closed on the current loop, or a fresh one."""
+        close = getattr(client, "close", None)
+        if close is None:
+            return
+        try:
+            result = close()
+            if not inspect.isawaitable(result):
+                return
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                asyncio.run(_close_quietly(result))
+                return
+            task = loop.create_task(_close_quietly(result))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        except Exception as e:
+            logger.debug(f"Failed to close pooled client {client!r}: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+async def _close_quietly(closing: Awaitable):
+    try:
+        await closing
+    except Exception as e:
+        logger.debug(f"Failed to close pooled client: {e}")
+
+
+LLM_CLIENT_POOL = LLMClientPool()
@@ -28,6 +28,7 @@ from metagpt.configs.llm_config import LLMConfig, LLMType
 from metagpt.const import USE_CONFIG_TIMEOUT
 from metagpt.logs import log_llm_stream, logger
 from metagpt.provider.base_llm import BaseLLM
+from metagpt.provider.client_pool import LLM_CLIENT_POOL, LLMClientPool, client_key
 from metagpt.provider.constant import GENERAL_FUNCTION_SCHEMA
 from metagpt.provider.llm_provider_registry import register_provider
 from metagpt.utils.common import CodeParser, decode_image, log_and_reraise
@@ -54,6 +55,10 @@ from metagpt.utils.token_counter import (
 class OpenAILLM(BaseLLM):
     """Check https://platform.openai.com/examples for examples"""
 
+    _client_cls = AsyncOpenAI
+    _aclient = None
+    _own_clients: Optional[LLMClientPool] = None
+
     def __init__(self, config: LLMConfig):
         self.config = config
         self._init_client()
@@ -64,8 +69,26 @@ class OpenAILLM(BaseLLM):
         """https://github.com/openai/openai-python#async-usage"""
         self.model = self.config.model  # Used in _calc_usage & _cons_kwargs
         self.pricing_plan = self.config.pricing_plan or self.model
-        kwargs = self._make_client_kwargs()
-        self.aclient = AsyncOpenAI(**kwargs)
+        self._client_cls = AsyncOpenAI
+
+    @property
+    def aclient(self):
+        """The SDK client, shared through LLM_CLIENT_POOL with every instance that uses the same endpoint settings"""
+        if self._aclient is not None:
+            return self._aclient
+        pool = LLM_CLIENT_POOL
+        if not pool.enabled:
+            # no sharing, but still one client per instance and event loop rather than one per request
+            if self._own_clients is None:
+                self._own_clients = LLMClientPool()
+            pool = self._own_clients
+        return pool.get(
+            (self._client_cls, client_key(self.config)), lambda: self._client_cls(**self._make_client_kwargs())
+        )
+
+    @aclient.setter
+    def aclient(self, client):
+        self._aclient = client
 
     def _make_client_kwargs(self) -> dict:
         kwargs = {"api_key": self.config.api_key, "base_url": self.config.base_url}
@@ -86,9 +109,11 @@ class OpenAILLM(BaseLLM):
         return params
 
     async def _achat_completion_stream(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT) -> str:
-        response: AsyncStream[ChatCompletionChunk] = await self.aclient.chat.completions.create(
-            **self._cons_kwargs(messages, timeout=self.get_timeout(timeout)), stream=True
-        )
+        kwargs = self._cons_kwargs(messages, timeout=self.get_timeout(timeout))
+        if self.config.api_type == LLMType.OPENAI:
+            # OpenAI only reports the usage of a stream in an extra last chunk when asked to
+            kwargs["stream_options"] = {"include_usage": True}
+        response: AsyncStream[ChatCompletionChunk] = await self.aclient.chat.completions.create(**kwargs, stream=True)
         usage = None
         collected_messages = []
         has_finished = False
@@ -189,7 +214,9 @@ class OpenAILLM(BaseLLM):
         if "tools" not in kwargs:
             configs = {"tools": [{"type": "function", "function": GENERAL_FUNCTION_SCHEMA}]}
             kwargs.update(configs)
-        rsp = await self._achat_completion_function(messages, **kwargs)
+        rsp = await self._rate_limited(
+            self.format_msg(messages), lambda: self._achat_completion_function(messages, **kwargs)
+        )
         return self.get_choice_function_arguments(rsp)
 
     def _parse_arguments(self, arguments: str) -> dict:
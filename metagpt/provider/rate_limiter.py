@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : rate_limiter.py
+@Desc    : Provider-agnostic rate limiting for BaseLLM. One limiter per endpoint and model caps requests per minute,
+           tokens per minute and requests in flight, and adapts the in-flight limit AIMD-style to 429 responses.
+"""
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.logs import logger
+from metagpt.provider.client_pool import CLIENT_CONFIG_FIELDS
+
+T = TypeVar("T")
+
+RATE_LIMIT_CONFIG_FIELDS = {"rpm", "tpm", "max_concurrency", "adaptive_concurrency", "rate_limit_retries"}
+
+
+def estimate_tokens(messages: List[dict]) -> int:
+    """Cheap prompt-size estimate (about 4 characters per token) used to pace requests before they are sent."""
+    return sum(len(str(message.get("content", ""))) for message in messages) // 4 + 1
+
+
+def get_retry_after(e: Exception) -> Optional[float]:
+    """Seconds the provider asks to back off if `e` is a rate-limit (HTTP 429) error, 0 if it does not say, else None"""
+    response = getattr(e, "response", None)
+    status_code = getattr(e, "status_code", None) or getattr(response, "status_code", None)
+    if status_code != 429:
+        return None
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass  # an HTTP date instead of seconds
+    return 0.0
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `capacity` tokens per minute.
+
+    Usable from several event loops and threads at once: `acquire` takes the tokens right away, possibly running the
+    bucket into debt, and then sleeps until the refill has paid the debt off, so callers are served in order.
+    """
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.capacity / 60)
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1):
+        # A single request larger than the bucket would never fit; let it through once the bucket is full.
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            delay = -self.tokens * 60 / self.capacity
+        if delay <= 0:
+            return
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.adjust(-amount)
+            raise
+
+    def adjust(self, amount: float):
+        """Charge (or refund, if negative) tokens once the real usage of a request is known."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+# Tokens charged up front for the request running in the current context, corrected by `record_usage`
+_estimated_tokens: ContextVar[int] = ContextVar("llm_estimated_tokens", default=0)
+
+
+class LLMRateLimiter:
+    """Requests per minute, tokens per minute and in-flight requests of one endpoint and model.
+
+    The in-flight limit starts at `max_concurrency` (unlimited if None) and is adapted AIMD-style: a 429 response
+    multiplies it by `decrease_factor` and holds back every new request for the provider's retry-after (or
+    `default_backoff` seconds), each success raises it by about one request per window, up to `max_concurrency`.
+    Throttled requests are retried up to `max_retries` times.
+
+    One limiter is shared by every event loop of the process (e.g. jobs run with `asyncio.run` in several threads),
+    so its accounting is guarded by a thread lock and requests waiting for a slot are woken on their own loop.
+    """
+
+    def __init__(
+        self,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: int = 3,
+        min_concurrency: int = 1,
+        decrease_factor: float = 0.5,
+        default_backoff: float = 1.0,
+        name: str = "",
+    ):
+        self.name = name
+        self.request_bucket = TokenBucket(rpm) if rpm else None
+        self.token_bucket = TokenBucket(tpm) if tpm else None
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.min_concurrency = min_concurrency
+        self.decrease_factor = decrease_factor
+        self.default_backoff = default_backoff
+
+        self.concurrency_limit: Optional[float] = max_concurrency
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.paused_until = 0.0
+        self._decreased_at = 0.0
+
+        self.requests = 0
+        self.throttled = 0
+        self.max_queue_depth = 0
+        self.wait_time = 0.0
+
+        self._lock = threading.Lock()
+        self._waiters: List[asyncio.Future] = []  # requests waiting for a slot, possibly on different loops
+
+    def _has_slot(self) -> bool:
+        return self.concurrency_limit is None or self.in_flight < max(int(self.concurrency_limit), 1)
+
+    async def _acquire_slot(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                delay = self.paused_until - time.monotonic()
+                if delay <= 0 and self._has_slot():
+                    self.in_flight += 1
+                    self.requests += 1
+                    return
+                waiter = loop.create_future() if delay <= 0 else None
+                if waiter:
+                    self._waiters.append(waiter)
+            if not waiter:
+                await asyncio.sleep(delay)
+                continue
+            try:
+                await waiter
+            finally:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    async def _acquire(self, tokens: int):
+        start = time.monotonic()
+        with self._lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            await self._acquire_slot()
+            try:
+                if self.request_bucket:
+                    await self.request_bucket.acquire(1)
+                if self.token_bucket and tokens:
+                    await self.token_bucket.acquire(tokens)
+            except BaseException:
+                self._release()
+                raise
+        finally:
+            with self._lock:
+                self.queue_depth -= 1
+                self.wait_time += time.monotonic() - start
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+            waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            try:
+                waiter.get_loop().call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                pass  # its loop has been closed
+
+    def _on_success(self):
+        with self._lock:
+            if self.concurrency_limit is None:
+                return
+            self.concurrency_limit += 1 / self.concurrency_limit
+            if self.max_concurrency:
+                self.concurrency_limit = min(self.concurrency_limit, self.max_concurrency)
+
+    def _on_throttle(self, retry_after: float, started_at: float):
+        with self._lock:
+            self.throttled += 1
+            now = time.monotonic()
+            # Requests sent before the last decrease were admitted under the old limit; decrease once per window
+            if started_at >= self._decreased_at:
+                base = self.concurrency_limit if self.concurrency_limit is not None else max(self.in_flight, 1)
+                self.concurrency_limit = max(self.min_concurrency, base * self.decrease_factor)
+                self._decreased_at = now
+            self.paused_until = max(self.paused_until, now + (retry_after or self.default_backoff))
+
+    async def run(self, call: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """Await `call()` once the limits admit a request of `tokens` estimated tokens, retrying it when throttled"""
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(tokens)
+            started_at = time.monotonic()
+            estimate = _estimated_tokens.set(tokens)
+            try:
+                result = await call()
+            except Exception as e:
+                retry_after = get_retry_after(e)
+                if retry_after is None:
+                    raise
+                self._on_throttle(retry_after, started_at)
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(
+                    f"{self.name} rate limited, concurrency limit lowered to {int(self.concurrency_limit)}, "
+                    f"retry {attempt + 1}/{self.max_retries} after {self.paused_until - time.monotonic():.1f}s"
+                )
+                continue
+            finally:
+                _estimated_tokens.reset(estimate)
+                self._release()
+            self._on_success()
+            return result
+
+    @asynccontextmanager
+    async def limit(self, tokens: int = 0):
+        """Hold one request slot while the block runs, without retrying or adapting the limit to its outcome"""
+        await self._acquire(tokens)
+        try:
+            yield self
+        finally:
+            self._release()
+
+    def record_usage(self, total_tokens: int):
+        """Correct the tokens per minute by the real usage of the request running in the current context"""
+        if self.token_bucket:
+            self.token_bucket.adjust(total_tokens - _estimated_tokens.get())
+            _estimated_tokens.set(total_tokens)
+
+    def metrics(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "concurrency_limit": int(self.concurrency_limit) if self.concurrency_limit is not None else None,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "avg_wait": self.wait_time / self.requests if self.requests else 0.0,
+        }
+
+
+def _wake(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_limiters: Dict[str, LLMRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(config: LLMConfig) -> Optional[LLMRateLimiter]:
+    """The limiter shared by every LLM of `config`'s endpoint and model, or None if `config` sets no limits"""
+    if not (config.rpm or config.tpm or config.max_concurrency or config.adaptive_concurrency):
+        return None
+    key = config.model_dump_json(include=CLIENT_CONFIG_FIELDS | RATE_LIMIT_CONFIG_FIELDS | {"model"})
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = LLMRateLimiter(
+                rpm=config.rpm,
+                tpm=config.tpm,
+                max_concurrency=config.max_concurrency,
+                max_retries=config.rate_limit_retries,
+                name=f"{config.model}@{config.base_url}",
+            )
+            _limiters[key] = limiter
+        return limiter
+
+
+def rate_limiter_metrics() -> Dict[str, dict]:
+    """Metrics of every limiter by `model@base_url`, e.g. to watch the queue depth while a team runs"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.metrics() for limiter in limiters}
@@ -332,6 +332,8 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         self.rc.env = env
         if env:
             env.set_addresses(self, self.addresses)
+            if self.recovered or not self.rc.msg_buffer.empty():
+                env.set_ready(self)
             self.llm.system_prompt = self._get_prefix()
             self.llm.cost_manager = self.context.cost_manager
             self.set_actions(self.actions)  # reset actions to update llm and prefix
@@ -427,11 +429,13 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         if not news:
             news = self.rc.msg_buffer.pop_all()
         # Store the read messages in your own memory to prevent duplicate processing.
-        old_messages = [] if ignore_memory else self.rc.memory.get()
+        unseen = [ignore_memory or not self.rc.memory.contains(n) for n in news]
         self.rc.memory.add_batch(news)
         # Filter out messages of interest.
         self.rc.news = [
-            n for n in news if (n.cause_by in self.rc.watch or self.name in n.send_to) and n not in old_messages
+            n
+            for n, is_unseen in zip(news, unseen)
+            if (n.cause_by in self.rc.watch or self.name in n.send_to) and is_unseen
         ]
         self.latest_observed_msg = self.rc.news[-1] if self.rc.news else None  # record the latest observed msg
 
@@ -457,6 +461,8 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         if not message:
             return
         self.rc.msg_buffer.push(message)
+        if self.rc.env:
+            self.rc.env.set_ready(self)
 
     async def _react(self) -> Message:
         """Think first, then act, until the Role _think it is time to stop and requires no more todo.
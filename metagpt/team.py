@@ -8,6 +8,7 @@
         Section 2.2.3.3 of RFC 135.
 """
 
+import json
 import warnings
 from pathlib import Path
 from typing import Any, Optional
@@ -24,6 +25,7 @@ from metagpt.schema import Message
 from metagpt.utils.common import (
     NoMoneyException,
     read_json_file,
+    read_jsonl_file,
     serialize_decorator,
     write_json_file,
 )
@@ -59,7 +61,27 @@ class Team(BaseModel):
         serialized_data = self.model_dump()
         serialized_data["context"] = self.env.context.serialize()
 
-        write_json_file(team_info_path, serialized_data)
+        write_json_file(team_info_path, serialized_data, indent=None)
+        self._serialize_msg_buffers(stg_path.joinpath("msg_buffers.jsonl"))
+
+    def _serialize_msg_buffers(self, path: Path):
+        """Messages the roles have received but not observed yet, one JSON line per message."""
+        with open(path, "w", encoding="utf-8") as fout:
+            for key, role in self.env.roles.items():
+                for msg in role.rc.msg_buffer.snapshot():
+                    fout.write(
+                        json.dumps({"role": key, "message": msg.model_dump(mode="json")}, ensure_ascii=False) + "\n"
+                    )
+
+    def _deserialize_msg_buffers(self, path: Path):
+        if not path.exists():
+            return
+        for record in read_jsonl_file(path):
+            role = self.env.roles.get(record["role"])
+            if role is None:
+                logger.warning(f"Role {record['role']} of the buffered message not found")
+                continue
+            role.put_message(Message(**record["message"]))
 
     @classmethod
     def deserialize(cls, stg_path: Path, context: Context = None) -> "Team":
@@ -75,6 +97,7 @@ class Team(BaseModel):
         ctx = context or Context()
         ctx.deserialize(team_info.pop("context", None))
         team = Team(**team_info, context=ctx)
+        team._deserialize_msg_buffers(stg_path.joinpath("msg_buffers.jsonl"))
         return team
 
     def hire(self, roles: list[Role]):
@@ -577,8 +577,9 @@ def write_json_file(json_file: str, data: list, encoding: str = None, indent: in
     if not folder_path.exists():
         folder_path.mkdir(parents=True, exist_ok=True)
 
+    # json.dumps encodes in one shot, which uses the C encoder when indent is None; json.dump never does
     with open(json_file, "w", encoding=encoding) as fout:
-        json.dump(data, fout, ensure_ascii=False, indent=indent, default=to_jsonable_python)
+        fout.write(json.dumps(data, ensure_ascii=False, indent=indent, default=to_jsonable_python))
 
 
 def read_jsonl_file(jsonl_file: str, encoding="utf-8") -> list[dict]:
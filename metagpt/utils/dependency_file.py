@@ -8,74 +8,209 @@
 """
 from __future__ import annotations
 
+import asyncio
+import atexit
 import json
 import re
 from pathlib import Path
-from typing import Set
+from typing import Dict, Optional, Set, Tuple
 
+from metagpt.logs import logger
 from metagpt.utils.common import aread, awrite
 from metagpt.utils.exceptions import handle_exception
 
+DEPENDENCY_FILENAME = ".dependencies.json"
+
 
 class DependencyFile:
     """A class representing a DependencyFile for managing dependencies.
 
+    By default every `update` and `get` with `persist=True` reads the file, and every such `update` rewrites it. A
+    write-back instance, as returned by `DependencyFile.shared`, keeps the dependency map in memory instead: `update`
+    only marks it dirty, `get` only rereads the file when it was changed on disk by someone else, and the changes are
+    written in one go by `flush`, which `Environment.run` calls after every round, `GitRepository.archive` calls
+    before committing and which also runs at exit.
+
     :param workdir: The working directory path for the DependencyFile.
+    :param write_back: Whether to keep updates in memory until `flush`.
     """
 
-    def __init__(self, workdir: Path | str):
+    def __init__(self, workdir: Path | str, write_back: bool = False):
         """Initialize a DependencyFile instance.
 
         :param workdir: The working directory path for the DependencyFile.
+        :param write_back: Whether to keep updates in memory until `flush`.
+        """
+        self._dependencies: Dict[str, list] = {}
+        self._dependents: Dict[str, Set[str]] = {}  # reverse index: dependency -> files depending on it
+        self._filename = Path(workdir) / DEPENDENCY_FILENAME
+        self._write_back = write_back
+        self._version = 0  # bumped by every change of the in-memory map
+        self._saved_version = 0
+        self._file_stat: Optional[Tuple[int, int]] = None  # (mtime_ns, size) when last read or written by us
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def shared(cls, workdir: Path | str) -> DependencyFile:
+        """Return the process-wide write-back instance for the working directory.
+
+        :param workdir: The working directory path for the DependencyFile.
+        :return: The write-back DependencyFile shared by every repository opened on `workdir`.
         """
+        filename = (Path(workdir) / DEPENDENCY_FILENAME).resolve()
+        if filename not in _shared_files:
+            _shared_files[filename] = cls(workdir=workdir, write_back=True)
+        return _shared_files[filename]
+
+    @classmethod
+    def release(cls, workdir: Path | str):
+        """Drop the shared instance of a working directory that was moved or deleted, discarding unsaved changes.
+
+        :param workdir: The working directory path for the DependencyFile.
+        """
+        dependency_file = _shared_files.pop((Path(workdir) / DEPENDENCY_FILENAME).resolve(), None)
+        if dependency_file:
+            dependency_file._saved_version = dependency_file._version
+
+    @classmethod
+    async def flush_all(cls):
+        """Write the unsaved changes of all shared instances."""
+        for dependency_file in list(_shared_files.values()):
+            await dependency_file.flush()
+
+    def _get_lock(self) -> asyncio.Lock:
+        # shared instances outlive event loops, and an asyncio.Lock belongs to the loop it was first awaited in
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        return self._lock
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self._filename.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @property
+    def dirty(self) -> bool:
+        """Whether the in-memory dependencies have changes that are not written to the file yet."""
+        return self._version != self._saved_version
+
+    def _set(self, key: str, dependencies: Optional[list]):
+        for dependency in self._dependencies.pop(key, []):
+            dependents = self._dependents.get(dependency)
+            if dependents:
+                dependents.discard(key)
+                if not dependents:
+                    del self._dependents[dependency]
+        if dependencies:
+            self._dependencies[key] = dependencies
+            for dependency in dependencies:
+                self._dependents.setdefault(dependency, set()).add(key)
+        self._version += 1
+
+    def _set_all(self, dependencies: Dict[str, list]):
         self._dependencies = {}
-        self._filename = Path(workdir) / ".dependencies.json"
+        self._dependents = {}
+        for key, value in dependencies.items():
+            self._set(key, value)
 
-    async def load(self):
-        """Load dependencies from the file asynchronously."""
+    def _key(self, filename: Path | str) -> str:
+        try:
+            return Path(filename).relative_to(self._filename.parent).as_posix()
+        except ValueError:
+            return Path(filename).as_posix()
+
+    async def _load(self):
         if not self._filename.exists():
             return
+        file_stat = self._stat()
         json_data = await aread(self._filename)
         json_data = re.sub(r"\\+", "/", json_data)  # Compatible with windows path
-        self._dependencies = json.loads(json_data)
+        self._set_all(json.loads(json_data))
+        self._saved_version = self._version
+        self._file_stat = file_stat
+
+    async def _refresh(self):
+        """Reload the file if it was written by someone else since we last read or wrote it; unsaved changes win."""
+        if self._write_back and (self.dirty or self._stat() == self._file_stat):
+            return
+        await self._load()
+
+    async def load(self):
+        """Load dependencies from the file asynchronously."""
+        async with self._get_lock():
+            await self._load()
 
     @handle_exception
-    async def save(self):
-        """Save dependencies to the file asynchronously."""
+    async def _save(self):
+        version = self._version
         data = json.dumps(self._dependencies)
         await awrite(filename=self._filename, data=data)
+        # updates made while writing are left dirty for the next flush
+        self._saved_version = version
+        self._file_stat = self._stat()
+
+    async def save(self):
+        """Save dependencies to the file asynchronously."""
+        async with self._get_lock():
+            await self._save()
+
+    async def flush(self):
+        """Save dependencies to the file if they changed since the last save."""
+        if not self.dirty:
+            return
+        async with self._get_lock():
+            if self.dirty:
+                await self._save()
+
+    def flush_sync(self):
+        """Synchronous `flush`, for callers outside the event loop such as `GitRepository.archive` and exit."""
+        if not self.dirty or not self._filename.parent.exists():
+            return
+        version = self._version
+        try:
+            self._filename.write_text(json.dumps(self._dependencies), encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"Failed to save {self._filename}: {e}")
+            return
+        self._saved_version = version
+        self._file_stat = self._stat()
 
     async def update(self, filename: Path | str, dependencies: Set[Path | str], persist=True):
         """Update dependencies for a file asynchronously.
 
         :param filename: The filename or path.
         :param dependencies: The set of dependencies.
-        :param persist: Whether to persist the changes immediately.
+        :param persist: Whether to persist the changes immediately; write-back instances persist them on `flush`.
         """
-        if persist:
-            await self.load()
+        async with self._get_lock():
+            if persist:
+                await self._refresh()
 
-        root = self._filename.parent
-        try:
-            key = Path(filename).relative_to(root).as_posix()
-        except ValueError:
-            key = filename
-        key = str(key)
-        if dependencies:
-            relative_paths = []
-            for i in dependencies:
-                try:
-                    s = str(Path(i).relative_to(root).as_posix())
-                except ValueError:
-                    s = str(i)
-                relative_paths.append(s)
-
-            self._dependencies[key] = relative_paths
-        elif key in self._dependencies:
-            del self._dependencies[key]
+            root = self._filename.parent
+            try:
+                key = Path(filename).relative_to(root).as_posix()
+            except ValueError:
+                key = filename
+            key = str(key)
+            if dependencies:
+                relative_paths = []
+                for i in dependencies:
+                    try:
+                        s = str(Path(i).relative_to(root).as_posix())
+                    except ValueError:
+                        s = str(i)
+                    relative_paths.append(s)
 
-        if persist:
-            await self.save()
+                self._set(key, relative_paths)
+            elif key in self._dependencies:
+                self._set(key, None)
+
+            if persist and not self._write_back:
+                await self._save()
 
     async def get(self, filename: Path | str, persist=True):
         """Get dependencies for a file asynchronously.
@@ -85,14 +220,23 @@ class DependencyFile:
         :return: A set of dependencies.
         """
         if persist:
-            await self.load()
+            async with self._get_lock():
+                await self._refresh()
 
-        root = self._filename.parent
-        try:
-            key = Path(filename).relative_to(root).as_posix()
-        except ValueError:
-            key = Path(filename).as_posix()
-        return set(self._dependencies.get(str(key), {}))
+        return set(self._dependencies.get(self._key(filename), {}))
+
+    async def get_dependents(self, filename: Path | str, persist=True) -> Set[str]:
+        """Get the files that depend on a file asynchronously.
+
+        :param filename: The filename or path of the dependency.
+        :param persist: Whether to load dependencies from the file immediately.
+        :return: A set of the dependent files.
+        """
+        if persist:
+            async with self._get_lock():
+                await self._refresh()
+
+        return set(self._dependents.get(self._key(filename), set()))
 
     def delete_file(self):
         """Delete the dependency file."""
@@ -102,3 +246,12 @@ class DependencyFile:
     def exists(self):
         """Check if the dependency file exists."""
         return self._filename.exists()
+
+
+_shared_files: Dict[Path, DependencyFile] = {}
+
+
+@atexit.register
+def _flush_shared_files():
+    for dependency_file in list(_shared_files.values()):
+        dependency_file.flush_sync()
@@ -107,6 +107,8 @@ class GitRepository:
     def delete_repository(self):
         """Delete the entire repository directory."""
         if self.is_valid:
+            DependencyFile.release(self.workdir)
+            self._dependency = None
             try:
                 shutil.rmtree(self._repository.working_dir)
             except Exception as e:
@@ -165,6 +167,8 @@ class GitRepository:
 
         :param comments: Comments for the archive commit.
         """
+        if self._dependency:
+            self._dependency.flush_sync()
         logger.info(f"Archive: {list(self.changed_files.keys())}")
         self.add_change(self.changed_files)
         self.commit(comments)
@@ -188,7 +192,7 @@ class GitRepository:
         :return: An instance of DependencyFile.
         """
         if not self._dependency:
-            self._dependency = DependencyFile(workdir=self.workdir)
+            self._dependency = DependencyFile.shared(workdir=self.workdir)
         return self._dependency
 
     def rename_root(self, new_dir_name):
@@ -208,6 +212,8 @@ class GitRepository:
         if new_path.exists():  # Recheck for windows os
             logger.warning(f"Failed to delete directory {str(new_path)}")
             return
+        if self._dependency:
+            self._dependency.flush_sync()
         try:
             shutil.move(src=str(self.workdir), dst=str(new_path))
         except Exception as e:
@@ -217,6 +223,8 @@ class GitRepository:
                 logger.warning(f"Failed to move {str(self.workdir)} to {str(new_path)}")
                 return
         logger.info(f"Rename directory {str(self.workdir)} to {str(new_path)}")
+        DependencyFile.release(self.workdir)
+        self._dependency = None
         self._repository = Repo(new_path)
         self._gitignore_rules = parse_gitignore(full_path=str(new_path / ".gitignore"))
 
@@ -10,6 +10,10 @@ ref3: https://github.com/Significant-Gravitas/Auto-GPT/blob/master/autogpt/llm/t
 ref4: https://github.com/hwchase17/langchain/blob/master/langchain/chat_models/openai.py
 ref5: https://ai.google.dev/models/gemini
 """
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
 import anthropic
 import tiktoken
 from openai.types import CompletionUsage
@@ -380,50 +384,122 @@ SPARK_TOKENS = {
 }
 
 
+# Token counts of single messages, keyed on the encoding and the message items, so the unchanged prefix of a
+# conversation is not re-encoded on every request
+MESSAGE_TOKENS_CACHE_SIZE = 4096
+# Below this many characters, spinning up encode_batch's thread pool costs more than it saves
+ENCODE_BATCH_MIN_CHARS = 16384
+_message_tokens_cache: OrderedDict = OrderedDict()
+_message_tokens_lock = threading.Lock()
+
+TOKENS_PER_MESSAGE_MODELS = {
+    "gpt-3.5-turbo-0613",
+    "gpt-3.5-turbo-16k-0613",
+    "gpt-35-turbo",
+    "gpt-35-turbo-16k",
+    "gpt-3.5-turbo-16k",
+    "gpt-3.5-turbo-1106",
+    "gpt-3.5-turbo-0125",
+    "gpt-4-0314",
+    "gpt-4-32k-0314",
+    "gpt-4-0613",
+    "gpt-4-32k-0613",
+    "gpt-4-turbo",
+    "gpt-4-turbo-preview",
+    "gpt-4-0125-preview",
+    "gpt-4-1106-preview",
+    "gpt-4-turbo",
+    "gpt-4-vision-preview",
+    "gpt-4-1106-vision-preview",
+    "gpt-4o",
+    "gpt-4o-2024-05-13",
+    "gpt-4o-2024-08-06",
+    "gpt-4o-mini",
+    "gpt-4o-mini-2024-07-18",
+    "o1-preview",
+    "o1-preview-2024-09-12",
+    "o1-mini",
+    "o1-mini-2024-09-12",
+}
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """Return the tiktoken encoding of `model`, loaded once per model."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        logger.info(f"Warning: model {model} not found in tiktoken. Using cl100k_base encoding.")
+        return tiktoken.get_encoding("cl100k_base")
+
+
+@lru_cache(maxsize=1)
+def _get_anthropic_client() -> anthropic.Client:
+    return anthropic.Client()
+
+
+def _message_value_text(value) -> str:
+    content = value
+    if isinstance(value, list):
+        # for gpt-4v
+        for item in value:
+            if isinstance(item, dict) and item.get("type") in ["text"]:
+                content = item.get("text", "")
+    return content
+
+
+def _message_cache_key(encoding_name: str, message: dict):
+    try:
+        key = (encoding_name, tuple((k, _message_value_text(v)) for k, v in message.items()))
+        hash(key)
+        return key
+    except TypeError:
+        return None
+
+
+def count_message_content_tokens(messages: list[dict], encoding: tiktoken.Encoding) -> list[int]:
+    """Return the number of tokens of the values of each message.
+
+    Counts are memoized per message, and the messages not seen before are encoded together with `encode_batch`.
+    """
+    counts = [None] * len(messages)
+    keys = [_message_cache_key(encoding.name, message) for message in messages]
+    with _message_tokens_lock:
+        for i, key in enumerate(keys):
+            if key is not None and key in _message_tokens_cache:
+                _message_tokens_cache.move_to_end(key)
+                counts[i] = _message_tokens_cache[key]
+
+    missing = [i for i, count in enumerate(counts) if count is None]
+    if missing:
+        texts = [_message_value_text(value) for i in missing for value in messages[i].values()]
+        if len(texts) > 1 and sum(len(text) for text in texts) >= ENCODE_BATCH_MIN_CHARS:
+            encoded = encoding.encode_batch(texts)
+        else:
+            encoded = [encoding.encode(text) for text in texts]
+        lengths = iter(len(tokens) for tokens in encoded)
+        with _message_tokens_lock:
+            for i in missing:
+                counts[i] = sum(next(lengths) for _ in messages[i])
+                if keys[i] is not None:
+                    _message_tokens_cache[keys[i]] = counts[i]
+            while len(_message_tokens_cache) > MESSAGE_TOKENS_CACHE_SIZE:
+                _message_tokens_cache.popitem(last=False)
+    return counts
+
+
 def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
     """Return the number of tokens used by a list of messages."""
     if "claude" in model:
         # rough estimation for models newer than claude-2.1
-        vo = anthropic.Client()
+        vo = _get_anthropic_client()
         num_tokens = 0
         for message in messages:
             for key, value in message.items():
                 num_tokens += vo.count_tokens(str(value))
         return num_tokens
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        logger.info(f"Warning: model {model} not found in tiktoken. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    if model in {
-        "gpt-3.5-turbo-0613",
-        "gpt-3.5-turbo-16k-0613",
-        "gpt-35-turbo",
-        "gpt-35-turbo-16k",
-        "gpt-3.5-turbo-16k",
-        "gpt-3.5-turbo-1106",
-        "gpt-3.5-turbo-0125",
-        "gpt-4-0314",
-        "gpt-4-32k-0314",
-        "gpt-4-0613",
-        "gpt-4-32k-0613",
-        "gpt-4-turbo",
-        "gpt-4-turbo-preview",
-        "gpt-4-0125-preview",
-        "gpt-4-1106-preview",
-        "gpt-4-turbo",
-        "gpt-4-vision-preview",
-        "gpt-4-1106-vision-preview",
-        "gpt-4o",
-        "gpt-4o-2024-05-13",
-        "gpt-4o-2024-08-06",
-        "gpt-4o-mini",
-        "gpt-4o-mini-2024-07-18",
-        "o1-preview",
-        "o1-preview-2024-09-12",
-        "o1-mini",
-        "o1-mini-2024-09-12",
-    }:
+    encoding = get_encoding(model)
+    if model in TOKENS_PER_MESSAGE_MODELS:
         tokens_per_message = 3  # # every reply is primed with <|start|>assistant<|message|>
         tokens_per_name = 1
     elif model == "gpt-3.5-turbo-0301":
@@ -448,19 +524,11 @@ def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
             f"See https://cookbook.openai.com/examples/how_to_count_tokens_with_tiktoken "
             f"for information on how messages are converted to tokens."
         )
-    num_tokens = 0
+    num_tokens = sum(count_message_content_tokens(messages, encoding))
     for message in messages:
         num_tokens += tokens_per_message
-        for key, value in message.items():
-            content = value
-            if isinstance(value, list):
-                # for gpt-4v
-                for item in value:
-                    if isinstance(item, dict) and item.get("type") in ["text"]:
-                        content = item.get("text", "")
-            num_tokens += len(encoding.encode(content))
-            if key == "name":
-                num_tokens += tokens_per_name
+        if "name" in message:
+            num_tokens += tokens_per_name
     num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
     return num_tokens
 
@@ -477,15 +545,10 @@ def count_output_tokens(string: str, model: str) -> int:
         int: The number of tokens in the text string.
     """
     if "claude" in model:
-        vo = anthropic.Client()
+        vo = _get_anthropic_client()
         num_tokens = vo.count_tokens(string)
         return num_tokens
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        logger.info(f"Warning: model {model} not found in tiktoken. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(string))
+    return len(get_encoding(model).encode(string))
 
 
 def get_max_completion_tokens(messages: list[dict], model: str, default: int) -> int:
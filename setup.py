@@ -117,6 +117,7 @@ setup(
     entry_points={
         "console_scripts": [
             "metagpt=metagpt.software_company:app",
+            "spo=metagpt.ext.spo.cli:main",
         ],
     },
     include_package_data=True,
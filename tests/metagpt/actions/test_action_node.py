@@ -12,7 +12,12 @@ import pytest
 from pydantic import BaseModel, Field, ValidationError
 
 from metagpt.actions import Action
-from metagpt.actions.action_node import ActionNode, ReviewMode, ReviseMode
+from metagpt.actions.action_node import (
+    ActionNode,
+    ReviewMode,
+    ReviseMode,
+    clear_compile_cache,
+)
 from metagpt.environment import Environment
 from metagpt.llm import LLM
 from metagpt.roles import Role
@@ -243,6 +248,34 @@ def test_create_model_class_with_mapping():
     assert value == ["game.py", "app.py", "static/css/styles.css", "static/js/script.js", "templates/index.html"]
 
 
+class CannedLLM:
+    async def aask(self, prompt, system_msgs=None, images=None, timeout=None):
+        return '[CONTENT]\n{"Name": "snake", "Steps": ["draw", "move"]}\n[/CONTENT]'
+
+
+@pytest.mark.asyncio
+async def test_action_node_compile_cache(mocker):
+    clear_compile_cache()
+    node = ActionNode.from_children(
+        "Plan",
+        [ActionNode("Name", str, "project name", "game"), ActionNode("Steps", List[str], "steps", ["step"])],
+    )
+    create_model_class = mocker.spy(ActionNode, "create_model_class")
+    compile_f = mocker.spy(ActionNode, "_compile_f")
+
+    for _ in range(3):
+        await node.fill(context="write a snake game", llm=CannedLLM())
+    assert node.instruct_content.Steps == ["draw", "move"]
+    assert create_model_class.call_count == 1
+    assert compile_f.call_count == 2  # instruction and example
+
+    # editing the node compiles it again
+    node.get_child("Steps").instruction = "implementation steps"
+    assert "implementation steps" in node.compile_instruction()
+    node.create_class()
+    assert create_model_class.call_count == 2
+
+
 @pytest.mark.asyncio
 async def test_action_node_with_image(mocker):
     # add a mock to update model in unittest, due to the gloabl MockLLM
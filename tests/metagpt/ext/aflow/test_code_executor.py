@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the AFlow code executor pool
+
+import asyncio
+
+import pytest
+
+from metagpt.ext.aflow.scripts.code_executor import CodeExecutorPool, WorkerCrashedError
+from metagpt.ext.aflow.scripts.operator import Programmer, run_code
+
+
+@pytest.fixture
+def pool():
+    pool = CodeExecutorPool(run_code, size=2, cpu_time_limit=1)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_workers_are_reused(pool):
+    assert await pool.run("def solve():\n    return 1") == ("Success", "1")
+    workers = list(pool._workers)
+    for _ in range(10):
+        assert await pool.run("def solve():\n    return 1") == ("Success", "1")
+    assert pool._workers == workers
+    assert all(worker.process.is_alive() for worker in workers)
+    assert pool.restarts == 0
+
+
+@pytest.mark.asyncio
+async def test_tasks_do_not_leak_state(pool):
+    patch = "import math, builtins\nmath.pi = 3\nbuiltins.leaked = 1\nimport tabnanny\ndef solve():\n    return math.pi"
+    assert await pool.run(patch) == ("Success", "3")
+
+    for _ in range(pool.size):
+        assert await pool.run("import math\ndef solve():\n    return math.pi") == ("Success", "3.141592653589793")
+        status, error = await pool.run("def solve():\n    return leaked")
+        assert status == "Error" and "NameError" in error
+        # the module is no longer imported, so only `import` could bring it back
+        status, error = await pool.run("import importlib\ndef solve():\n    return importlib.sys.modules['tabnanny']")
+        assert status == "Error" and "KeyError" in error
+
+
+@pytest.mark.asyncio
+async def test_concurrent_timeouts_replace_workers(pool):
+    stuck = "import time\ndef solve():\n    time.sleep(10)"
+    results = await asyncio.gather(*(pool.run(stuck, timeout=0.2) for _ in range(4)), return_exceptions=True)
+
+    assert all(isinstance(result, TimeoutError) for result in results)
+    assert pool.restarts == 4
+    assert len(pool._workers) == 2
+    assert await asyncio.gather(*(pool.run(f"def solve():\n    return {i}") for i in range(4))) == [
+        ("Success", str(i)) for i in range(4)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_timeout_replaces_only_the_stuck_worker(pool):
+    assert await pool.run("def solve():\n    return 1") == ("Success", "1")
+    workers = list(pool._workers)
+
+    with pytest.raises(TimeoutError):
+        await pool.run("import time\ndef solve():\n    time.sleep(10)", timeout=0.2)
+
+    assert pool.restarts == 1
+    assert len(set(workers) & set(pool._workers)) == 1
+    assert await pool.run("def solve():\n    return 2") == ("Success", "2")
+
+
+@pytest.mark.asyncio
+async def test_cpu_time_limit_kills_worker(pool):
+    with pytest.raises(WorkerCrashedError):
+        await pool.run("def solve():\n    while True:\n        pass", timeout=30)
+    assert await pool.run("def solve():\n    return 3") == ("Success", "3")
+
+
+@pytest.mark.asyncio
+async def test_programmer_exec_code():
+    programmer = Programmer(llm=None)
+    assert await programmer.exec_code("def solve():\n    return 6 * 7") == ("Success", "42")
+    assert await programmer.exec_code("import time\ndef solve():\n    time.sleep(10)", timeout=0.2) == (
+        "Error",
+        "Code execution timed out",
+    )
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the AFlow evaluation cache and concurrent validation passes
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from metagpt.ext.aflow.benchmark.benchmark import MISMATCH_LOG
+from metagpt.ext.aflow.scripts.optimizer_utils.cache_utils import (
+    EvaluationCache,
+    workflow_hash,
+)
+from tests.metagpt.ext.aflow.test_mismatch_log import ParityBenchmark
+
+
+class Workflow:
+    def __init__(self):
+        self.llm = SimpleNamespace(cost_manager=SimpleNamespace(total_cost=0.0))
+        self.calls = 0
+
+    async def __call__(self, problem):
+        self.calls += 1
+        self.llm.cost_manager.total_cost += 1.0
+        return 0, self.llm.cost_manager.total_cost
+
+
+@pytest.mark.asyncio
+async def test_cached_graph_reuses_outputs_per_workflow_and_seed(tmp_path):
+    cache = EvaluationCache(str(tmp_path / "eval_cache.db"))
+    workflow = workflow_hash(Workflow, {"llm_config": "gpt-4o-mini"})
+    assert workflow != workflow_hash(Workflow, {"llm_config": "gpt-4o"})
+
+    graph = Workflow()
+    assert await cache.wrap(graph, workflow, seed=0)("1 + 1") == (0, 1.0)
+    # a cached answer costs nothing more
+    assert await cache.wrap(graph, workflow, seed=0)("1 + 1") == (0, 1.0)
+    assert graph.calls == 1
+    await cache.wrap(graph, workflow, seed=1)("1 + 1")
+    assert graph.calls == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    cache.close()
+    reopened = EvaluationCache(str(tmp_path / "eval_cache.db"))
+    assert await reopened.wrap(Workflow(), workflow, seed=1)("1 + 1") == (0, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_validation_passes_share_concurrency_budget_and_log_writer(tmp_path):
+    data_file = tmp_path / "parity.jsonl"
+    data_file.write_text("".join(json.dumps({"question": i, "answer": i % 2}) + "\n" for i in range(50)))
+    benchmark = ParityBenchmark("Parity", str(data_file), str(tmp_path))
+    semaphore = asyncio.Semaphore(4)
+    in_flight = peak = 0
+
+    async def graph(question):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return 0
+
+    results = await asyncio.gather(
+        *(benchmark.run_evaluation(graph, va_list=None, semaphore=semaphore) for _ in range(3))
+    )
+
+    assert [score for score, _, _ in results] == [0.5] * 3
+    assert peak == 4
+    assert len(list(tmp_path.glob("*.csv"))) == 3
+    records = (tmp_path / MISMATCH_LOG).read_text(encoding="utf-8").splitlines()
+    assert len(records) == 3 * 25
+    assert benchmark._mismatch_writer is None
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the AFlow JSONL mismatch log
+
+import asyncio
+import json
+from typing import Any, Callable, List, Tuple
+
+import pytest
+
+from metagpt.ext.aflow.benchmark.benchmark import MISMATCH_LOG, BaseBenchmark
+from metagpt.ext.aflow.scripts.optimizer_utils.data_utils import DataUtils
+
+
+class ParityBenchmark(BaseBenchmark):
+    async def evaluate_problem(self, problem: dict, graph: Callable) -> Tuple[Any, ...]:
+        output = await graph(problem["question"])
+        score, _ = self.calculate_score(problem["answer"], output)
+        if not score:
+            self.log_mismatch(problem["question"], problem["answer"], output, output)
+        return problem["question"], output, problem["answer"], score, 0.0
+
+    def calculate_score(self, expected_output: Any, prediction: Any) -> Tuple[float, Any]:
+        return float(expected_output == prediction), prediction
+
+    def get_result_columns(self) -> List[str]:
+        return ["question", "prediction", "expected_output", "score", "cost"]
+
+
+@pytest.mark.asyncio
+async def test_mismatches_are_appended_by_one_writer(tmp_path):
+    data_file = tmp_path / "parity.jsonl"
+    data_file.write_text("".join(json.dumps({"question": i, "answer": i % 2}) + "\n" for i in range(100)))
+
+    async def graph(question):
+        await asyncio.sleep(0)
+        return 0  # wrong for every odd question
+
+    benchmark = ParityBenchmark("Parity", str(data_file), str(tmp_path))
+    score, _, _ = await benchmark.run_evaluation(graph, va_list=None)
+
+    assert score == 0.5
+    records = [json.loads(line) for line in (tmp_path / MISMATCH_LOG).read_text(encoding="utf-8").splitlines()]
+    assert sorted(r["question"] for r in records) == list(range(1, 100, 2))
+    assert benchmark._mismatch_writer is None
+
+
+def test_load_log_samples_jsonl_and_legacy_log(tmp_path):
+    data_utils = DataUtils(str(tmp_path))
+    round_dir = tmp_path / "workflows" / "round_1"
+    round_dir.mkdir(parents=True)
+    assert data_utils.load_log(1) == ""
+
+    (round_dir / "log.json").write_text(json.dumps([{"question": "legacy"}]), encoding="utf-8")
+    assert '"legacy"' in data_utils.load_log(1)
+
+    (round_dir / MISMATCH_LOG).write_text(
+        "".join(json.dumps({"question": i}) + "\n" for i in range(1000)), encoding="utf-8"
+    )
+    log = data_utils.load_log(1)
+    samples = [json.loads(chunk) for chunk in log.strip().split("\n\n")]
+    assert len(samples) == 3
+    assert len({s["question"] for s in samples}) == 3
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of QuickExecute rate limiting and batch mode, against a local OpenAI-compatible server
+
+import asyncio
+import json
+import time
+
+import pytest
+from aiohttp import web
+
+from metagpt.ext.spo.components.evaluator import QuickExecute
+from metagpt.ext.spo.utils.llm_client import SPO_LLM, RequestType
+from metagpt.ext.spo.utils.load import Template
+from metagpt.provider.rate_limiter import LLMRateLimiter
+
+
+class MockServer:
+    """Answers chat completions with the question echoed back and implements the files/batches endpoints."""
+
+    def __init__(self):
+        self.chat_requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.files = {}
+        self.batches = {}
+        self.runner = None
+
+    @staticmethod
+    def _completion(body: dict) -> dict:
+        question = body["messages"][-1]["content"].split("\n\n")[-1]
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": f"A: {question}"}, "finish_reason": "stop"}
+            ],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }
+
+    async def chat_completions(self, request: web.Request) -> web.Response:
+        self.chat_requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.05)
+        self.in_flight -= 1
+        return web.json_response(self._completion(await request.json()))
+
+    async def create_file(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        file_id = f"file-{len(self.files)}"
+        self.files[file_id] = form["file"].file.read()
+        return web.json_response(
+            {
+                "id": file_id,
+                "object": "file",
+                "bytes": len(self.files[file_id]),
+                "created_at": int(time.time()),
+                "filename": form["file"].filename,
+                "purpose": form["purpose"],
+                "status": "processed",
+            }
+        )
+
+    def _batch(self, batch_id: str) -> dict:
+        batch = self.batches[batch_id]
+        return {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "input_file_id": batch["input_file_id"],
+            "completion_window": "24h",
+            "status": batch["status"],
+            "output_file_id": batch.get("output_file_id"),
+            "created_at": int(time.time()),
+        }
+
+    async def create_batch(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        batch_id = f"batch-{len(self.batches)}"
+        self.batches[batch_id] = {"input_file_id": body["input_file_id"], "status": "in_progress"}
+        return web.json_response(self._batch(batch_id))
+
+    async def retrieve_batch(self, request: web.Request) -> web.Response:
+        batch_id = request.match_info["batch_id"]
+        batch = self.batches[batch_id]
+        if batch["status"] == "in_progress":
+            lines = []
+            for line in self.files[batch["input_file_id"]].decode("utf-8").splitlines():
+                item = json.loads(line)
+                response = {"status_code": 200, "body": self._completion(item["body"])}
+                lines.append(json.dumps({"custom_id": item["custom_id"], "response": response}))
+            output_file_id = f"file-{len(self.files)}"
+            self.files[output_file_id] = "\n".join(lines).encode("utf-8")
+            batch.update(status="completed", output_file_id=output_file_id)
+        return web.json_response(self._batch(batch_id))
+
+    async def file_content(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.files[request.match_info["file_id"]])
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.chat_completions)
+        app.router.add_post("/v1/files", self.create_file)
+        app.router.add_get("/v1/files/{file_id}/content", self.file_content)
+        app.router.add_post("/v1/batches", self.create_batch)
+        app.router.add_get("/v1/batches/{batch_id}", self.retrieve_batch)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        return f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/v1"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+def make_template(n: int) -> Template:
+    qa = [{"question": f"question {i}", "answer": f"answer {i}"} for i in range(n)]
+    return Template(path=None, mtime=0, prompt="", requirements="", qa=qa, count="")
+
+
+def init_llm(base_url: str, **execute_kwargs):
+    llm_kwargs = {"model": "gpt-4o-mini", "base_url": base_url, "api_key": "sk-mock", "temperature": 0}
+    SPO_LLM.initialize(
+        optimize_kwargs=llm_kwargs, evaluate_kwargs=llm_kwargs, execute_kwargs={**llm_kwargs, **execute_kwargs}
+    )
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_bounds_concurrency_and_rpm():
+    limiter = LLMRateLimiter(rpm=600, max_concurrency=2)
+    limiter.request_bucket.tokens = 3
+    in_flight, max_in_flight = 0, 0
+
+    async def call():
+        nonlocal in_flight, max_in_flight
+        async with limiter.limit():
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    start = time.monotonic()
+    await asyncio.gather(*(call() for _ in range(5)))
+    assert max_in_flight <= 2
+    # 3 requests are available immediately, the other 2 wait for the 10 requests/s refill
+    assert time.monotonic() - start >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_quick_execute_max_concurrency():
+    server = MockServer()
+    init_llm(await server.start(), max_concurrency=2)
+    template = make_template(6)
+    try:
+        answers = await QuickExecute(prompt="Answer", template=template, qa=template.qa).prompt_execute()
+    finally:
+        await server.stop()
+
+    assert server.max_in_flight == 2
+    assert server.chat_requests == 6
+    assert {a["answer"] for a in answers} == {f"A: question {i}" for i in range(6)}
+
+
+def test_model_limits_come_from_llm_config():
+    llm_kwargs = {"model": "gpt-4o-mini", "base_url": "http://127.0.0.1:1/v1", "api_key": "sk-mock", "rpm": 60}
+    spo_llm = SPO_LLM(dict(llm_kwargs), dict(llm_kwargs), {**llm_kwargs, "max_concurrency": 2})
+
+    assert spo_llm.execute_llm.config.rpm == 60
+    assert spo_llm.execute_llm.config.max_concurrency == 2
+    # request types with the same model and limits share the provider limiter
+    assert spo_llm.optimize_llm.rate_limiter is spo_llm.evaluate_llm.rate_limiter
+    assert spo_llm.execute_llm.rate_limiter.max_concurrency == 2
+
+
+@pytest.mark.asyncio
+async def test_quick_execute_batch_mode(tmp_path):
+    server = MockServer()
+    init_llm(await server.start(), batch=True, batch_poll_interval=0.01, batch_dir=str(tmp_path))
+    template = make_template(4)
+    try:
+        answers = await QuickExecute(prompt="Answer", template=template, qa=template.qa).prompt_execute()
+    finally:
+        await server.stop()
+
+    assert server.chat_requests == 0
+    assert len(server.batches) == 1
+    assert answers == [{"question": f"question {i}", "answer": f"A: question {i}"} for i in range(4)]
+    assert len(list(tmp_path.glob("execute_*_input.jsonl"))) == 1
+    assert len(list(tmp_path.glob("execute_*_output.jsonl"))) == 1
+    assert SPO_LLM.get_instance().is_batch_enabled(RequestType.EXECUTE)
+    assert not SPO_LLM.get_instance().is_batch_enabled(RequestType.EVALUATE)
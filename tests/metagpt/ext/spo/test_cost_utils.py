@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of SPO usage accounting and budgets
+
+import json
+import time
+
+import pytest
+from openai.types.chat import ChatCompletion
+
+from metagpt.ext.spo.components.optimizer import PromptOptimizer
+from metagpt.ext.spo.utils.cost_utils import RunUsage, record_usage
+from metagpt.ext.spo.utils.llm_client import SPO_LLM, RequestType
+
+RESPONSES = {
+    RequestType.OPTIMIZE: "<modification>shorter</modification><prompt>Answer briefly.</prompt>",
+    RequestType.EVALUATE: "<choose>B</choose>",
+    RequestType.EXECUTE: "answer",
+}
+
+
+@pytest.fixture
+def spo_llm(mocker):
+    llm_kwargs = {"model": "gpt-4o-mini", "base_url": "http://127.0.0.1:1/v1", "api_key": "sk-mock", "temperature": 0}
+    SPO_LLM.initialize(optimize_kwargs=llm_kwargs, evaluate_kwargs=llm_kwargs, execute_kwargs=llm_kwargs)
+    spo_llm = SPO_LLM.get_instance()
+
+    for request_type, content in RESPONSES.items():
+        llm = spo_llm._get_llm(request_type)
+
+        async def acompletion(messages, timeout=None, llm=llm, content=content):
+            response = ChatCompletion(
+                id="chatcmpl-mock",
+                object="chat.completion",
+                created=int(time.time()),
+                model=llm.model,
+                choices=[{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                usage={"prompt_tokens": 100, "completion_tokens": 10, "total_tokens": 110},
+            )
+            llm._update_costs(response.usage)
+            return response
+
+        mocker.patch.object(llm, "acompletion", acompletion)
+    return spo_llm
+
+
+def test_run_usage_splits_by_round_and_type(tmp_path):
+    usage = RunUsage(tmp_path / "usage.json")
+    with usage.track():
+        usage.round = 1
+        record_usage("execute", calls=1, prompt_tokens=10, completion_tokens=5, cost=0.1)
+        usage.round = 2
+        record_usage("execute", calls=1, cached_calls=1)
+        record_usage("evaluate", calls=1, prompt_tokens=20, completion_tokens=1, cost=0.2)
+    record_usage("execute", calls=1, prompt_tokens=1000)
+    usage.save()
+
+    assert usage.total().calls == 3
+    assert usage.total("execute").total_tokens == 15
+    assert usage.total().cost == pytest.approx(0.3)
+
+    reloaded = RunUsage(tmp_path / "usage.json")
+    assert reloaded.to_dict() == usage.to_dict()
+    assert json.loads((tmp_path / "usage.json").read_text())["rounds"]["2"]["evaluate"]["completion_tokens"] == 1
+
+
+@pytest.mark.asyncio
+async def test_optimizer_accounts_usage_per_round(tmp_path, spo_llm):
+    optimizer = PromptOptimizer(optimized_path=str(tmp_path), max_rounds=2, template="Poem.yaml", name="Poem")
+    await optimizer.aoptimize()
+
+    usage = json.loads((tmp_path / "Poem" / "prompts" / "usage.json").read_text())
+    assert set(usage["rounds"]) == {"1", "2"}
+    assert set(usage["rounds"]["1"]) == {"execute"}
+    assert set(usage["rounds"]["2"]) == {"optimize", "execute", "evaluate"}
+    assert usage["total"]["prompt_tokens"] == 100 * usage["total"]["calls"]
+
+    results = [json.loads(line) for line in (tmp_path / "Poem" / "prompts" / "results.jsonl").read_text().splitlines()]
+    # 3 sampled questions with 10 completion tokens each, as reported by the provider
+    assert [r["tokens"] for r in results] == [30, 30]
+
+
+@pytest.mark.asyncio
+async def test_optimizer_stops_at_token_budget(tmp_path, spo_llm):
+    optimizer = PromptOptimizer(
+        optimized_path=str(tmp_path), max_rounds=5, template="Poem.yaml", name="Poem", max_tokens=500
+    )
+    await optimizer.aoptimize()
+
+    assert optimizer.stop_reason
+    assert optimizer.round < 5
+    usage = optimizer.usage.total()
+    # The budget is checked before each call, so at most the calls already in flight overshoot it
+    assert 500 <= usage.total_tokens < 500 + 4 * 110
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the SPO round log
+
+import json
+
+from metagpt.ext.spo.utils.data_utils import DataUtils, convert_results_json
+
+
+def make_record(round: int, succeed: bool) -> dict:
+    return {"round": round, "answers": [], "prompt": f"prompt {round}", "succeed": succeed, "tokens": 1}
+
+
+def read_log(prompt_path) -> list:
+    return [json.loads(line) for line in (prompt_path / "results.jsonl").read_text(encoding="utf-8").splitlines()]
+
+
+def test_append_result_updates_best_round(tmp_path):
+    prompt_path = tmp_path / "prompts"
+    data_utils = DataUtils(tmp_path)
+    assert data_utils.get_best_round() is None
+
+    data_utils.append_result(prompt_path, make_record(1, True))
+    data_utils.append_result(prompt_path, make_record(2, True))
+    data_utils.append_result(prompt_path, make_record(3, False))
+
+    assert data_utils.get_best_round()["round"] == 2
+    assert [r["round"] for r in data_utils.load_results(prompt_path)] == [1, 2, 3]
+    # a fresh instance rebuilds the same index from the log
+    assert DataUtils(tmp_path).get_best_round()["round"] == 2
+    assert [r["round"] for r in read_log(prompt_path)] == [1, 2, 3]
+
+
+def test_load_log_repairs_truncated_last_line(tmp_path):
+    prompt_path = tmp_path / "prompts"
+    DataUtils(tmp_path).append_result(prompt_path, make_record(1, True))
+    with (prompt_path / "results.jsonl").open("a", encoding="utf-8") as f:
+        f.write(json.dumps(make_record(2, True))[:20])
+
+    data_utils = DataUtils(tmp_path)
+    assert [r["round"] for r in data_utils.load_results(prompt_path)] == [1]
+    assert data_utils.get_best_round()["round"] == 1
+
+    data_utils.append_result(prompt_path, make_record(2, True))
+    assert [r["round"] for r in read_log(prompt_path)] == [1, 2]
+
+
+def test_legacy_results_json_is_converted(tmp_path):
+    prompt_path = tmp_path / "prompts"
+    prompt_path.mkdir()
+    legacy = [make_record(1, True), make_record(2, False)]
+    (prompt_path / "results.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    data_utils = DataUtils(tmp_path)
+    assert data_utils.load_results(prompt_path) == legacy
+    assert data_utils.get_best_round()["round"] == 1
+    assert read_log(prompt_path) == legacy
+
+
+def test_convert_results_json(tmp_path):
+    json_path = tmp_path / "results.json"
+    json_path.write_text(json.dumps([make_record(1, True)]), encoding="utf-8")
+
+    jsonl_path = convert_results_json(json_path)
+
+    assert jsonl_path == tmp_path / "results.jsonl"
+    assert read_log(tmp_path) == [make_record(1, True)]
+    assert not (tmp_path / "results.jsonl.tmp").exists()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the SPO early-stopping judge
+
+import pytest
+
+from metagpt.ext.spo.components.evaluator import QuickEvaluate
+from metagpt.ext.spo.utils.evaluation_utils import (
+    EvaluationUtils,
+    is_decided,
+    win_probability,
+)
+from metagpt.ext.spo.utils.llm_client import SPO_LLM
+
+
+@pytest.fixture
+def scripted_judge(mocker):
+    mocker.patch.object(SPO_LLM, "_instance", object())
+
+    def script(verdicts: list):
+        judge = mocker.AsyncMock(side_effect=verdicts)
+        mocker.patch.object(QuickEvaluate, "prompt_evaluate", judge)
+        return judge
+
+    return script
+
+
+def test_win_probability():
+    assert win_probability(0, 0) == pytest.approx(0.5)
+    assert win_probability(3, 0) == pytest.approx(15 / 16)
+    assert win_probability(2, 1) == pytest.approx(11 / 16)
+    assert win_probability(1, 3) == pytest.approx(1 - win_probability(3, 1))
+
+
+def test_is_decided():
+    # the majority of 4 calls can no longer change
+    assert is_decided(3, 0, max_repetitions=4, confidence=0.95)
+    assert is_decided(0, 2, max_repetitions=3, confidence=0.95)
+    assert is_decided(2, 2, max_repetitions=4, confidence=0.95)
+    assert not is_decided(2, 1, max_repetitions=4, confidence=0.95)
+    # with many calls left, only a confident posterior stops early
+    assert not is_decided(3, 0, max_repetitions=10, confidence=0.95)
+    assert is_decided(4, 0, max_repetitions=10, confidence=0.95)
+    assert is_decided(0, 4, max_repetitions=10, confidence=0.95)
+
+
+@pytest.mark.asyncio
+async def test_judge_prompt_stops_on_unanimous_wave(tmp_path, scripted_judge):
+    judge = scripted_judge([True] * 5)
+    evaluation_utils = EvaluationUtils(tmp_path, min_repetitions=3, max_repetitions=5)
+
+    results = await evaluation_utils.judge_prompt({}, {}, template=None)
+
+    assert results == [True, True, True]
+    assert judge.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_judge_prompt_split_runs_further_waves(tmp_path, scripted_judge):
+    judge = scripted_judge([True, True, False, False, True])
+    evaluation_utils = EvaluationUtils(tmp_path, min_repetitions=3, max_repetitions=5)
+
+    results = await evaluation_utils.judge_prompt({}, {}, template=None)
+
+    # 2-1 and 2-2 are undecided, so one more call is issued each time until all 5 are used
+    assert results == [True, True, False, False, True]
+    assert judge.await_count == 5
+
+
+@pytest.mark.asyncio
+async def test_judge_prompt_split_stops_once_majority_is_fixed(tmp_path, scripted_judge):
+    judge = scripted_judge([True, False, True, True, True])
+    evaluation_utils = EvaluationUtils(tmp_path, min_repetitions=3, max_repetitions=5)
+
+    results = await evaluation_utils.judge_prompt({}, {}, template=None)
+
+    assert results == [True, False, True, True]
+    assert judge.await_count == 4
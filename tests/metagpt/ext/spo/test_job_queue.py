@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the SPO job queue
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from metagpt.ext.spo.components.job_queue import JobQueue, list_templates, load_progress
+from metagpt.ext.spo.utils.llm_client import SPO_LLM, RequestType
+
+
+def fake_reply(request_type: RequestType) -> str:
+    if request_type == RequestType.OPTIMIZE:
+        return "<modification>shorter</modification><prompt>Answer briefly.</prompt>"
+    if request_type == RequestType.EVALUATE:
+        return "<choose>B</choose>"
+    return "answer"
+
+
+@pytest.fixture(autouse=True)
+def fixed_judge(mocker):
+    # never swap the samples shown to the judge, so "<choose>B</choose>" always prefers the new prompt
+    mocker.patch("metagpt.ext.spo.components.evaluator.random.random", return_value=0.9)
+    mocker.patch("metagpt.ext.spo.utils.evaluation_utils.count_tokens", lambda text: 1)
+    mocker.patch("metagpt.ext.spo.components.optimizer.count_tokens", lambda text: 1)
+
+
+class FakeLLM:
+    cache = None
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def is_batch_enabled(self, request_type: RequestType) -> bool:
+        return False
+
+    async def responser(self, request_type: RequestType, messages: list) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return fake_reply(request_type)
+
+
+@pytest.fixture
+def fake_llm(mocker):
+    llm = FakeLLM()
+    mocker.patch.object(SPO_LLM, "_instance", llm)
+    return llm
+
+
+@pytest.mark.asyncio
+async def test_job_queue_runs_templates_concurrently(tmp_path, fake_llm):
+    queue = JobQueue(str(tmp_path), workers=2, max_rounds=2)
+    queue.submit("Poem.yaml")
+    queue.submit("Navigate.yaml")
+    queue.submit("missing.yaml")
+
+    statuses = await queue.arun()
+
+    assert statuses == {"Poem": "completed", "Navigate": "completed", "missing": "failed"}
+    progress = {p["name"]: p for p in load_progress(str(tmp_path))}
+    assert progress["Poem"]["round"] == 2
+    assert progress["Poem"]["best_round"] == 2
+    assert progress["missing"]["error"]
+    assert (tmp_path / "Navigate" / "prompts" / "results.jsonl").exists()
+
+
+@pytest.mark.asyncio
+async def test_job_queue_shares_global_concurrency_limit(tmp_path, mocker):
+    kwargs = {"model": "gpt-4o-mini", "api_key": "sk-xxx", "base_url": "http://localhost/v1"}
+    spo_llm = SPO_LLM(dict(kwargs), dict(kwargs), dict(kwargs), max_concurrency=2)
+    mocker.patch.object(SPO_LLM, "_instance", spo_llm)
+    counter = SimpleNamespace(in_flight=0, max_in_flight=0, calls=0)
+
+    def fake_acompletion(request_type: RequestType):
+        async def acompletion(messages):
+            counter.calls += 1
+            counter.in_flight += 1
+            counter.max_in_flight = max(counter.max_in_flight, counter.in_flight)
+            await asyncio.sleep(0.01)
+            counter.in_flight -= 1
+            message = SimpleNamespace(content=fake_reply(request_type))
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+        return acompletion
+
+    for request_type in RequestType:
+        spo_llm._get_llm(request_type).acompletion = fake_acompletion(request_type)
+
+    queue = JobQueue(str(tmp_path), workers=3, max_rounds=2)
+    for template in ("Poem.yaml", "Navigate.yaml", "Poem.yaml"):
+        queue.submit(template, name=f"{len(queue.jobs)}_{template}")
+
+    statuses = await queue.arun()
+
+    assert set(statuses.values()) == {"completed"}
+    assert counter.calls > 2
+    assert counter.max_in_flight == 2
+
+
+def test_job_queue_rejects_duplicate_names(tmp_path):
+    queue = JobQueue(str(tmp_path))
+    queue.submit("Poem.yaml")
+    with pytest.raises(ValueError):
+        queue.submit("Poem.yaml")
+    assert load_progress(str(tmp_path))[0]["status"] == "queued"
+    assert "Poem.yaml" in list_templates()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the SPO response cache
+
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIConnectionError
+from openai.types import CompletionUsage
+from openai.types.chat import ChatCompletionChunk
+from tenacity import wait_none
+
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.ext.spo.utils.cost_utils import RunUsage
+from metagpt.ext.spo.utils.llm_client import SPO_LLM, RequestType, ResponseCache
+
+LLM_KWARGS = {"model": "gpt-4o-mini", "base_url": "http://127.0.0.1:1/v1", "api_key": "sk-mock", "temperature": 0}
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+@pytest.fixture
+def clock(mocker):
+    now = SimpleNamespace(value=1000.0)
+    mocker.patch(
+        "metagpt.ext.spo.utils.llm_client.time", SimpleNamespace(time=lambda: now.value, perf_counter=time.perf_counter)
+    )
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=60, max_entries=2)
+    yield cache
+    cache.close()
+
+
+def make_llm(mocker, cache: ResponseCache, **kwargs) -> tuple:
+    llm_kwargs = {**LLM_KWARGS, **kwargs}
+    spo_llm = SPO_LLM(dict(llm_kwargs), dict(llm_kwargs), dict(llm_kwargs), cache=cache)
+    response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="hi"))], usage=None)
+    acompletion = mocker.AsyncMock(return_value=response)
+    spo_llm.execute_llm.acompletion = acompletion
+    return spo_llm, acompletion
+
+
+def test_response_cache_hit(cache, clock):
+    key = ResponseCache.make_key(RequestType.EXECUTE, LLMConfig(**LLM_KWARGS), MESSAGES)
+    assert cache.get(key) is None
+    cache.set(key, "hi")
+
+    assert cache.get(key) == "hi"
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+    # a different request type does not share the entry
+    assert key != ResponseCache.make_key(RequestType.EVALUATE, LLMConfig(**LLM_KWARGS), MESSAGES)
+
+
+def test_response_cache_persists(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    cache.set("key", "hi")
+    cache.close()
+
+    reopened = ResponseCache(tmp_path / "cache.sqlite")
+    assert reopened.get("key") == "hi"
+    reopened.close()
+
+
+def test_response_cache_ttl_expiry(cache, clock):
+    cache.set("key", "hi")
+    clock.value += 59
+    assert cache.get("key") == "hi"
+
+    clock.value += 2
+    assert cache.get("key") is None
+    assert cache._conn.execute("SELECT COUNT(*) FROM responses").fetchone() == (0,)
+
+
+def test_response_cache_evicts_least_recently_used(cache, clock):
+    cache.set("a", "1")
+    clock.value += 1
+    cache.set("b", "2")
+    clock.value += 1
+    assert cache.get("a") == "1"
+    clock.value += 1
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+@pytest.mark.asyncio
+async def test_responser_serves_cached_response(mocker, cache, clock):
+    spo_llm, acompletion = make_llm(mocker, cache)
+
+    assert await spo_llm.responser(RequestType.EXECUTE, MESSAGES) == "hi"
+    assert await spo_llm.responser(RequestType.EXECUTE, MESSAGES) == "hi"
+
+    assert acompletion.await_count == 1
+    assert cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_responser_cache_only_miss(mocker, tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", cache_only=True)
+    spo_llm, acompletion = make_llm(mocker, cache)
+
+    with pytest.raises(RuntimeError, match="cache-only"):
+        await spo_llm.responser(RequestType.EXECUTE, MESSAGES)
+    acompletion.assert_not_awaited()
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_responser_skips_cache_with_nonzero_temperature(mocker, cache, clock):
+    spo_llm, acompletion = make_llm(mocker, cache, temperature=0.7)
+
+    assert await spo_llm.responser(RequestType.EXECUTE, MESSAGES) == "hi"
+    assert await spo_llm.responser(RequestType.EXECUTE, MESSAGES) == "hi"
+
+    assert acompletion.await_count == 2
+    assert cache._conn.execute("SELECT COUNT(*) FROM responses").fetchone() == (0,)
+    assert cache.stats()["misses"] == 0
+
+
+def make_chunk(content: str = None, usage: CompletionUsage = None) -> ChatCompletionChunk:
+    choices = [] if content is None else [{"index": 0, "delta": {"content": content}, "finish_reason": "stop"}]
+    return ChatCompletionChunk(
+        id="chunk", model="gpt-4o-mini", object="chat.completion.chunk", created=0, choices=choices, usage=usage
+    )
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_is_retried_and_accounted(mocker):
+    usage = CompletionUsage(prompt_tokens=12, completion_tokens=3, total_tokens=15)
+    requests = []
+
+    async def create(self, stream: bool = False, **kwargs):
+        requests.append(kwargs)
+        if len(requests) == 1:
+            raise APIConnectionError(request=httpx.Request("POST", LLM_KWARGS["base_url"]))
+
+        class Iterator:
+            async def __aiter__(self):
+                yield make_chunk("hi")
+                yield make_chunk(usage=usage)
+
+        return Iterator()
+
+    mocker.patch("openai.resources.chat.completions.AsyncCompletions.create", create)
+    mocker.patch.object(SPO_LLM._stream_completion.retry, "wait", wait_none())
+    llm_kwargs = {**LLM_KWARGS, "stream": True}
+    spo_llm = SPO_LLM(dict(llm_kwargs), dict(llm_kwargs), dict(llm_kwargs))
+
+    with RunUsage().track() as run_usage:
+        assert await spo_llm.responser(RequestType.EXECUTE, MESSAGES) == "hi"
+
+    assert len(requests) == 2
+    assert requests[1]["stream_options"] == {"include_usage": True}
+    execute = run_usage.total(RequestType.EXECUTE.value)
+    assert (execute.calls, execute.prompt_tokens, execute.completion_tokens) == (1, 12, 3)
+    assert execute.cost > 0
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the SPO template loader and QA sampler
+
+import os
+from collections import defaultdict
+
+import pytest
+
+from metagpt.ext.spo.components.optimizer import PromptOptimizer
+from metagpt.ext.spo.utils.llm_client import SPO_LLM, RequestType
+from metagpt.ext.spo.utils.load import QASampler, Template, load_template
+
+TEMPLATE = """prompt: |
+  {prompt}
+requirements: |
+  None
+count: 50
+qa:
+  - question: q1
+    answer: a1
+  - question: q2
+    answer: a2
+"""
+
+
+@pytest.fixture
+def template_path(tmp_path):
+    path = tmp_path / "Test.yaml"
+    path.write_text(TEMPLATE.format(prompt="Answer."), encoding="utf-8")
+    return path
+
+
+def test_load_template_parses_once(template_path, mocker):
+    from_file = mocker.spy(Template, "from_file")
+
+    template = load_template(template_path)
+    assert load_template(str(template_path)) is template
+
+    assert from_file.call_count == 1
+    assert template.prompt == "Answer.\n"
+    assert template.count == ", within 50 words"
+    assert [item["question"] for item in template.qa] == ["q1", "q2"]
+
+
+def test_load_template_reparses_changed_file(template_path):
+    template = load_template(template_path)
+
+    template_path.write_text(TEMPLATE.format(prompt="Answer briefly."), encoding="utf-8")
+    os.utime(template_path, (template.mtime + 10, template.mtime + 10))
+
+    reloaded = load_template(template_path)
+    assert reloaded is not template
+    assert reloaded.prompt == "Answer briefly.\n"
+    assert load_template(template_path) is reloaded
+
+
+def test_load_template_uses_explicit_template(tmp_path):
+    template = Template(tmp_path / "missing.yaml", 0, "Answer.", "None", [{"question": "q", "answer": "a"}], "")
+
+    assert load_template(template) is template
+
+
+def test_load_template_missing_file():
+    with pytest.raises(FileNotFoundError):
+        load_template("missing.yaml")
+
+
+def make_template(n: int) -> Template:
+    qa = [{"question": f"q{i}", "answer": f"a{i}"} for i in range(n)]
+    return Template(None, 0, "Answer.", "None", qa, "")
+
+
+def test_qa_sampler_is_seeded_per_round():
+    template = make_template(10)
+    sampler = QASampler(k=3, seed=7)
+
+    assert sampler.sample(template, 2) == sampler.sample(template, 2)
+    assert QASampler(k=3, seed=7).sample(template, 2) == sampler.sample(template, 2)
+    assert len(sampler.sample(template, 2)) == 3
+    assert any(sampler.sample(template, r) != sampler.sample(template, 2) for r in range(3, 8))
+
+
+def test_qa_sampler_round_robin_wraps_around():
+    template = make_template(5)
+    sampler = QASampler(k=2, seed=7, strategy="round_robin")
+    r1, r2, r3, r4 = (sampler.sample(template, r) for r in range(1, 5))
+
+    # rounds 1-3 cover every pair once, then the walk wraps to the start of the shuffled order
+    assert sorted(item["question"] for item in r1 + r2 + r3[:1]) == [f"q{i}" for i in range(5)]
+    assert r3[1] == r1[0]
+    assert r4 == [r1[1], r2[0]]
+
+
+def test_qa_sampler_rejects_unknown_strategy():
+    with pytest.raises(ValueError, match="Unknown QA sampling strategy"):
+        QASampler(strategy="stratified")
+
+
+class RecordingLLM:
+    cache = None
+
+    def __init__(self):
+        self.messages = defaultdict(list)
+
+    def is_batch_enabled(self, request_type: RequestType) -> bool:
+        return False
+
+    async def responser(self, request_type: RequestType, messages: list) -> str:
+        self.messages[request_type].append(messages[0]["content"])
+        if request_type == RequestType.OPTIMIZE:
+            return "<modification>shorter</modification><prompt>Answer briefly.</prompt>"
+        if request_type == RequestType.EVALUATE:
+            return "<choose>B</choose>"
+        return "answer"
+
+
+@pytest.mark.asyncio
+async def test_round_shares_one_qa_sample(tmp_path, mocker):
+    llm = RecordingLLM()
+    mocker.patch.object(SPO_LLM, "_instance", llm)
+    mocker.patch("metagpt.ext.spo.utils.evaluation_utils.count_tokens", lambda text: 1)
+    mocker.patch("metagpt.ext.spo.components.optimizer.count_tokens", lambda text: 1)
+    optimizer = PromptOptimizer(str(tmp_path), name="Poem", template="Poem.yaml", max_rounds=1, qa_seed=1)
+    optimizer.round = 2
+    optimizer.data_utils.append_result(
+        tmp_path / "Poem" / "prompts",
+        optimizer.data_utils.create_result_data(1, [{"question": "q", "answer": "a"}], "Answer.", True, 1),
+    )
+
+    await optimizer.aoptimize()
+
+    questions = [item["question"] for item in QASampler(seed=1).sample(load_template("Poem.yaml"), 2)]
+    executed = [content.split("\n\n", 1)[1] for content in llm.messages[RequestType.EXECUTE]]
+    assert sorted(executed) == sorted(questions)
+    for request_type in (RequestType.OPTIMIZE, RequestType.EVALUATE):
+        assert llm.messages[request_type]
+        for content in llm.messages[request_type]:
+            assert all(question.strip() in content for question in questions)
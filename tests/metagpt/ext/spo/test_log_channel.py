@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the SPO log channel and streamed responses
+
+import asyncio
+
+import pytest
+
+from metagpt.ext.spo.utils.llm_client import SPO_LLM, RequestType
+from metagpt.ext.spo.utils.log_channel import LogChannel
+from metagpt.logs import _llm_stream_log, log_llm_stream, logger, set_llm_stream_logfunc
+
+
+def test_log_channel_is_bounded_and_incremental():
+    channel = LogChannel(maxlen=3)
+    for i in range(5):
+        channel.write(f"line {i}\n")
+
+    assert channel.tail() == ["line 2", "line 3", "line 4"]
+    lines, since = channel.read()
+    assert lines == ["line 2", "line 3", "line 4"] and since == 5
+
+    channel.write("line 5")
+    assert channel.read(since) == (["line 5"], 6)
+
+
+def test_log_channel_attach_captures_logs():
+    channel = LogChannel()
+    with channel.attach(format="{message}"):
+        logger.info("inside")
+    logger.info("outside")
+
+    assert channel.tail() == ["inside"]
+
+
+def test_log_channel_attach_restores_stream_logfunc():
+    streamed = []
+    set_llm_stream_logfunc(streamed.append)
+    try:
+        with LogChannel().attach():
+            log_llm_stream("inside")
+        log_llm_stream("outside")
+    finally:
+        set_llm_stream_logfunc(_llm_stream_log)
+
+    assert streamed == ["inside", "outside"]
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_shows_partial_output(mocker):
+    llm_kwargs = {"model": "gpt-4o-mini", "base_url": "http://127.0.0.1:1/v1", "api_key": "sk-mock"}
+    SPO_LLM.initialize(
+        optimize_kwargs={**llm_kwargs, "stream": True}, evaluate_kwargs=llm_kwargs, execute_kwargs=llm_kwargs
+    )
+    llm = SPO_LLM.get_instance()
+    channel = LogChannel()
+    partials = []
+
+    async def fake_stream(messages, timeout=None):
+        for chunk in ["<prompt>", "Be", " brief", "</prompt>"]:
+            log_llm_stream(chunk)
+            partials.append(channel.partial)
+            await asyncio.sleep(0)
+        return "<prompt>Be brief</prompt>"
+
+    mocker.patch.object(llm.optimize_llm, "_achat_completion_stream", fake_stream)
+    with channel.attach():
+        response = await llm.responser(RequestType.OPTIMIZE, [{"role": "user", "content": "optimize"}])
+
+    assert response == "<prompt>Be brief</prompt>"
+    assert partials == ["<prompt>", "<prompt>Be", "<prompt>Be brief", "<prompt>Be brief</prompt>"]
+    assert channel.partial == ""
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the SPO prompt optimizer
+
+import asyncio
+import json
+
+import pytest
+
+from metagpt.ext.spo.components.optimizer import PromptOptimizer
+from metagpt.ext.spo.utils.llm_client import SPO_LLM, RequestType
+
+CANDIDATE_PROMPTS = ["Answer weakly.", "Answer strongly.", "Answer weakly, again."]
+
+
+class BeamLLM:
+    """Proposes the candidate prompts in turn; the judge prefers a new sample only if its prompt is "strong"."""
+
+    cache = None
+
+    def __init__(self):
+        self.optimize_calls = 0
+
+    def is_batch_enabled(self, request_type: RequestType) -> bool:
+        return False
+
+    async def responser(self, request_type: RequestType, messages: list) -> str:
+        content = messages[0]["content"]
+        if request_type == RequestType.OPTIMIZE:
+            prompt = CANDIDATE_PROMPTS[self.optimize_calls % len(CANDIDATE_PROMPTS)]
+            self.optimize_calls += 1
+            return f"<modification>rewrite</modification><prompt>{prompt}</prompt>"
+        if request_type == RequestType.EVALUATE:
+            new_sample = content.split("# B", 1)[1].split("# Golden answer", 1)[0]
+            return "<choose>B</choose>" if "strongly" in new_sample else "<choose>A</choose>"
+        return "answer"
+
+
+class LoopRecordingLLM:
+    """Always prefers the new prompt and records the event loop of every call."""
+
+    cache = None
+
+    def __init__(self):
+        self.loops = set()
+
+    def is_batch_enabled(self, request_type: RequestType) -> bool:
+        return False
+
+    async def responser(self, request_type: RequestType, messages: list) -> str:
+        self.loops.add(id(asyncio.get_running_loop()))
+        if request_type == RequestType.OPTIMIZE:
+            return "<modification>shorter</modification><prompt>Answer briefly.</prompt>"
+        if request_type == RequestType.EVALUATE:
+            return "<choose>B</choose>"
+        return "answer"
+
+
+@pytest.fixture(autouse=True)
+def fixed_judge(mocker):
+    # never swap the samples shown to the judge, so B is always the new sample
+    mocker.patch("metagpt.ext.spo.components.evaluator.random.random", return_value=0.9)
+    mocker.patch("metagpt.ext.spo.utils.evaluation_utils.count_tokens", lambda text: 1)
+    mocker.patch("metagpt.ext.spo.components.optimizer.count_tokens", lambda text: 1)
+
+
+def seed_first_round(optimizer: PromptOptimizer, tmp_path):
+    prompt_path = tmp_path / "Poem" / "prompts"
+    record = optimizer.data_utils.create_result_data(1, [{"question": "q", "answer": "a"}], "Answer.", True, 1)
+    optimizer.data_utils.append_result(prompt_path, record)
+    return prompt_path
+
+
+def test_select_candidate_ranks_by_win_probability():
+    def candidate(index: int, wins: int, losses: int) -> dict:
+        return {"candidate": index, "wins": wins, "losses": losses}
+
+    # 3-0 is more convincing than 4-1 although both have a margin of 3
+    best = PromptOptimizer._select_candidate([candidate(0, 1, 0), candidate(1, 4, 1), candidate(2, 3, 0)])
+    assert best["candidate"] == 2
+    # equal win probability: more wins, then the lower index
+    assert PromptOptimizer._select_candidate([candidate(0, 0, 0), candidate(1, 1, 1)])["candidate"] == 1
+    assert PromptOptimizer._select_candidate([candidate(1, 2, 1), candidate(0, 2, 1)])["candidate"] == 0
+
+
+@pytest.mark.asyncio
+async def test_beam_round_keeps_best_candidate(tmp_path, mocker):
+    mocker.patch.object(SPO_LLM, "_instance", BeamLLM())
+    optimizer = PromptOptimizer(
+        str(tmp_path), name="Poem", template="Poem.yaml", initial_round=2, max_rounds=1, beam_width=3
+    )
+    prompt_path = seed_first_round(optimizer, tmp_path)
+
+    await optimizer.aoptimize()
+
+    round_dir = prompt_path / "round_2"
+    candidate_prompts = {i: (round_dir / f"candidate_{i}" / "prompt.txt").read_text(encoding="utf-8") for i in range(3)}
+    assert sorted(candidate_prompts.values()) == sorted(CANDIDATE_PROMPTS)
+    assert all((round_dir / f"candidate_{i}" / "answers.txt").exists() for i in range(3))
+    assert optimizer.prompt == "Answer strongly."
+    assert (round_dir / "prompt.txt").read_text(encoding="utf-8") == "Answer strongly."
+
+    lines = (prompt_path / "results.jsonl").read_text(encoding="utf-8").splitlines()
+    records = [record for record in map(json.loads, lines) if record["round"] == 2]
+    assert sorted(r["candidate"] for r in records) == [0, 1, 2]
+    for record in records:
+        strong = record["prompt"] == "Answer strongly."
+        assert record["prompt"] == candidate_prompts[record["candidate"]]
+        assert record["succeed"] is strong
+        assert (record["wins"] > 0) is strong
+    assert optimizer.data_utils.get_best_round()["prompt"] == "Answer strongly."
+
+
+def test_optimize_runs_all_rounds_on_one_event_loop(tmp_path, mocker):
+    llm = LoopRecordingLLM()
+    mocker.patch.object(SPO_LLM, "_instance", llm)
+    optimizer = PromptOptimizer(str(tmp_path), name="Poem", template="Poem.yaml", max_rounds=3)
+    rounds = []
+    on_round_end = mocker.Mock(side_effect=lambda opt: rounds.append(opt.round))
+
+    asyncio.run(optimizer.aoptimize(on_round_end=on_round_end))
+
+    assert on_round_end.call_count == 3
+    assert rounds == [1, 2, 3]
+    assert optimizer.round == 4
+    assert len(llm.loops) == 1
+    results = optimizer.data_utils.load_results(tmp_path / "Poem" / "prompts")
+    assert [r["round"] for r in results] == [1, 2, 3]
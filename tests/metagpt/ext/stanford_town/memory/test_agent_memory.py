@@ -6,7 +6,7 @@ from datetime import datetime, timedelta
 
 import pytest
 
-from metagpt.ext.stanford_town.memory.agent_memory import AgentMemory
+from metagpt.ext.stanford_town.memory.agent_memory import AgentMemory, BasicMemory
 from metagpt.ext.stanford_town.memory.retrieve import agent_retrieve
 from metagpt.ext.stanford_town.utils.const import STORAGE_PATH
 from metagpt.logs import logger
@@ -87,3 +87,12 @@ class TestAgentMemory:
 
             retrieved[focal_pt] = final_result
         logger.info(f"检索结果为{retrieved}")
+
+
+def test_agent_memory_equality_compares_all_fields():
+    event = BasicMemory(memory_id="node_1", memory_type="event", content="Isabella is cooking")
+    memory, other = AgentMemory(storage=[event]), AgentMemory(storage=[event])
+    assert memory == other
+
+    memory.event_list.append(event)
+    assert memory != other
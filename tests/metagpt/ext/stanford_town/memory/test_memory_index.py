@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the columnar MemoryIndex used by agent_retrieve
+
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from metagpt.ext.stanford_town.memory import retrieve
+from metagpt.ext.stanford_town.memory.agent_memory import AgentMemory
+from metagpt.ext.stanford_town.memory.retrieve import (
+    agent_retrieve,
+    extract_importance,
+    extract_recency,
+    extract_relevance,
+    normalize_score_floats,
+    top_highest_x_values,
+)
+
+
+def loop_retrieve(agent_memory, curr_time, memory_forget, query, nodes, topk):
+    """agent_retrieve as it scored memories one at a time before the index"""
+    memories = sorted(nodes, key=lambda memory_node: memory_node.last_accessed, reverse=True)
+    score_list = extract_importance(memories, [])
+    score_list = extract_recency(curr_time, memory_forget, score_list)
+    score_list = extract_relevance(agent_memory.embeddings, query, score_list)
+    score_list = normalize_score_floats(score_list, 0, 1)
+    total_dict = {
+        score["memory"].memory_id: score["importance"] + score["recency"] + score["relevance"] for score in score_list
+    }
+    return top_highest_x_values(total_dict, topk)
+
+
+def build_agent_memory(size: int) -> AgentMemory:
+    agent_memory = AgentMemory()
+    created = datetime(2023, 2, 13, 9)
+    for i in range(size):
+        embedding = (f"event {i}", [random.random() for _ in range(8)])
+        agent_memory.add_event(
+            created + timedelta(hours=7 * i), None, "s", "p", f"o{i}", f"event {i}", {"kw"}, i % 10, embedding, []
+        )
+        if i % 3 == 0:
+            thought = (f"thought {i}", [random.random() for _ in range(8)])
+            agent_memory.add_thought(
+                created + timedelta(hours=7 * i), None, "s", "p", f"t{i}", f"thought {i}", {"kw"}, 5, thought, []
+            )
+    return agent_memory
+
+
+def test_agent_retrieve_matches_loop_scoring(mocker):
+    agent_memory = build_agent_memory(200)
+    mocker.patch.object(retrieve, "get_embedding", return_value=[random.random() for _ in range(8)])
+
+    nodes = agent_memory.event_list + agent_memory.thought_list
+    curr_time = max(i.created for i in nodes) + timedelta(days=3)
+    for topk in (1, 5, 30, len(nodes) + 1):
+        expected = loop_retrieve(agent_memory, curr_time, 0.99, "query", nodes, topk)
+        assert agent_retrieve(agent_memory, curr_time, 0.99, "query", nodes, topk) == expected
+
+
+def test_memory_index_follows_storage():
+    agent_memory = build_agent_memory(90)
+
+    index = agent_memory.memory_index
+    assert index.size == len(agent_memory.storage) == 120
+    node = index.id_to_node["node_42"]
+    assert node is agent_memory.storage[41]
+    np.testing.assert_allclose(index.embeddings[41], agent_memory.embeddings[node.embedding_key], rtol=1e-6)
+
+    accessed = datetime(2024, 1, 1)
+    index.touch(["node_42"], accessed)
+    assert agent_memory.storage[41].last_accessed == accessed
+
+    agent_memory.storage = agent_memory.storage[:10]
+    assert agent_memory.memory_index.size == 10
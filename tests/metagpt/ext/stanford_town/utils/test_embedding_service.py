@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the Stanford Town embedding service
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from metagpt.ext.stanford_town.utils.embedding_service import (
+    EmbeddingService,
+    LocalEmbedding,
+)
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.batches = []
+
+    async def create(self, input, model):
+        self.batches.append(list(input))
+        await asyncio.sleep(0)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text)), 1.0]) for text in input])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_batched_and_cached(tmp_path, mocker):
+    service = EmbeddingService(batch_size=4, cache_path=tmp_path / "embedding_cache.jsonl")
+    embeddings = FakeEmbeddings()
+    mocker.patch.object(service, "_async_client", return_value=SimpleNamespace(embeddings=embeddings))
+
+    texts = ["a", "bb", "ccc", "a", "dddd", "eeeee", "bb\n"]
+    results = await asyncio.gather(*(service.aembed(text) for text in texts))
+
+    assert results[0] == [1.0, 1.0] and results[2] == [3.0, 1.0]
+    assert embeddings.batches == [["a", "bb", "ccc", "dddd"], ["eeeee", "bb "]]
+    assert await service.aembed("ccc") == [3.0, 1.0]
+    assert len(embeddings.batches) == 2
+
+    reloaded = EmbeddingService(cache_path=tmp_path / "embedding_cache.jsonl", offline=True)
+    assert reloaded.embed_batch(["eeeee", "a"]) == [[5.0, 1.0], [1.0, 1.0]]
+
+
+@pytest.mark.asyncio
+async def test_remote_failure_raises_without_local_fallback(tmp_path, mocker):
+    service = EmbeddingService(cache_path=tmp_path / "embedding_cache.jsonl")
+    client = mocker.Mock()
+    client.embeddings.create = mocker.AsyncMock(side_effect=ConnectionError("offline"))
+    mocker.patch.object(service, "_async_client", return_value=client)
+
+    with pytest.raises(ValueError, match="get_embedding failed"):
+        await service.aembed("Isabella is making coffee")
+    # nothing is cached, so the next request calls the remote again
+    assert service.cache == {}
+    assert not (tmp_path / "embedding_cache.jsonl").exists()
+    with pytest.raises(ValueError):
+        await service.aembed("Isabella is making coffee")
+    assert client.embeddings.create.call_count == 2
+
+
+def test_offline_embeddings_are_cached_apart_from_remote_ones(tmp_path):
+    service = EmbeddingService(cache_path=tmp_path / "embedding_cache.jsonl", offline=True)
+
+    embedding = service.embed("Isabella is making coffee")
+
+    assert embedding == LocalEmbedding().embed("Isabella is making coffee")
+    assert service.key("Isabella is making coffee") not in service.cache
+    assert service.cache[service.key("Isabella is making coffee", local=True)] == embedding
+    assert not (tmp_path / "embedding_cache.jsonl").exists()
+
+
+def test_event_loops_in_threads_share_one_service(mocker):
+    service = EmbeddingService(batch_size=64, max_wait=0.05)
+    embeddings = FakeEmbeddings()
+    mocker.patch.object(service, "_async_client", return_value=SimpleNamespace(embeddings=embeddings))
+    barrier = threading.Barrier(2)
+    results = {}
+
+    async def embed(name: str, texts: list):
+        tasks = [asyncio.ensure_future(service.aembed(text)) for text in texts]
+        await asyncio.sleep(0)
+        barrier.wait()  # both loops have requests queued before either flushes
+        results[name] = await asyncio.wait_for(asyncio.gather(*tasks), timeout=5)
+
+    threads = [
+        threading.Thread(target=asyncio.run, args=(embed("a", ["a", "bb"]),)),
+        threading.Thread(target=asyncio.run, args=(embed("b", ["ccc", "dddd"]),)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {"a": [[1.0, 1.0], [2.0, 1.0]], "b": [[3.0, 1.0], [4.0, 1.0]]}
+    assert sorted(embeddings.batches) == [["a", "bb"], ["ccc", "dddd"]]
+    assert service._batches == {}
+
+
+def test_local_embedding_is_deterministic_and_similar_for_shared_words():
+    local = LocalEmbedding()
+    coffee, coffee_again, reading = (
+        np.array(local.embed(text))
+        for text in ("Isabella is making coffee", "Isabella is making coffee for Maria", "Klaus is reading a book")
+    )
+    assert len(coffee) == 1536
+    assert np.isclose(np.linalg.norm(coffee), 1)
+    assert coffee @ coffee_again > coffee @ reading
+
+
+def test_prime_shares_agent_memory_embeddings():
+    service = EmbeddingService(offline=True)
+    service.prime({"Isabella is idle": [0.5, 0.5]})
+    assert service.embed("Isabella is idle") == [0.5, 0.5]
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the Stanford Town grid path finder
+
+import random
+
+from metagpt.environment.stanford_town.stanford_town_ext_env import StanfordTownExtEnv
+from metagpt.ext.stanford_town.utils.const import MAZE_ASSET_PATH, collision_block_id
+from metagpt.ext.stanford_town.utils.path_finding import (
+    GridPathFinder,
+    find_path,
+    get_path_finder,
+    invalidate_path_finder,
+)
+from metagpt.ext.stanford_town.utils.utils import path_finder, path_finder_v2
+
+MAZE = [
+    list("0000"),
+    list("0XX0"),
+    list("0X00"),
+    list("0X0X"),
+]
+
+
+def test_shortest_path_around_walls():
+    finder = GridPathFinder(MAZE, "X")
+    assert finder.find((3, 0), (3, 2)) == [
+        (3, 0),
+        (2, 0),
+        (1, 0),
+        (0, 0),
+        (0, 1),
+        (0, 2),
+        (0, 3),
+        (1, 3),
+        (2, 3),
+        (2, 2),
+        (3, 2),
+    ]
+    assert finder.find((0, 0), (0, 0)) == [(0, 0)]
+    assert finder.find((0, 0), (1, 1)) is None
+    assert find_path(MAZE, (0, 0), (1, 1), "X") == [(1, 1)]
+
+
+def test_paths_are_cached_until_the_maze_changes():
+    maze = [row[:] for row in MAZE]
+    finder = get_path_finder(maze, "X")
+    assert len(find_path(maze, (3, 0), (3, 2), "X")) == 11
+    assert len(find_path(maze, (3, 0), (3, 2), "X")) == 11
+    assert (finder.hits, finder.misses) == (1, 1)
+
+    maze[2][1] = "0"
+    invalidate_path_finder(maze)
+    assert find_path(maze, (3, 0), (3, 2), "X") == [(3, 0), (2, 0), (2, 1), (2, 2), (3, 2)]
+
+    finder.update_tile((2, 1), True)
+    assert len(find_path(maze, (3, 0), (3, 2), "X")) == 11
+
+
+def test_path_finder_matches_flood_fill_on_the_ville():
+    collision_maze = StanfordTownExtEnv(maze_asset_path=MAZE_ASSET_PATH).get_collision_maze()
+    free_tiles = [
+        (x, y) for y, row in enumerate(collision_maze) for x, tile in enumerate(row) if tile != collision_block_id
+    ]
+    rng = random.Random(0)
+    for _ in range(5):
+        start, end = rng.sample(free_tiles, 2)
+        path = path_finder(collision_maze, start, end, collision_block_id)
+        expected = path_finder_v2(collision_maze, start[::-1], end[::-1], collision_block_id)
+        if len(expected) > 1:  # the flood fill gives up on long or impossible paths
+            assert len(path) == len(expected)
+        assert path[-1] == end
+        for (x1, y1), (x2, y2) in zip(path, path[1:]):
+            assert abs(x1 - x2) + abs(y1 - y2) == 1
+            assert collision_maze[y2][x2] != collision_block_id
@@ -55,3 +55,67 @@ def test_memory():
     memory.clear()
     assert memory.count() == 0
     assert len(memory.index) == 0
+
+
+def test_memory_indexes_follow_storage():
+    memory = Memory()
+    messages = [Message(content=f"message {i}", role=f"role{i % 3}", sent_from=f"sender{i % 2}") for i in range(10)]
+    memory.add_batch(messages + messages[:3])
+    assert memory.count() == 10
+    assert memory.contains(messages[4])
+    assert memory.get_by_role("role1") == [messages[1], messages[4], messages[7]]
+    assert memory.get_by_sent_from("sender0") == messages[0::2]
+
+    memory.delete(messages[4])
+    assert not memory.contains(messages[4])
+    assert memory.get_by_role("role1") == [messages[1], messages[7]]
+    assert memory.find_news([messages[2], messages[8], messages[4]], k=3) == [messages[2], messages[4]]
+    assert memory.delete_newest() is messages[9]
+    assert memory.find_news([messages[9], messages[8]]) == [messages[9]]
+
+    # storage appended to or replaced directly, as subclasses do
+    memory.storage.append(messages[4])
+    assert memory.contains(messages[4])
+    memory.storage = messages[:2]
+    assert memory.get_by_role("role1") == [messages[1]]
+    assert not memory.contains(messages[4])
+
+
+def test_memory_ignore_id_dedups_by_content():
+    memory = Memory(ignore_id=True)
+    memory.add(Message(content="same", role="user"))
+    memory.add(Message(content="same", role="user"))
+    memory.add(Message(content="other", role="user"))
+    assert memory.count() == 2
+
+
+def test_memory_equality_ignores_indexes():
+    memory = Memory()
+    memory.add_batch([Message(content=f"message {i}", cause_by="action") for i in range(3)])
+    assert memory.contains(memory.storage[0])  # builds the private indexes
+
+    reloaded = Memory(**memory.model_dump())
+    assert reloaded == memory
+    reloaded.add(Message(content="new"))
+    assert reloaded != memory
+
+
+def test_memory_lookups_keep_duplicates():
+    message1 = Message(content="first", role="user", sent_from="alice")
+    message2 = Message(content="second", role="assistant", sent_from="bob")
+    # storage deserialized or appended to directly may hold the same message twice
+    memory = Memory(storage=[message1, message2, message1])
+
+    assert memory.get_by_role("user") == [message1, message1]
+    assert memory.get_by_sent_from("alice") == [message1, message1]
+    assert memory.find_news([message1], k=1) == []
+
+    assert memory.delete_newest() == message1
+    assert memory.get_by_role("user") == [message1]
+    assert memory.contains(message1)
+
+    memory.storage.append(message1)
+    memory.delete(message1)
+    assert memory.storage == [message2, message1]
+    assert memory.get_by_sent_from("alice") == [message1]
+    assert memory.find_news([message1], k=1) == []
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the process-wide LLM client pool
+
+import asyncio
+
+import pytest
+
+from metagpt.context import Context
+from metagpt.provider.client_pool import LLM_CLIENT_POOL, LLMClientPool
+from tests.metagpt.provider.mock_llm_config import (
+    mock_llm_config,
+    mock_llm_config_azure,
+    mock_llm_config_proxy,
+)
+
+
+@pytest.mark.asyncio
+async def test_llms_share_client_but_not_cost_manager():
+    ctx = Context()
+    llm = ctx.llm_with_cost_manager_from_llm_config(mock_llm_config)
+    other_config = mock_llm_config.model_copy(update={"model": "gpt-4o-mini"})
+    other = Context().llm_with_cost_manager_from_llm_config(other_config)
+
+    assert llm is not other
+    assert llm.aclient is other.aclient
+    assert llm.cost_manager is not other.cost_manager
+
+    # a different endpoint or client type gets its own client
+    assert ctx.llm_with_cost_manager_from_llm_config(mock_llm_config_proxy).aclient is not llm.aclient
+    assert ctx.llm_with_cost_manager_from_llm_config(mock_llm_config_azure).aclient is not llm.aclient
+
+
+def test_client_per_event_loop():
+    llm = Context().llm_with_cost_manager_from_llm_config(mock_llm_config)
+
+    async def get_client():
+        return llm.aclient
+
+    first = asyncio.run(get_client())
+    second = asyncio.run(get_client())
+    assert first is not second
+    # the client of the closed loop has been dropped and closed
+    assert first not in [client for _, client in LLM_CLIENT_POOL._clients.values()]
+    assert first.is_closed()
+
+
+def test_pruned_clients_are_closed():
+    class FakeClient:
+        closed = False
+
+        async def close(self):
+            self.closed = True
+
+    pool = LLMClientPool()
+
+    async def get_client(key):
+        return pool.get(key, FakeClient)
+
+    first = asyncio.run(get_client("a"))
+    second = asyncio.run(get_client("b"))
+    assert first.closed and not second.closed
+    assert len(pool) == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_disabled():
+    llm = Context().llm_with_cost_manager_from_llm_config(mock_llm_config)
+    other = Context().llm_with_cost_manager_from_llm_config(mock_llm_config)
+    LLM_CLIENT_POOL.enabled = False
+    try:
+        # each instance keeps its own client instead of building one per request
+        assert llm.aclient is llm.aclient
+        assert llm.aclient is not other.aclient
+    finally:
+        LLM_CLIENT_POOL.enabled = True
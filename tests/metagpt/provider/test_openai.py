@@ -152,6 +152,31 @@ async def mock_openai_acompletions_create(self, stream: bool = False, **kwargs)
         return default_resp
 
 
+@pytest.mark.asyncio
+async def test_openai_stream_reports_usage_in_last_chunk(mocker):
+    content_chunk = get_openai_chat_completion_chunk(name).model_copy(update={"usage": None})
+    usage_chunk = content_chunk.model_copy(update={"choices": [], "usage": usage})
+    requests = []
+
+    async def create(self, stream: bool = False, **kwargs):
+        requests.append(kwargs)
+
+        class Iterator(object):
+            async def __aiter__(self):
+                yield content_chunk
+                yield usage_chunk
+
+        return Iterator()
+
+    mocker.patch("openai.resources.chat.completions.AsyncCompletions.create", create)
+    llm = OpenAILLM(mock_llm_config.model_copy(update={"model": "gpt-4o-mini"}))
+    update_costs = mocker.patch.object(llm, "_update_costs")
+
+    assert await llm._achat_completion_stream(messages) == resp_cont
+    assert requests[0]["stream_options"] == {"include_usage": True}
+    update_costs.assert_called_once_with(usage)
+
+
 @pytest.mark.asyncio
 async def test_openai_acompletion(mocker):
     mocker.patch("openai.resources.chat.completions.AsyncCompletions.create", mock_openai_acompletions_create)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the BaseLLM rate limiter
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from metagpt.provider import OpenAILLM
+from metagpt.provider.rate_limiter import (
+    LLMRateLimiter,
+    TokenBucket,
+    get_rate_limiter,
+    get_retry_after,
+)
+from tests.metagpt.provider.mock_llm_config import mock_llm_config
+
+
+def rate_limit_error(headers: dict = None) -> RateLimitError:
+    request = httpx.Request("POST", "http://127.0.0.1/v1/chat/completions")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def test_get_retry_after():
+    assert get_retry_after(rate_limit_error({"retry-after": "2"})) == 2
+    assert get_retry_after(rate_limit_error({"retry-after-ms": "150"})) == 0.15
+    assert get_retry_after(rate_limit_error()) == 0
+    assert get_retry_after(ValueError("not a rate limit")) is None
+
+
+@pytest.mark.asyncio
+async def test_limiter_caps_in_flight_and_reports_queue_depth():
+    limiter = LLMRateLimiter(max_concurrency=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        peak = max(peak, limiter.in_flight)
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    results = await asyncio.gather(*(limiter.run(call) for _ in range(6)))
+
+    assert results == ["ok"] * 6
+    assert peak == 2
+    metrics = limiter.metrics()
+    assert metrics["requests"] == 6
+    assert metrics["max_queue_depth"] == 4  # all but the first two waited for a slot
+    assert metrics["queue_depth"] == metrics["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_backs_off_multiplicatively_on_429():
+    limiter = LLMRateLimiter(max_concurrency=8, default_backoff=0.01)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if calls <= 2:
+            raise rate_limit_error({"retry-after-ms": "10"})
+        return "ok"
+
+    assert await limiter.run(call) == "ok"
+    assert limiter.throttled == 2
+    assert limiter.metrics()["concurrency_limit"] == 2
+    # additive increase on each success, capped at max_concurrency
+    for _ in range(100):
+        await limiter.run(call)
+    assert limiter.metrics()["concurrency_limit"] == 8
+
+
+@pytest.mark.asyncio
+async def test_limiter_gives_up_after_max_retries():
+    limiter = LLMRateLimiter(max_retries=1, default_backoff=0.01)
+
+    async def call():
+        raise rate_limit_error()
+
+    with pytest.raises(RateLimitError):
+        await limiter.run(call)
+    assert limiter.throttled == 2
+
+
+@pytest.mark.asyncio
+async def test_aask_uses_limiter_shared_per_model(mocker):
+    config = mock_llm_config.model_copy(update={"model": "gpt-4o-mini", "max_concurrency": 1})
+    assert OpenAILLM(mock_llm_config).rate_limiter is None
+
+    llm, other = OpenAILLM(config), OpenAILLM(config.model_copy())
+    assert llm.rate_limiter is other.rate_limiter is get_rate_limiter(config)
+
+    in_flight = []
+
+    async def acompletion_text(messages, stream=False, timeout=None):
+        in_flight.append(llm.rate_limiter.in_flight)
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    mocker.patch.object(OpenAILLM, "acompletion_text", side_effect=acompletion_text)
+    assert await asyncio.gather(llm.aask("a"), other.aask("b"), llm.aask("c")) == ["ok"] * 3
+    assert in_flight == [1, 1, 1]
+
+
+def test_limiter_shared_by_loops_in_threads():
+    limiter = LLMRateLimiter(max_concurrency=2)
+    lock = threading.Lock()
+    in_flight, peak = 0, 0
+
+    async def call():
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return "ok"
+
+    async def run_requests():
+        return await asyncio.gather(*(limiter.run(call) for _ in range(6)))
+
+    # each thread runs its own event loop, as the SPO job queue and UI threads do
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(lambda _: asyncio.run(run_requests()), range(3)))
+
+    assert results == [["ok"] * 6] * 3
+    assert peak == 2
+    assert limiter.metrics()["requests"] == 18
+    assert limiter.in_flight == limiter.queue_depth == 0
+
+
+def test_token_bucket_shared_by_loops_in_threads():
+    bucket = TokenBucket(600)  # 10 tokens per second
+    bucket.tokens = 0
+
+    async def acquire():
+        await bucket.acquire(1)
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(lambda _: asyncio.run(acquire()), range(2)))
+
+    # the second caller waits for the refill after the first, whichever loop it runs on
+    assert time.monotonic() - start >= 0.18
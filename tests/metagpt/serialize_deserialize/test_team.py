@@ -163,5 +163,21 @@ async def test_context(context):
     assert company.env.context.cost_manager.max_budget == context.cost_manager.max_budget
 
 
+def test_team_serialize_msg_buffers(context, tmp_path):
+    company = Team(context=context)
+    role_c = RoleC()
+    company.hire([role_c])
+    company.run_project("write a snake game")
+
+    company.serialize(tmp_path)
+    assert (tmp_path / "msg_buffers.jsonl").exists()
+    # serialization leaves the buffer untouched
+    assert [m.content for m in role_c.rc.msg_buffer.snapshot()] == ["write a snake game"]
+
+    new_company = Team.deserialize(tmp_path, Context())
+    new_role_c = new_company.env.get_role(role_c.profile)
+    assert new_role_c.rc.msg_buffer.pop_all() == role_c.rc.msg_buffer.pop_all()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
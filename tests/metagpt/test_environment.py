@@ -12,6 +12,7 @@ import pytest
 
 from metagpt.actions import UserRequirement
 from metagpt.environment import Environment
+from metagpt.environment.base_env import EnvScheduler
 from metagpt.logs import logger
 from metagpt.roles import Architect, ProductManager, Role
 from metagpt.schema import Message
@@ -60,5 +61,63 @@ async def test_publish_and_process_message(env: Environment):
     assert len(env.history) > 10
 
 
+class CountingRole(Role):
+    runs: int = 0
+
+    async def run(self, with_message=None):
+        self.runs += 1
+        return await super().run(with_message=with_message)
+
+
+def test_publish_message_routes_by_address(env: Environment):
+    alice = Role(name="Alice", profile="product manager")
+    bob = Role(name="Bob", profile="engineer")
+    env.add_roles([alice, bob])
+    bob.set_addresses({"Bob", "reviewers"})
+
+    env.publish_message(Message(content="to reviewers", send_to={"reviewers"}))
+    env.publish_message(Message(content="to everyone"))
+    env.publish_message(Message(content="to nobody", send_to={"Carol"}))
+
+    assert [m.content for m in alice.rc.msg_buffer.pop_all()] == ["to everyone"]
+    assert [m.content for m in bob.rc.msg_buffer.pop_all()] == ["to reviewers", "to everyone"]
+
+    bob.set_addresses({"Bob"})
+    env.publish_message(Message(content="to reviewers again", send_to={"reviewers"}))
+    assert bob.rc.msg_buffer.empty()
+
+
+@pytest.mark.asyncio
+async def test_ready_scheduler_runs_only_roles_with_messages():
+    env = Environment(scheduler=EnvScheduler.READY)
+    roles = [CountingRole(name=f"R{i}", profile=f"role {i}") for i in range(50)]
+    env.add_roles(roles)
+    roles[3].set_addresses({"topic"})
+    assert env.is_idle
+
+    # not watched by the roles, so running them needs no LLM
+    env.publish_message(Message(content="hello", cause_by="tests.Unwatched", send_to={"topic"}))
+    assert not env.is_idle
+    await env.run(k=2)
+
+    assert [role.runs for role in roles if role.runs] == [1]
+    assert roles[3].runs == 1
+    assert env.is_idle
+
+
+def test_history_is_bounded():
+    env = Environment(max_history=3)
+    for i in range(5):
+        env.publish_message(Message(content=f"m{i}"))
+
+    assert [m.content for m in env.history_log] == ["m2", "m3", "m4"]
+    assert env.history == "\nuser: m2\nuser: m3\nuser: m4"
+
+    new_env = Environment(**env.model_dump())
+    assert [m.content for m in new_env.history_log] == ["m2", "m3", "m4"]
+    new_env.publish_message(Message(content="m5"))
+    assert len(new_env.history_log) == 3
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
@@ -9,6 +9,7 @@
 """
 
 import json
+import time
 
 import pytest
 
@@ -140,6 +141,21 @@ async def test_message_queue():
     assert new_mq.pop_all() == mq.pop_all()
 
 
+@pytest.mark.asyncio
+async def test_message_queue_snapshot_does_not_drain():
+    mq = MessageQueue()
+    for i in range(3):
+        mq.push(Message(content=str(i)))
+
+    assert [m.content for m in mq.snapshot()] == ["0", "1", "2"]
+    start = time.perf_counter()
+    val = await mq.dump()
+    assert time.perf_counter() - start < 0.5  # the former dump waited a second for the queue to run dry
+    assert [m.content for m in MessageQueue.load(val).pop_all()] == ["0", "1", "2"]
+    assert [m.content for m in mq.pop_all()] == ["0", "1", "2"]
+    assert mq.pop() is None
+
+
 @pytest.mark.parametrize(
     ("file_list", "want"),
     [
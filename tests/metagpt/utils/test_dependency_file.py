@@ -8,6 +8,8 @@
 """
 from __future__ import annotations
 
+import asyncio
+import json
 from pathlib import Path
 from typing import Optional, Set, Union
 
@@ -61,5 +63,38 @@ async def test_dependency_file():
     assert not file.exists
 
 
+@pytest.mark.asyncio
+async def test_dependency_file_write_back(tmp_path):
+    file = DependencyFile.shared(workdir=tmp_path)
+    assert DependencyFile.shared(workdir=str(tmp_path)) is file
+
+    await asyncio.gather(
+        *(file.update(filename=tmp_path / f"src/{i}.py", dependencies={f"docs/{i % 2}.md"}) for i in range(10))
+    )
+    assert not file.exists
+    assert file.dirty
+    assert await file.get(tmp_path / "src/3.py") == {"docs/1.md"}
+    assert await file.get_dependents("docs/1.md") == {f"src/{i}.py" for i in range(1, 10, 2)}
+
+    await DependencyFile.flush_all()
+    assert not file.dirty
+    assert len(json.loads((tmp_path / ".dependencies.json").read_text())) == 10
+
+    await file.update(filename="src/3.py", dependencies={"docs/0.md"})
+    await file.update(filename="src/5.py", dependencies=None)
+    assert await file.get_dependents("docs/1.md") == {"src/1.py", "src/7.py", "src/9.py"}
+    assert "src/3.py" in await file.get_dependents("docs/0.md")
+
+    # changes written by another instance are picked up once the shared one has nothing unsaved
+    await file.flush()
+    other = DependencyFile(workdir=tmp_path)
+    await other.update(filename="src/new.py", dependencies={"docs/1.md"})
+    assert "src/new.py" in await file.get_dependents("docs/1.md")
+
+    DependencyFile.release(tmp_path)
+    assert DependencyFile.shared(workdir=tmp_path) is not file
+    DependencyFile.release(tmp_path)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
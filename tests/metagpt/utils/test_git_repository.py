@@ -100,6 +100,8 @@ async def test_dependency_file():
     assert not dependancy_file.exists
 
     await dependancy_file.update(filename="a/b.txt", dependencies={"c/d.txt", "e/f.txt"})
+    assert not dependancy_file.exists  # written back on flush
+    await dependancy_file.flush()
     assert dependancy_file.exists
 
     repo.delete_repository()
@@ -6,10 +6,29 @@
 @File    : test_token_counter.py
 """
 import pytest
+import tiktoken
 
+from metagpt.utils import token_counter
 from metagpt.utils.token_counter import count_input_tokens, count_output_tokens
 
 
+@pytest.fixture
+def byte_encoding(mocker):
+    """A byte-level encoding (one token per byte) that needs no download."""
+    encoding = tiktoken.Encoding(
+        "test_bytes",
+        pat_str=r"\s+|\S+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    token_counter.get_encoding.cache_clear()
+    token_counter._message_tokens_cache.clear()
+    mocker.patch("tiktoken.encoding_for_model", return_value=encoding)
+    yield encoding
+    token_counter.get_encoding.cache_clear()
+    token_counter._message_tokens_cache.clear()
+
+
 def test_count_message_tokens():
     messages = [
         {"role": "user", "content": "Hello"},
@@ -69,5 +88,36 @@ def test_count_string_tokens_gpt_4():
     assert count_output_tokens(string, model="gpt-4-0314") == 4
 
 
+def test_encoding_is_loaded_once_per_model(byte_encoding):
+    count_output_tokens("Hello", model="gpt-4o")
+    count_output_tokens("world", model="gpt-4o")
+    count_input_tokens([{"role": "user", "content": "Hello"}], model="gpt-4o")
+
+    assert tiktoken.encoding_for_model.call_count == 1
+
+
+def test_count_message_tokens_memoizes_prefix(byte_encoding, mocker):
+    messages = [{"role": "user", "content": "x" * 10000}, {"role": "assistant", "content": "y" * 10000}]
+    # 3 per message, the role and content bytes, and 3 for the reply priming
+    expected = 3 + 4 + 10000 + 3 + 9 + 10000 + 3
+    assert count_input_tokens(messages, model="gpt-4o") == expected
+
+    encode = mocker.spy(byte_encoding, "encode")
+    encode_batch = mocker.spy(byte_encoding, "encode_batch")
+    messages.append({"role": "user", "content": "Hi", "name": "bob"})
+    assert count_input_tokens(messages, model="gpt-4o") == expected + 3 + 4 + 2 + 3 + 1
+    # Only the values of the new message are encoded
+    assert [call.args[0] for call in encode.call_args_list] == ["user", "Hi", "bob"]
+    encode_batch.assert_not_called()
+
+
+def test_count_message_tokens_encodes_new_messages_in_batch(byte_encoding, mocker):
+    encode_batch = mocker.spy(byte_encoding, "encode_batch")
+    messages = [{"role": "user", "content": "z" * token_counter.ENCODE_BATCH_MIN_CHARS}]
+
+    assert count_input_tokens(messages, model="gpt-4o") == 3 + 4 + token_counter.ENCODE_BATCH_MIN_CHARS + 3
+    encode_batch.assert_called_once()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])